@@ -8,6 +8,11 @@ from flask_cors import CORS
 from flask_mail import Mail
 from apscheduler.schedulers.background import BackgroundScheduler
 from config.config import config
+from app.utils.task_queue import TaskQueue
+from app.services.llm_cache import LLMCache
+from app.services.rate_limiter import RateLimiter
+from app.services.single_flight import SingleFlight
+from app.utils.client_registry import ClientRegistry
 
 # Initialize extensions
 db = SQLAlchemy()
@@ -17,6 +22,11 @@ jwt = JWTManager()
 cors = CORS()
 mail = Mail()
 scheduler = BackgroundScheduler()
+task_queue = TaskQueue()
+llm_cache = LLMCache()
+rate_limiter = RateLimiter()
+single_flight = SingleFlight()
+clients = ClientRegistry()
 
 def create_app(config_name=None):
     """Application factory pattern"""
@@ -33,6 +43,11 @@ def create_app(config_name=None):
     jwt.init_app(app)
     cors.init_app(app)
     mail.init_app(app)
+    task_queue.init_app(app)
+    llm_cache.init_app(app)
+    rate_limiter.init_app(app)
+    single_flight.init_app(app)
+    clients.init_app(app)
     
     # Configure login manager
     login_manager.login_view = 'auth.login'
@@ -42,10 +57,11 @@ def create_app(config_name=None):
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     
     # Register blueprints
-    from app.api import auth_bp, contracts_bp, clauses_bp, reports_bp, alerts_bp, chat_bp, code_gen_bp
+    from app.api import auth_bp, contracts_bp, uploads_bp, clauses_bp, reports_bp, alerts_bp, chat_bp, code_gen_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(contracts_bp, url_prefix='/api/contracts')
+    app.register_blueprint(uploads_bp, url_prefix='/api/uploads')
     app.register_blueprint(clauses_bp, url_prefix='/api/clauses')
     app.register_blueprint(reports_bp, url_prefix='/api/reports')
     app.register_blueprint(alerts_bp, url_prefix='/api/alerts')
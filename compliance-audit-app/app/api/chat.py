@@ -1,10 +1,13 @@
-from flask import request, jsonify, current_app
+import json
+from flask import request, jsonify, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db
+from app import db, llm_cache, clients, rate_limiter, single_flight
 from app.models import Contract
 from app.api import chat_bp
 from app.services import AIService
 from app.utils.audit_logger import log_action
+from app.utils.ingestion_tasks import build_text_index, summary_is_current, refresh_contract_summary, store_contract_summary, analysis_text
+from app.services.text_index import text_digest
 
 @chat_bp.route('/ask', methods=['POST'])
 @jwt_required()
@@ -22,16 +25,14 @@ def ask_question():
         return jsonify({'error': 'Contract text not available'}), 400
     
     # Initialize AI service
-    ai_service = AIService(
-        current_app.config.get('AZURE_OPENAI_ENDPOINT'),
-        current_app.config.get('AZURE_OPENAI_KEY'),
-        current_app.config.get('AZURE_OPENAI_DEPLOYMENT_NAME')
-    )
+    ai_service = _interactive_ai_service()
     
     # Get answer
     answer = ai_service.answer_contract_question(
         contract.extracted_text,
-        data['question']
+        data['question'],
+        index=_text_index(contract),
+        top_k=current_app.config.get('QA_TOP_K', 4)
     )
     
     # Log action
@@ -49,31 +50,77 @@ def ask_question():
         }
     }), 200
 
+@chat_bp.route('/ask/stream', methods=['POST'])
+@jwt_required()
+def ask_question_stream():
+    """Ask a question about a contract and receive the answer as Server-Sent Events"""
+    current_user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data.get('contract_id') or not data.get('question'):
+        return jsonify({'error': 'contract_id and question are required'}), 400
+    
+    contract = Contract.query.get_or_404(data['contract_id'])
+    
+    if not contract.extracted_text:
+        return jsonify({'error': 'Contract text not available'}), 400
+    
+    ai_service = _interactive_ai_service()
+    if not ai_service.client:
+        return jsonify({'error': 'AI service not configured'}), 503
+    
+    def finished(answer, completed):
+        log_action(current_user_id, 'chat_query', 'contract', contract.id, {
+            'question': data['question'][:200],
+            'streamed': True,
+            'completed': completed
+        })
+    
+    chunks = ai_service.stream_contract_answer(
+        contract.extracted_text,
+        data['question'],
+        index=_text_index(contract),
+        top_k=current_app.config.get('QA_TOP_K', 4)
+    )
+    return _event_stream(chunks, finished)
+
 @chat_bp.route('/contract/<int:contract_id>/summary', methods=['GET'])
 @jwt_required()
 def get_contract_summary(contract_id):
-    """Get an AI-generated summary of a contract"""
+    """
+    Get the AI-generated summary of a contract. The stored summary is served
+    while it matches the contract text; ?refresh=true regenerates it.
+    """
     current_user_id = get_jwt_identity()
     contract = Contract.query.get_or_404(contract_id)
     
     if not contract.extracted_text:
         return jsonify({'error': 'Contract text not available'}), 400
     
-    # Initialize AI service
-    ai_service = AIService(
-        current_app.config.get('AZURE_OPENAI_ENDPOINT'),
-        current_app.config.get('AZURE_OPENAI_KEY'),
-        current_app.config.get('AZURE_OPENAI_DEPLOYMENT_NAME')
-    )
+    refresh = request.args.get('refresh', 'false').lower() == 'true'
+    stored = not refresh and summary_is_current(contract)
     
-    # Get summary
-    summary = ai_service.summarize_contract(contract.extracted_text)
+    if stored:
+        summary = contract.summary
+    else:
+        # Initialize AI service
+        ai_service = _interactive_ai_service()
+        
+        if not ai_service.client:
+            summary = "AI service not configured"
+        else:
+            try:
+                summary = refresh_contract_summary(contract, ai_service, force=refresh)
+            except Exception as e:
+                summary = f"Error generating summary: {str(e)}"
     
     # Log action
-    log_action(current_user_id, 'generate_summary', 'contract', contract.id, {})
+    log_action(current_user_id, 'generate_summary', 'contract', contract.id, {'stored': stored, 'refresh': refresh})
     
     return jsonify({
         'summary': summary,
+        'stored': stored,
+        'generated_at': contract.summary_generated_at.isoformat() if contract.summary_generated_at else None,
         'contract': {
             'id': contract.id,
             'contract_number': contract.contract_number,
@@ -82,6 +129,40 @@ def get_contract_summary(contract_id):
         }
     }), 200
 
+@chat_bp.route('/contract/<int:contract_id>/summary/stream', methods=['GET'])
+@jwt_required()
+def get_contract_summary_stream(contract_id):
+    """Get the AI-generated summary of a contract as Server-Sent Events (stored one if current)"""
+    current_user_id = get_jwt_identity()
+    contract = Contract.query.get_or_404(contract_id)
+    
+    if not contract.extracted_text:
+        return jsonify({'error': 'Contract text not available'}), 400
+    
+    refresh = request.args.get('refresh', 'false').lower() == 'true'
+    stored = not refresh and summary_is_current(contract)
+    text_hash = text_digest(contract.extracted_text)
+    
+    if stored:
+        chunks = iter([contract.summary])
+    else:
+        ai_service = _interactive_ai_service()
+        if not ai_service.client:
+            return jsonify({'error': 'AI service not configured'}), 503
+        chunks = ai_service.stream_contract_summary(analysis_text(contract), use_cache=not refresh)
+    
+    def finished(summary, completed):
+        if completed and not stored:
+            store_contract_summary(contract, summary, text_hash)
+        log_action(current_user_id, 'generate_summary', 'contract', contract.id, {
+            'streamed': True,
+            'completed': completed,
+            'stored': stored,
+            'refresh': refresh
+        })
+    
+    return _event_stream(chunks, finished)
+
 @chat_bp.route('/suggested-questions', methods=['GET'])
 @jwt_required()
 def get_suggested_questions():
@@ -165,14 +246,15 @@ def check_compliance():
     
     # If we have AI service, get a more detailed analysis
     if contract.extracted_text:
-        ai_service = AIService(
-            current_app.config.get('AZURE_OPENAI_ENDPOINT'),
-            current_app.config.get('AZURE_OPENAI_KEY'),
-            current_app.config.get('AZURE_OPENAI_DEPLOYMENT_NAME')
-        )
+        ai_service = _interactive_ai_service()
         
         question = f"Does this contract contain requirements for {standard} compliance? If yes, what are they?"
-        answer = ai_service.answer_contract_question(contract.extracted_text, question)
+        answer = ai_service.answer_contract_question(
+            contract.extracted_text,
+            question,
+            index=_text_index(contract),
+            top_k=current_app.config.get('QA_TOP_K', 4)
+        )
         result['ai_analysis'] = answer
     
     # Log action
@@ -180,4 +262,65 @@ def check_compliance():
         'standard': standard
     })
     
-    return jsonify(result), 200
\ No newline at end of file
+    return jsonify(result), 200
+
+@chat_bp.route('/cache-stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    """Get hit-rate metrics of the AI response cache and request coalescing"""
+    return jsonify({'cache': llm_cache.stats(), 'single_flight': single_flight.stats()}), 200
+
+@chat_bp.route('/rate-limit-stats', methods=['GET'])
+@jwt_required()
+def get_rate_limit_stats():
+    """Get queue depth, wait times and throttling counters of the AI rate limiter"""
+    return jsonify({'rate_limit': rate_limiter.stats()}), 200
+
+def _interactive_ai_service():
+    """AIService for a user waiting on the answer: shared client, cache and the interactive rate-limit lane"""
+    return AIService(
+        current_app.config.get('AZURE_OPENAI_ENDPOINT'),
+        current_app.config.get('AZURE_OPENAI_KEY'),
+        current_app.config.get('AZURE_OPENAI_DEPLOYMENT_NAME'),
+        cache=llm_cache,
+        client=clients.azure_openai(),
+        rate_limiter=rate_limiter,
+        priority='interactive',
+        single_flight=single_flight
+    )
+
+def _text_index(contract):
+    """Retrieval index for chat questions; contracts ingested before it existed get one on first use"""
+    index = build_text_index(contract)
+    db.session.commit()
+    return index
+
+def _event_stream(chunks, finished):
+    """
+    Forward text chunks as Server-Sent Events: 'delta' for each chunk, then
+    'done' with the full text or 'error'. finished(text, completed) runs
+    once the stream ends, including when the client disconnects.
+    """
+    def event(name, payload):
+        return f"event: {name}\ndata: {json.dumps(payload)}\n\n"
+    
+    def generate():
+        parts = []
+        completed = False
+        try:
+            for chunk in chunks:
+                parts.append(chunk)
+                yield event('delta', {'text': chunk})
+            completed = True
+            yield event('done', {'text': ''.join(parts)})
+        except Exception as e:
+            print(f"AI stream error: {e}")
+            yield event('error', {'error': str(e)})
+        finally:
+            finished(''.join(parts), completed)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}  # no proxy buffering
+    )
\ No newline at end of file
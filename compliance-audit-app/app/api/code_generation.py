@@ -1,6 +1,6 @@
 from flask import request, jsonify, current_app, Blueprint
-from openai import OpenAI
 import os
+from app import clients
 from app.utils.audit_logger import log_action
 
 # Create blueprint
@@ -24,8 +24,8 @@ def generate_code():
                 'error': 'OpenAI API key is required. Please provide it in the request or set OPENAI_API_KEY environment variable'
             }), 400
         
-        # Initialize OpenAI client
-        client = OpenAI(api_key=openai_api_key)
+        # Shared OpenAI client for this key (pooled connections)
+        client = clients.openai(openai_api_key)
         
         # Prepare the system message for code generation
         system_message = """You are an expert code generator assistant. Generate clean, well-documented, and production-ready code based on the user's requirements. 
@@ -98,8 +98,8 @@ def generate_contract_code():
                 'error': 'OpenAI API key is required'
             }), 400
         
-        # Initialize OpenAI client
-        client = OpenAI(api_key=openai_api_key)
+        # Shared OpenAI client for this key (pooled connections)
+        client = clients.openai(openai_api_key)
         
         # Prepare the system message for contract-specific code generation
         system_message = """You are an expert in contract analysis and code generation. 
@@ -169,8 +169,8 @@ def analyze_with_ocr():
         if not openai_api_key:
             return jsonify({'error': 'OpenAI API key is required'}), 400
         
-        # Initialize OpenAI client
-        client = OpenAI(api_key=openai_api_key)
+        # Shared OpenAI client for this key (pooled connections)
+        client = clients.openai(openai_api_key)
         
         # Prepare the message for GPT-4 Vision
         messages = [
@@ -243,7 +243,7 @@ def test_openai_key():
             }), 400
         
         # Try to make a simple API call
-        client = OpenAI(api_key=openai_api_key)
+        client = clients.openai(openai_api_key)
         
         response = client.chat.completions.create(
             model="gpt-4",
@@ -1,14 +1,17 @@
 import os
 import uuid
-from datetime import datetime, date
-from flask import request, jsonify, current_app, send_file
+import zipfile
+from datetime import datetime, date, timedelta
+from flask import request, jsonify, current_app, send_file, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
-from app import db
-from app.models import Contract, Clause, User
+from app import db, task_queue
+from app.models import Contract, Clause, User, IngestionJob
 from app.api import contracts_bp
-from app.services import OCRService, AIService
 from app.utils.audit_logger import log_action
+from app.services.section_index import SectionIndex
+from app.utils.ingestion_tasks import process_contract_job, copy_contract_analysis, build_section_index
+from app.utils.uploads import save_upload, parse_manifest
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
@@ -63,6 +66,44 @@ def get_contract(contract_id):
     
     return jsonify({'contract': contract_dict}), 200
 
+@contracts_bp.route('/<int:contract_id>/sections', methods=['GET'])
+@jwt_required()
+def get_contract_sections(contract_id):
+    """Get the section tree of a contract (offsets, levels, pages and references, no text)"""
+    index = _section_index(contract_id)
+    if index is None:
+        return jsonify({'error': 'Contract has no extracted text'}), 404
+
+    return jsonify({'sections': index.sections()}), 200
+
+@contracts_bp.route('/<int:contract_id>/sections/<int:section>', methods=['GET'])
+@jwt_required()
+def get_contract_section(contract_id, section):
+    """Get the text of one section, read from the database by its offsets"""
+    index = _section_index(contract_id)
+    if index is None:
+        return jsonify({'error': 'Contract has no extracted text'}), 404
+    if section >= len(index.rows):
+        return jsonify({'error': 'Section not found'}), 404
+
+    section_dict = index.section(section)
+    # SUBSTR is 1-based; only the section's characters leave the database
+    section_dict['text'] = db.session.query(
+        db.func.substr(Contract.extracted_text, section_dict['start'] + 1, section_dict['end'] - section_dict['start'])
+    ).filter(Contract.id == contract_id).scalar()
+
+    return jsonify({'section': section_dict}), 200
+
+def _section_index(contract_id):
+    """Stored section index of a contract, built on first use for contracts processed before it existed"""
+    row = db.session.query(Contract.section_index).filter(Contract.id == contract_id).first_or_404()
+    index = SectionIndex.from_dict(row.section_index)
+    if index is None:
+        contract = Contract.query.get(contract_id)
+        index = build_section_index(contract)
+        db.session.commit()
+    return index
+
 @contracts_bp.route('/', methods=['POST'])
 @jwt_required()
 def create_contract():
@@ -81,125 +122,334 @@ def create_contract():
         return jsonify({'error': 'Invalid file type. Only PDF files are allowed'}), 400
     
     # Get form data
-    vendor_name = request.form.get('vendor_name', 'Unknown Vendor')
-    contract_number = request.form.get('contract_number', f'AUTO-{uuid.uuid4().hex[:8].upper()}')
-    title = request.form.get('title', 'Untitled Contract')
+    result, status_code = queue_contract_upload(
+        file.stream,
+        file.filename,
+        owner_id=current_user_id,
+        vendor_name=request.form.get('vendor_name', 'Unknown Vendor'),
+        contract_number=request.form.get('contract_number', f'AUTO-{uuid.uuid4().hex[:8].upper()}'),
+        title=request.form.get('title', 'Untitled Contract'),
+        on_duplicate=request.form.get('on_duplicate', 'reuse')  # 'reuse' or 'reject'
+    )
     
+    return jsonify(result), status_code
+
+def queue_contract_upload(stream, filename, owner_id, vendor_name, contract_number, title,
+                          on_duplicate='reuse', batch_id=None):
+    """
+    Store an uploaded PDF, create its contract and ingestion job, and queue
+    processing. Returns a (response dict, HTTP status code) pair.
+    """
     # Check if contract number already exists
     if Contract.query.filter_by(contract_number=contract_number).first():
-        return jsonify({'error': 'Contract number already exists'}), 400
+        return {'error': 'Contract number already exists'}, 400
     
     try:
-        # Save file
-        original_filename = secure_filename(file.filename)
+        # Save file, fingerprinting it as it streams to disk
+        original_filename = secure_filename(filename)
         stored_filename = f"{uuid.uuid4().hex}_{original_filename}"
         file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], stored_filename)
-        file.save(file_path)
-        
-        # Extract text using OCR service
-        ocr_service = OCRService(
-            current_app.config.get('AZURE_COMPUTER_VISION_ENDPOINT'),
-            current_app.config.get('AZURE_COMPUTER_VISION_KEY')
-        )
-        
-        ocr_result = ocr_service.extract_text_from_pdf(file_path)
+        file_hash = save_upload(stream, file_path)
+    except Exception as e:
+        if 'file_path' in locals() and os.path.exists(file_path):
+            os.remove(file_path)
+        return {'error': f'Processing failed: {str(e)}'}, 500
+    
+    return queue_stored_contract(stored_filename, original_filename, file_hash, owner_id,
+                                 vendor_name, contract_number, title, on_duplicate, batch_id)
+
+def queue_stored_contract(stored_filename, original_filename, file_hash, owner_id, vendor_name,
+                          contract_number, title, on_duplicate='reuse', batch_id=None, keep_file_on_error=False):
+    """
+    Create the contract and ingestion job for a file already in the upload
+    folder and queue processing. Returns a (response dict, HTTP status code)
+    pair. The file is deleted when it is not queued, unless keep_file_on_error.
+    """
+    file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], stored_filename)
+    
+    # Check if contract number already exists
+    if Contract.query.filter_by(contract_number=contract_number).first():
+        if not keep_file_on_error:
+            os.remove(file_path)
+        return {'error': 'Contract number already exists'}, 400
+    
+    try:
+        # Look for an already processed upload of the same file
+        duplicate = Contract.query.filter(
+            Contract.file_hash == file_hash,
+            Contract.ingestion_stage == 'persisted'
+        ).order_by(Contract.id).first()
         
-        if not ocr_result['success']:
-            return jsonify({'error': f"OCR failed: {ocr_result['error']}"}), 500
+        if duplicate and on_duplicate == 'reject':
+            if not keep_file_on_error:
+                os.remove(file_path)
+            return {
+                'error': f'Duplicate of contract #{duplicate.id}',
+                'duplicate_of': duplicate.id
+            }, 409
         
-        # Create contract record
+        # Create contract record; text and analysis are filled in by the ingestion job
         contract = Contract(
             vendor_name=vendor_name,
             contract_number=contract_number,
             title=title,
             original_filename=original_filename,
             stored_filename=stored_filename,
-            extracted_text=ocr_result['text'],
-            owner_id=current_user_id
+            file_hash=file_hash,
+            owner_id=owner_id
         )
         
         db.session.add(contract)
         db.session.flush()  # Get contract ID without committing
         
-        # Analyze contract using AI service
-        ai_service = AIService(
-            current_app.config.get('AZURE_OPENAI_ENDPOINT'),
-            current_app.config.get('AZURE_OPENAI_KEY'),
-            current_app.config.get('AZURE_OPENAI_DEPLOYMENT_NAME')
-        )
-        
-        ai_result = ai_service.analyze_contract(ocr_result['text'])
+        job = IngestionJob(contract_id=contract.id, created_by=owner_id, batch_id=batch_id)
+        db.session.add(job)
         
-        if ai_result.get('success'):
-            # Update contract with AI-extracted metadata
-            metadata = ai_result.get('metadata', {})
-            if metadata.get('start_date'):
-                try:
-                    contract.start_date = datetime.strptime(metadata['start_date'], '%Y-%m-%d').date()
-                except:
-                    pass
-            
-            if metadata.get('end_date'):
-                try:
-                    contract.end_date = datetime.strptime(metadata['end_date'], '%Y-%m-%d').date()
-                except:
-                    pass
-            
-            if metadata.get('contract_value'):
-                try:
-                    contract.contract_value = float(metadata['contract_value'])
-                except:
-                    pass
-            
-            if metadata.get('currency'):
-                contract.currency = metadata['currency']
-            
-            # Set risk level based on AI assessment
-            risk_assessment = ai_result.get('risk_assessment', {})
-            contract.risk_level = risk_assessment.get('overall_risk', 'medium')
-            
-            # Create clause records
-            for clause_data in ai_result.get('clauses', []):
-                clause = Clause(
-                    contract_id=contract.id,
-                    clause_type=clause_data.get('clause_type', 'other'),
-                    clause_subtype=clause_data.get('clause_subtype'),
-                    title=clause_data.get('title', 'Untitled Clause'),
-                    content=clause_data.get('content', '')[:1000],  # Limit content length
-                    summary=clause_data.get('summary'),
-                    compliance_requirement=clause_data.get('compliance_requirement'),
-                    risk_assessment=clause_data.get('risk_assessment', 'medium'),
-                    action_required=clause_data.get('action_required', False),
-                    financial_amount=clause_data.get('financial_amount'),
-                    penalty_amount=clause_data.get('penalty_amount'),
-                    penalty_trigger=clause_data.get('penalty_trigger')
-                )
-                db.session.add(clause)
+        if duplicate:
+            # Reuse the extracted text and analysis instead of paying for OCR and AI again
+            job.status = 'completed'
+            job.result = copy_contract_analysis(duplicate, contract)
+            job.started_at = job.finished_at = datetime.utcnow()
         
         db.session.commit()
         
         # Log action
-        log_action(current_user_id, 'upload', 'contract', contract.id, {
+        log_action(owner_id, 'upload', 'contract', contract.id, {
             'filename': original_filename,
             'vendor': vendor_name,
-            'contract_number': contract_number
+            'contract_number': contract_number,
+            'job_id': job.id,
+            'duplicate_of': duplicate.id if duplicate else None
         })
         
-        contract_dict = contract.to_dict()
-        contract_dict['ocr_method'] = ocr_result['method']
-        contract_dict['ai_analysis'] = ai_result.get('success', False)
+        if duplicate:
+            return {
+                'message': f'Contract is a duplicate of #{duplicate.id}; its analysis was reused',
+                'job_id': job.id,
+                'status_url': url_for('contracts.get_ingestion_job', job_id=job.id),
+                'duplicate_of': duplicate.id,
+                'contract': contract.to_dict()
+            }, 201
         
-        return jsonify({
-            'message': 'Contract uploaded and processed successfully',
-            'contract': contract_dict
-        }), 201
+        # Hand OCR and AI analysis to the background worker pool
+        task_queue.submit(process_contract_job, job.id)
+        
+        return {
+            'message': 'Contract uploaded and queued for processing',
+            'job_id': job.id,
+            'status_url': url_for('contracts.get_ingestion_job', job_id=job.id),
+            'contract': contract.to_dict()
+        }, 202
         
     except Exception as e:
         db.session.rollback()
         # Clean up uploaded file on error
-        if 'file_path' in locals() and os.path.exists(file_path):
+        if os.path.exists(file_path) and not keep_file_on_error:
             os.remove(file_path)
-        return jsonify({'error': f'Processing failed: {str(e)}'}), 500
+        return {'error': f'Processing failed: {str(e)}'}, 500
+
+@contracts_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_upload_contracts():
+    """Upload many contracts as PDF files and/or a ZIP archive, with an optional CSV/JSON manifest"""
+    current_user_id = get_jwt_identity()
+    # A batch is larger than one upload; must be set before the form is parsed
+    request.max_content_length = current_app.config['BULK_MAX_CONTENT_LENGTH']
+    
+    # Manifest maps each filename to its vendor_name, contract_number and title
+    manifest = {}
+    manifest_file = request.files.get('manifest')
+    if manifest_file and manifest_file.filename:
+        try:
+            manifest = parse_manifest(manifest_file.filename, manifest_file.read())
+        except Exception as e:
+            return jsonify({'error': f'Invalid manifest: {str(e)}'}), 400
+    
+    # Collect (filename, stream opener, rejection reason) from plain files and the archive
+    uploads = []
+    for file in request.files.getlist('files'):
+        if file.filename:
+            uploads.append((file.filename, lambda file=file: file.stream, None))
+    
+    archive = request.files.get('archive')
+    if archive and archive.filename:
+        try:
+            zip_file = zipfile.ZipFile(archive.stream)
+        except zipfile.BadZipFile:
+            return jsonify({'error': 'Archive is not a valid ZIP file'}), 400
+        entries = [
+            info for info in zip_file.infolist()
+            if not (info.is_dir() or not os.path.basename(info.filename) or os.path.basename(info.filename).startswith('.')
+                    or info.filename.startswith('__MACOSX/'))
+        ]
+        # Sizes come from the archive's headers; zipfile stops reading an entry at its declared size
+        if sum(info.file_size for info in entries) > current_app.config['BULK_MAX_ARCHIVE_SIZE']:
+            return jsonify({'error': 'Archive is too large when extracted'}), 400
+        for info in entries:
+            uploads.append((os.path.basename(info.filename), lambda info=info: zip_file.open(info), _zip_entry_error(info)))
+    
+    if not uploads:
+        return jsonify({'error': 'No files provided'}), 400
+    
+    if len(uploads) > current_app.config['BULK_MAX_FILES']:
+        return jsonify({'error': f"Too many files; the limit is {current_app.config['BULK_MAX_FILES']}"}), 400
+    
+    batch_id = uuid.uuid4().hex
+    files = []
+    for filename, open_stream, error in uploads:
+        if not allowed_file(filename):
+            error = 'Invalid file type. Only PDF files are allowed'
+        if error:
+            files.append({'filename': filename, 'status': 'rejected', 'error': error})
+            continue
+        
+        # Each contract is committed on its own so one bad file does not sink the batch
+        entry = manifest.get(filename, {})
+        with open_stream() as stream:  # closes each ZIP entry's decompressor once it is saved
+            result, status_code = queue_contract_upload(
+                stream,
+                filename,
+                owner_id=current_user_id,
+                vendor_name=entry.get('vendor_name') or 'Unknown Vendor',
+                contract_number=entry.get('contract_number') or f'AUTO-{uuid.uuid4().hex[:8].upper()}',
+                title=entry.get('title') or 'Untitled Contract',
+                on_duplicate=request.form.get('on_duplicate', 'reuse'),
+                batch_id=batch_id
+            )
+        
+        if status_code == 202:
+            status = 'queued'
+        elif 'duplicate_of' in result:
+            status = 'duplicate'
+        else:
+            status = 'rejected'
+        files.append({
+            'filename': filename,
+            'status': status,
+            'contract_id': result.get('contract', {}).get('id'),
+            'job_id': result.get('job_id'),
+            'duplicate_of': result.get('duplicate_of'),
+            'error': result.get('error')
+        })
+    
+    return jsonify({
+        'batch_id': batch_id,
+        'status_url': url_for('contracts.get_bulk_upload', batch_id=batch_id),
+        'total': len(files),
+        'queued': sum(1 for f in files if f['status'] == 'queued'),
+        'duplicates': sum(1 for f in files if f['status'] == 'duplicate'),
+        'rejected': sum(1 for f in files if f['status'] == 'rejected'),
+        'files': files
+    }), 202
+
+def _zip_entry_error(info):
+    """Why a ZIP entry is refused (too large or suspiciously compressed), or None"""
+    if info.file_size > current_app.config['BULK_MAX_ENTRY_SIZE']:
+        return 'File is too large'
+    if info.file_size > info.compress_size * current_app.config['BULK_MAX_COMPRESSION_RATIO']:
+        return 'File is compressed too much to be a PDF'
+    return None
+
+@contracts_bp.route('/bulk/<batch_id>', methods=['GET'])
+@jwt_required()
+def get_bulk_upload(batch_id):
+    """Get the per-file processing report and throughput of a bulk upload"""
+    jobs = IngestionJob.query.filter_by(batch_id=batch_id).order_by(IngestionJob.created_at).all()
+    if not jobs:
+        return jsonify({'error': 'Batch not found'}), 404
+    
+    counts = {'queued': 0, 'running': 0, 'completed': 0, 'failed': 0}
+    for job in jobs:
+        counts[job.status] = counts.get(job.status, 0) + 1
+    
+    # Throughput over the wall-clock time the batch has been processing
+    started = min(job.created_at for job in jobs)
+    finished = [job.finished_at for job in jobs if job.finished_at]
+    done = counts['queued'] == 0 and counts['running'] == 0
+    end = max(finished) if done and finished else datetime.utcnow()
+    elapsed_minutes = max((end - started).total_seconds(), 1) / 60
+    
+    return jsonify({
+        'batch_id': batch_id,
+        'total': len(jobs),
+        'status_counts': counts,
+        'done': done,
+        'elapsed_seconds': round(elapsed_minutes * 60, 1),
+        'contracts_per_minute': round(counts['completed'] / elapsed_minutes, 2),
+        'files': [{
+            'filename': job.contract.original_filename if job.contract else None,
+            'contract_id': job.contract_id,
+            'job_id': job.id,
+            'status': job.status,
+            'error': job.error,
+            'result': job.result
+        } for job in jobs]
+    }), 200
+
+@contracts_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_ingestion_job(job_id):
+    """Get the processing status of an uploaded contract"""
+    job = IngestionJob.query.get_or_404(job_id)
+    
+    job_dict = job.to_dict()
+    if job.status == 'completed' and job.contract:
+        job_dict['contract'] = job.contract.to_dict()
+    
+    return jsonify({'job': job_dict}), 200
+
+@contracts_bp.route('/<int:contract_id>/retry', methods=['POST'])
+@jwt_required()
+def retry_contract_processing(contract_id):
+    """
+    Resume processing of a contract from its last completed ingestion stage.
+    Jobs left queued or running by a restarted worker are failed once they
+    are older than INGESTION_JOB_TIMEOUT_MINUTES, or at once with ?force=true.
+    """
+    current_user_id = get_jwt_identity()
+    contract = Contract.query.get_or_404(contract_id)
+    
+    if contract.ingestion_stage == 'persisted':
+        return jsonify({'error': 'Contract has already been processed'}), 400
+    
+    force = request.args.get('force', 'false').lower() == 'true'
+    if not _fail_abandoned_jobs(contract, force):
+        return jsonify({'error': 'Contract is already being processed'}), 409
+    
+    job = IngestionJob(contract_id=contract.id, created_by=current_user_id)
+    db.session.add(job)
+    db.session.commit()
+    
+    # Log action
+    log_action(current_user_id, 'retry_processing', 'contract', contract.id, {
+        'job_id': job.id,
+        'resume_stage': contract.ingestion_stage
+    })
+    
+    task_queue.submit(process_contract_job, job.id)
+    
+    return jsonify({
+        'message': f'Contract processing resumed from stage {contract.ingestion_stage}',
+        'job_id': job.id,
+        'status_url': url_for('contracts.get_ingestion_job', job_id=job.id),
+        'contract': contract.to_dict()
+    }), 202
+
+def _fail_abandoned_jobs(contract, force=False):
+    """
+    Mark the contract's unfinished jobs failed if they are stale (or force
+    is set); returns False if a job that may still be running remains
+    """
+    cutoff = datetime.utcnow() - timedelta(minutes=current_app.config.get('INGESTION_JOB_TIMEOUT_MINUTES', 120))
+    active = contract.ingestion_jobs.filter(IngestionJob.status.in_(['queued', 'running'])).all()
+    for job in active:
+        if not force and (job.started_at or job.created_at) > cutoff:
+            return False
+    for job in active:
+        job.status = 'failed'
+        job.error = 'Abandoned: replaced by a forced retry' if force else 'Abandoned: job timed out without finishing'
+        job.finished_at = datetime.utcnow()
+    return True
 
 @contracts_bp.route('/<int:contract_id>', methods=['PUT'])
 @jwt_required()
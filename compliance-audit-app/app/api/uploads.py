@@ -0,0 +1,249 @@
+import os
+import uuid
+import hashlib
+import threading
+from flask import request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from werkzeug.utils import secure_filename
+from app import db
+from app.models import Contract, UploadSession
+from app.api import uploads_bp
+from app.api.contracts import allowed_file, queue_stored_contract
+from app.utils.audit_logger import log_action
+from app.utils.uploads import CHUNK_SIZE
+
+# Running SHA-256 per upload session, kept while this process receives its chunks.
+# If a session moves to another worker the digest is recomputed from disk on finalize.
+_hashers = {}
+_hashers_lock = threading.Lock()
+
+def _get_session(upload_id):
+    """Load an upload session owned by the current user"""
+    session = UploadSession.query.get_or_404(upload_id)
+    if session.owner_id != get_jwt_identity():
+        return None
+    return session
+
+def discard_running_hash(upload_id):
+    """Forget the running digest of an upload that was finalized or abandoned"""
+    with _hashers_lock:
+        _hashers.pop(upload_id, None)
+
+def _part_path(session):
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], session.part_filename)
+
+def _file_sha256(file_path):
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+@uploads_bp.route('/', methods=['POST'])
+@jwt_required()
+def init_upload():
+    """Start a resumable chunked upload of a contract PDF"""
+    current_user_id = get_jwt_identity()
+    data = request.get_json() or {}
+
+    filename = data.get('filename', '')
+    if not filename or not allowed_file(filename):
+        return jsonify({'error': 'Invalid file type. Only PDF files are allowed'}), 400
+
+    total_size = data.get('total_size')
+    if total_size is not None:
+        try:
+            total_size = int(str(total_size))  # via str so 1.5 and true are rejected rather than truncated
+        except (TypeError, ValueError):
+            total_size = -1
+        if total_size < 0:
+            return jsonify({'error': 'total_size must be a non-negative integer'}), 400
+        if total_size > current_app.config['CHUNKED_UPLOAD_MAX_SIZE']:
+            return jsonify({'error': 'File is too large'}), 400
+
+    contract_number = data.get('contract_number') or f'AUTO-{uuid.uuid4().hex[:8].upper()}'
+    if Contract.query.filter_by(contract_number=contract_number).first():
+        return jsonify({'error': 'Contract number already exists'}), 400
+
+    session = UploadSession(
+        owner_id=current_user_id,
+        original_filename=secure_filename(filename),
+        vendor_name=data.get('vendor_name') or 'Unknown Vendor',
+        contract_number=contract_number,
+        title=data.get('title') or 'Untitled Contract',
+        total_size=total_size
+    )
+    db.session.add(session)
+    db.session.commit()
+
+    open(_part_path(session), 'wb').close()
+    with _hashers_lock:
+        _hashers[session.id] = (hashlib.sha256(), 0)
+
+    return jsonify({
+        'upload': session.to_dict(),
+        'chunk_size': current_app.config['UPLOAD_CHUNK_SIZE']
+    }), 201
+
+@uploads_bp.route('/<upload_id>', methods=['GET'])
+@jwt_required()
+def get_upload(upload_id):
+    """Get the current offset of an upload so a client can resume it"""
+    session = _get_session(upload_id)
+    if not session:
+        return jsonify({'error': 'Upload not found'}), 404
+
+    return jsonify({'upload': session.to_dict()}), 200
+
+@uploads_bp.route('/<upload_id>', methods=['PUT'])
+@jwt_required()
+def append_chunk(upload_id):
+    """
+    Append the raw request body at ?offset=N. The offset must equal the
+    bytes received so far; on a mismatch the current offset is returned so
+    the client can resume from it.
+    """
+    session = _get_session(upload_id)
+    if not session:
+        return jsonify({'error': 'Upload not found'}), 404
+
+    if session.status != 'uploading':
+        return jsonify({'error': f'Upload is {session.status}'}), 400
+
+    offset = request.args.get('offset', type=int)
+    if offset != session.received_bytes:
+        return jsonify({'error': 'Offset mismatch', 'offset': session.received_bytes}), 409
+
+    with _hashers_lock:
+        running = _hashers.get(session.id)
+    # Only continue the running digest if it has seen exactly the bytes on disk
+    hasher = running[0].copy() if running and running[1] == offset else None
+    chunk_hasher = hashlib.sha256()
+    max_size = session.total_size or current_app.config['CHUNKED_UPLOAD_MAX_SIZE']
+    part_path = _part_path(session)
+    written = 0
+
+    try:
+        with open(part_path, 'r+b') as f:
+            f.truncate(offset)  # Drop any bytes left by an interrupted chunk
+            f.seek(offset)
+            while True:
+                data = request.stream.read(CHUNK_SIZE)
+                if not data:
+                    break
+                written += len(data)
+                if offset + written > max_size:
+                    raise ValueError('Upload exceeds the declared file size')
+                f.write(data)
+                chunk_hasher.update(data)
+                if hasher:
+                    hasher.update(data)
+
+        expected = request.headers.get('X-Chunk-SHA256')
+        if expected and expected.lower() != chunk_hasher.hexdigest():
+            raise ValueError('Chunk checksum mismatch')
+
+    except Exception as e:
+        with open(part_path, 'r+b') as f:
+            f.truncate(offset)
+        return jsonify({'error': f'Chunk rejected: {str(e)}', 'offset': offset}), 400
+
+    session.received_bytes = offset + written
+    db.session.commit()
+
+    with _hashers_lock:
+        if hasher:
+            _hashers[session.id] = (hasher, session.received_bytes)
+        else:
+            _hashers.pop(session.id, None)
+
+    return jsonify({'upload': session.to_dict()}), 200
+
+@uploads_bp.route('/<upload_id>/finalize', methods=['POST'])
+@jwt_required()
+def finalize_upload(upload_id):
+    """Verify the assembled file and hand it to normal contract processing"""
+    current_user_id = get_jwt_identity()
+    session = _get_session(upload_id)
+    if not session:
+        return jsonify({'error': 'Upload not found'}), 404
+
+    if session.status != 'uploading':
+        return jsonify({'error': f'Upload is {session.status}'}), 400
+
+    if session.total_size is not None and session.received_bytes != session.total_size:
+        return jsonify({
+            'error': 'Upload is incomplete',
+            'offset': session.received_bytes,
+            'total_size': session.total_size
+        }), 400
+
+    data = request.get_json(silent=True) or {}
+    part_path = _part_path(session)
+    if data.get('contract_number'):
+        # Lets a client retry with another number after 'Contract number already exists'
+        session.contract_number = data['contract_number']
+
+    with _hashers_lock:
+        running = _hashers.pop(session.id, None)
+    if running and running[1] == session.received_bytes:
+        file_hash = running[0].hexdigest()
+    else:
+        file_hash = _file_sha256(part_path)
+
+    if data.get('sha256') and data['sha256'].lower() != file_hash:
+        return jsonify({'error': 'File checksum mismatch', 'sha256': file_hash}), 400
+
+    stored_filename = f"{uuid.uuid4().hex}_{session.original_filename}"
+    stored_path = os.path.join(current_app.config['UPLOAD_FOLDER'], stored_filename)
+    os.replace(part_path, stored_path)
+
+    result, status_code = queue_stored_contract(
+        stored_filename,
+        session.original_filename,
+        file_hash,
+        owner_id=current_user_id,
+        vendor_name=session.vendor_name,
+        contract_number=session.contract_number,
+        title=session.title,
+        on_duplicate=data.get('on_duplicate', 'reuse'),
+        keep_file_on_error=True
+    )
+
+    if status_code not in (201, 202):
+        # Keep the received bytes and the session open so the client can finalize again
+        os.replace(stored_path, part_path)
+        if running and running[1] == session.received_bytes:
+            with _hashers_lock:
+                _hashers[session.id] = running
+        db.session.commit()
+        result['upload'] = session.to_dict()
+        return jsonify(result), status_code
+
+    session.status = 'finalized'
+    session.contract_id = result.get('contract', {}).get('id')
+    db.session.commit()
+
+    result['upload'] = session.to_dict()
+    return jsonify(result), status_code
+
+@uploads_bp.route('/<upload_id>', methods=['DELETE'])
+@jwt_required()
+def abort_upload(upload_id):
+    """Abort an upload and discard the received bytes"""
+    current_user_id = get_jwt_identity()
+    session = _get_session(upload_id)
+    if not session:
+        return jsonify({'error': 'Upload not found'}), 404
+
+    if session.status == 'uploading':
+        part_path = _part_path(session)
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        discard_running_hash(session.id)
+        session.status = 'aborted'
+        db.session.commit()
+
+        log_action(current_user_id, 'abort_upload', 'upload', None, {'upload_id': session.id})
+
+    return jsonify({'message': 'Upload aborted', 'upload': session.to_dict()}), 200
@@ -3,5 +3,7 @@ from .contract import Contract
 from .clause import Clause
 from .audit_log import AuditLog
 from .alert import Alert
+from .ingestion_job import IngestionJob
+from .upload_session import UploadSession
 
-__all__ = ['User', 'Contract', 'Clause', 'AuditLog', 'Alert']
\ No newline at end of file
+__all__ = ['User', 'Contract', 'Clause', 'AuditLog', 'Alert', 'IngestionJob', 'UploadSession']
\ No newline at end of file
@@ -10,7 +10,15 @@ class Contract(db.Model):
     title = db.Column(db.String(300), nullable=False)
     original_filename = db.Column(db.String(255), nullable=False)
     stored_filename = db.Column(db.String(255), nullable=False)
+    file_hash = db.Column(db.String(64), index=True)  # SHA-256 of the uploaded file
     extracted_text = db.Column(db.Text)
+    text_index = db.Column(db.JSON)  # LexicalIndex over extracted_text, for retrieving chat context
+    section_index = db.Column(db.JSON)  # SectionIndex offsets table over extracted_text
+    summary = db.Column(db.Text)  # AI summary, generated in the background after ingestion
+    summary_text_hash = db.Column(db.String(64))  # SHA-256 of the extracted_text the summary was made from
+    summary_generated_at = db.Column(db.DateTime)
+    ingestion_stage = db.Column(db.String(30), default='stored')  # 'stored', 'text_extracted', 'metadata_extracted', 'clauses_detected', 'persisted'
+    ingestion_checkpoint = db.Column(db.JSON)  # Output of each completed ingestion stage
     start_date = db.Column(db.Date)
     end_date = db.Column(db.Date)
     renewal_date = db.Column(db.Date)
@@ -36,6 +44,7 @@ class Contract(db.Model):
             'contract_number': self.contract_number,
             'title': self.title,
             'original_filename': self.original_filename,
+            'ingestion_stage': self.ingestion_stage,
             'start_date': self.start_date.isoformat() if self.start_date else None,
             'end_date': self.end_date.isoformat() if self.end_date else None,
             'renewal_date': self.renewal_date.isoformat() if self.renewal_date else None,
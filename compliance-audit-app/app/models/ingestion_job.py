@@ -0,0 +1,36 @@
+import uuid
+from datetime import datetime
+from app import db
+
+class IngestionJob(db.Model):
+    __tablename__ = 'ingestion_jobs'
+    
+    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    contract_id = db.Column(db.Integer, db.ForeignKey('contracts.id'))
+    batch_id = db.Column(db.String(32), index=True)  # Set for jobs created by a bulk upload
+    status = db.Column(db.String(20), default='queued', nullable=False)  # 'queued', 'running', 'completed', 'failed'
+    error = db.Column(db.Text)
+    result = db.Column(db.JSON)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    # Relationships
+    contract = db.relationship('Contract', backref=db.backref('ingestion_jobs', lazy='dynamic'))
+    
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'contract_id': self.contract_id,
+            'batch_id': self.batch_id,
+            'status': self.status,
+            'error': self.error,
+            'result': self.result,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+    
+    def __repr__(self):
+        return f'<IngestionJob {self.id}: {self.status}>'
@@ -0,0 +1,45 @@
+import uuid
+from datetime import datetime
+from app import db
+
+class UploadSession(db.Model):
+    __tablename__ = 'upload_sessions'
+    
+    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    original_filename = db.Column(db.String(255), nullable=False)
+    vendor_name = db.Column(db.String(200), nullable=False)
+    contract_number = db.Column(db.String(100), nullable=False)
+    title = db.Column(db.String(300), nullable=False)
+    total_size = db.Column(db.BigInteger)  # Declared by the client, if known
+    received_bytes = db.Column(db.BigInteger, default=0, nullable=False)
+    status = db.Column(db.String(20), default='uploading', nullable=False)  # 'uploading', 'finalized', 'aborted'
+    contract_id = db.Column(db.Integer, db.ForeignKey('contracts.id', ondelete='SET NULL'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships; deleting the contract clears contract_id on its finalized uploads
+    contract = db.relationship('Contract', backref=db.backref('upload_sessions', lazy='dynamic'))
+    
+    @property
+    def part_filename(self):
+        """Name of the partially uploaded file in the upload folder"""
+        return f'{self.id}.part'
+    
+    def to_dict(self):
+        return {
+            'upload_id': self.id,
+            'filename': self.original_filename,
+            'vendor_name': self.vendor_name,
+            'contract_number': self.contract_number,
+            'title': self.title,
+            'total_size': self.total_size,
+            'offset': self.received_bytes,
+            'status': self.status,
+            'contract_id': self.contract_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+    
+    def __repr__(self):
+        return f'<UploadSession {self.id}: {self.received_bytes} bytes>'
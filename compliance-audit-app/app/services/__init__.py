@@ -1,6 +1,16 @@
 from .ocr_service import OCRService
+from .ocr_cache import OCRCache
+from .extraction_backends import ExtractionBackend, register_backend
 from .ai_service import AIService
+from .clause_rules import ClauseRules
+from .metadata_extractor import MetadataExtractor
+from .text_index import LexicalIndex
+from .section_index import SectionIndex
+from .text_normalizer import TextNormalizer
+from .llm_cache import LLMCache
+from .rate_limiter import RateLimiter, RateLimitTimeout
+from .single_flight import SingleFlight
 from .email_service import EmailService
 from .report_service import ReportService
 
-__all__ = ['OCRService', 'AIService', 'EmailService', 'ReportService']
\ No newline at end of file
+__all__ = ['OCRService', 'OCRCache', 'ExtractionBackend', 'register_backend', 'AIService', 'ClauseRules', 'MetadataExtractor', 'LexicalIndex', 'SectionIndex', 'TextNormalizer', 'LLMCache', 'RateLimiter', 'RateLimitTimeout', 'SingleFlight', 'EmailService', 'ReportService']
\ No newline at end of file
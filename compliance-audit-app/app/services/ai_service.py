@@ -1,21 +1,60 @@
 import json
-from typing import List, Dict, Optional
+from typing import Callable, Iterator, List, Dict, Optional, Union
 from openai import AzureOpenAI
 import re
 from datetime import datetime, date
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .text_chunking import chunk_text
+from .text_index import LexicalIndex
+from .llm_cache import LLMCache
+from .rate_limiter import RateLimiter
+from .single_flight import SingleFlight
+from .clause_rules import ClauseRules
+from .metadata_extractor import MetadataExtractor, parse_date, parse_amount
+
+RISK_RANK = {'high': 0, 'medium': 1, 'low': 2}
 
 class AIService:
-    def __init__(self, endpoint: str, key: str, deployment_name: str):
+    MAX_CHUNK_CLAUSES = 10  # clauses the model is asked to return per chunk or excerpt
+
+    def __init__(self, endpoint: str, key: str, deployment_name: str,
+                 chunk_chars: int = 6000, chunk_overlap: int = 300,
+                 max_concurrency: int = 4, max_clauses: int = 30,
+                 request_timeout: float = 60, step_timeout: Optional[float] = 300,
+                 cache: Optional[LLMCache] = None, client: Optional[AzureOpenAI] = None,
+                 rate_limiter: Optional[RateLimiter] = None, priority: str = 'bulk',
+                 single_flight: Optional[SingleFlight] = None, clause_rules: Optional[ClauseRules] = None,
+                 metadata_extractor: Optional[MetadataExtractor] = None, metadata_min_confidence: float = 0.75):
         self.endpoint = endpoint
         self.key = key
         self.deployment_name = deployment_name
-        self.client = None
+        # Clause detection reads the whole contract in section-aware chunks
+        self.chunk_chars = chunk_chars
+        self.chunk_overlap = chunk_overlap
+        self.max_concurrency = max(1, max_concurrency)  # chunk requests in flight
+        self.max_clauses = max_clauses  # clauses kept after global ranking by risk
+        self.step_timeout = step_timeout  # seconds an analysis step may take in run_concurrently
+        self.cache = cache if cache and cache.enabled else None
+        # Shared TPM/RPM limiter; 'interactive' calls are served before 'bulk' analysis
+        self.rate_limiter = rate_limiter
+        self.priority = priority
+        self.single_flight = single_flight  # joins identical requests already in flight
+        self.clause_rules = clause_rules  # local pre-classifier; only ambiguous spans then reach the model
+        # Local date/value extraction; the model is only asked when a field's confidence is below the minimum
+        self.metadata_extractor = metadata_extractor
+        self.metadata_min_confidence = metadata_min_confidence
+        self.usage = {'calls': 0, 'cached_calls': 0, 'coalesced_calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+        self._usage_lock = threading.Lock()
+        self.client = client  # shared pooled client from the app's ClientRegistry, if given
         
-        if endpoint and key:
+        if self.client is None and endpoint and key:
             self.client = AzureOpenAI(
                 azure_endpoint=endpoint,
                 api_key=key,
-                api_version="2024-02-01"
+                api_version="2024-02-01",
+                timeout=request_timeout  # per HTTP request, so abandoned steps do not linger
             )
     
     def analyze_contract(self, contract_text: str) -> Dict[str, any]:
@@ -24,20 +63,24 @@ class AIService:
             return {'error': 'AI service not configured'}
         
         try:
-            # Extract contract metadata
-            metadata = self._extract_contract_metadata(contract_text)
-            
-            # Detect and analyze clauses
-            clauses = self._detect_clauses(contract_text)
+            # Metadata and clauses do not depend on each other, so run them together;
+            # a step that fails or times out leaves the other's result in place
+            results, errors = self.run_concurrently({
+                'metadata': lambda: self.extract_metadata(contract_text),
+                'clauses': lambda: self.detect_clauses(contract_text)
+            })
+            clauses = results.get('clauses', [])
             
             # Assess overall risk
-            risk_assessment = self._assess_contract_risk(clauses)
+            risk_assessment = self.assess_contract_risk(clauses)
             
             return {
-                'metadata': metadata,
+                'metadata': results.get('metadata', {}),
                 'clauses': clauses,
                 'risk_assessment': risk_assessment,
-                'success': True
+                'errors': {name: str(error) for name, error in errors.items()},
+                'partial': bool(errors),
+                'success': bool(results)
             }
             
         except Exception as e:
@@ -46,7 +89,215 @@ class AIService:
                 'success': False
             }
     
-    def _extract_contract_metadata(self, text: str) -> Dict:
+    def run_concurrently(self, steps: Dict[str, Callable],
+                         timeout: Union[float, Dict[str, float], None] = None) -> tuple:
+        """
+        Run independent analysis steps in parallel, each limited to its own
+        timeout (seconds, or a dict per step; defaults to step_timeout).
+        Returns (results, errors) keyed by step name, so one failed or slow
+        step never discards the others.
+        """
+        if timeout is None:
+            timeout = self.step_timeout
+        started = time.monotonic()
+        results, errors = {}, {}
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, len(steps)), thread_name_prefix='ai-step')
+        futures = {name: executor.submit(step) for name, step in steps.items()}
+        
+        for name, future in futures.items():
+            limit = timeout.get(name, self.step_timeout) if isinstance(timeout, dict) else timeout
+            remaining = None if limit is None else max(0, started + limit - time.monotonic())
+            try:
+                results[name] = future.result(timeout=remaining)
+            except Exception as e:
+                if future.done():
+                    errors[name] = e
+                else:  # Still running: the step ran out of time (a step's own TimeoutError is done)
+                    print(f"AI step {name} timed out after {limit}s")
+                    errors[name] = TimeoutError(f'{name} timed out after {limit}s')
+        
+        # Do not wait for timed-out steps; their HTTP requests end at request_timeout
+        executor.shutdown(wait=False, cancel_futures=True)
+        return results, errors
+    
+    def extract_metadata(self, text: str) -> Dict:
+        """
+        Extract contract metadata, raising on failure so callers can retry.
+        With a metadata_extractor, dates and value are read locally and the
+        model is only asked when the start or end date (or a value that was
+        found) falls below metadata_min_confidence; without a client the
+        local result is returned as is.
+        """
+        local = self.metadata_extractor.extract(text) if self.metadata_extractor else None
+        if local is not None and (not self.client or self._metadata_confident(local)):
+            local['source'] = 'rules'
+            return local
+        if not self.client:
+            return {}
+        
+        metadata = self._extract_contract_metadata(text, raise_errors=True)
+        return self._merge_metadata(local, metadata) if local else metadata
+    
+    def _metadata_confident(self, metadata: Dict) -> bool:
+        """Whether the locally extracted fields are certain enough to skip the model"""
+        confidence = metadata['confidence']
+        fields = ['start_date', 'end_date'] + (['contract_value'] if metadata.get('contract_value') else [])
+        return all(confidence.get(field, 0) >= self.metadata_min_confidence for field in fields)
+    
+    def _merge_metadata(self, local: Dict, model: Dict) -> Dict:
+        """Keep confident local fields, fill the others from the model's answer"""
+        merged = dict(model)
+        confidence = dict(local['confidence'])
+        for field in ('start_date', 'end_date', 'renewal_date', 'contract_value', 'currency'):
+            if confidence.get(field, 0) >= self.metadata_min_confidence:
+                merged[field] = local[field]
+                continue
+            value = model.get(field)
+            if field.endswith('_date'):
+                value = parse_date(value)
+                value = value.isoformat() if value else None
+            elif field == 'contract_value':
+                value = parse_amount(value)
+            if value is not None:
+                merged[field] = value
+                confidence[field] = None  # from the model, which gives no confidence
+            else:
+                merged[field] = local[field]
+        merged['confidence'] = confidence
+        merged['source'] = 'rules+model'
+        return merged
+    
+    def detect_clauses(self, text: str, stats: Optional[Dict] = None,
+                       page_starts: Optional[List[int]] = None) -> List[Dict]:
+        """Detect clauses, raising on failure so callers can retry"""
+        return self._detect_clauses(text, raise_errors=True, stats=stats, page_starts=page_starts)
+    
+    def _create_completion(self, messages: List[Dict], temperature: float, max_tokens: int,
+                           use_cache: bool = True, usage: Optional[Dict] = None) -> str:
+        """
+        Call chat completions through the response cache and return the
+        message content. use_cache=False skips the lookup (a forced refresh)
+        but still stores the new answer. Identical requests already in flight
+        are joined instead of repeated, except by a forced refresh, which
+        must not be handed the answer it asked to replace. This call's usage
+        is also added to the usage dict when given.
+        """
+        key = None
+        if self.cache or self.single_flight:
+            key = LLMCache.make_key(self.deployment_name, messages, temperature, max_tokens)
+        if self.cache and use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._add_usage(usage, cached_calls=1)
+                return cached
+        
+        if not self.single_flight or not use_cache:
+            return self._request_completion(messages, temperature, max_tokens, key, usage)
+        
+        requested = []
+        def request():
+            requested.append(True)
+            return self._request_completion(messages, temperature, max_tokens, key, usage)
+        
+        content = self.single_flight.do(key, request, lookup=(lambda: self.cache.get(key)) if self.cache else None)
+        if not requested:
+            self._add_usage(usage, coalesced_calls=1)
+        return content
+    
+    def _request_completion(self, messages: List[Dict], temperature: float, max_tokens: int,
+                            key: Optional[str], usage: Optional[Dict] = None) -> str:
+        """Send one chat completion request within the rate limits and cache its answer under key"""
+        def send():
+            return self.client.chat.completions.create(
+                model=self.deployment_name,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+        
+        if self.rate_limiter:
+            estimated = self._estimate_tokens(messages, max_tokens)
+            response = self.rate_limiter.call(send, estimated, self.priority)
+            response_usage = getattr(response, 'usage', None)
+            self.rate_limiter.settle(estimated, response_usage.total_tokens if response_usage else None)
+        else:
+            response = send()
+        self._record_usage(response, usage)
+        
+        content = response.choices[0].message.content
+        if self.cache and key and content:
+            self.cache.set(key, content)
+        return content
+    
+    def _stream_completion(self, messages: List[Dict], temperature: float, max_tokens: int,
+                           use_cache: bool = True) -> Iterator[str]:
+        """
+        Yield chat completion content as it is generated. Cached answers
+        arrive as one piece; a stream that runs to the end is cached.
+        """
+        key = None
+        if self.cache:
+            key = self.cache.make_key(self.deployment_name, messages, temperature, max_tokens)
+            cached = self.cache.get(key) if use_cache else None
+            if cached is not None:
+                self._add_usage(None, cached_calls=1)
+                yield cached
+                return
+        
+        def send():
+            return self.client.chat.completions.create(
+                model=self.deployment_name,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+        
+        if self.rate_limiter:
+            stream = self.rate_limiter.call(send, self._estimate_tokens(messages, max_tokens), self.priority)
+        else:
+            stream = send()
+        
+        parts = []
+        try:
+            for chunk in stream:
+                if not chunk.choices:  # Azure sends content filter results in a chunk of their own
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        finally:
+            stream.close()  # release the connection if the client went away mid-stream
+        
+        self._record_usage(None)  # streamed responses carry no token usage on this API version
+        content = ''.join(parts)
+        if key and content:
+            self.cache.set(key, content)
+    
+    @staticmethod
+    def _estimate_tokens(messages: List[Dict], max_tokens: int) -> int:
+        """Tokens a request may use, for the rate limiter (about four characters per prompt token)"""
+        return sum(len(message['content']) for message in messages) // 4 + max_tokens
+    
+    def _record_usage(self, response, usage: Optional[Dict] = None):
+        """Add a response's token usage to the running totals (and to usage, if given)"""
+        tokens = getattr(response, 'usage', None)
+        self._add_usage(usage, calls=1, **({
+            'prompt_tokens': tokens.prompt_tokens or 0,
+            'completion_tokens': tokens.completion_tokens or 0,
+            'total_tokens': tokens.total_tokens or 0
+        } if tokens else {}))
+    
+    def _add_usage(self, usage: Optional[Dict], **counts):
+        """Add counts to the running totals and to a caller's own usage dict"""
+        with self._usage_lock:
+            for target in (self.usage, usage) if usage is not None else (self.usage,):
+                for key, count in counts.items():
+                    target[key] = target.get(key, 0) + count
+    
+    def _extract_contract_metadata(self, text: str, raise_errors: bool = False) -> Dict:
         """Extract basic contract information"""
         prompt = """
         Extract the following information from the contract text:
@@ -65,8 +316,7 @@ class AIService:
         """
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.deployment_name,
+            result = self._create_completion(
                 messages=[
                     {"role": "system", "content": "You are a contract analysis expert. Extract information accurately and return valid JSON."},
                     {"role": "user", "content": prompt.format(text=text[:4000])}  # Limit text length
@@ -75,7 +325,6 @@ class AIService:
                 max_tokens=500
             )
             
-            result = response.choices[0].message.content
             # Extract JSON from response
             json_match = re.search(r'\{.*\}', result, re.DOTALL)
             if json_match:
@@ -84,12 +333,75 @@ class AIService:
             
         except Exception as e:
             print(f"Metadata extraction error: {e}")
+            if raise_errors:
+                raise
             return {}
     
-    def _detect_clauses(self, text: str) -> List[Dict]:
-        """Detect and categorize important clauses"""
+    def _detect_clauses(self, text: str, raise_errors: bool = False, stats: Optional[Dict] = None,
+                        page_starts: Optional[List[int]] = None) -> List[Dict]:
+        """
+        Detect and categorize important clauses across the whole contract:
+        section-aware chunks are analyzed concurrently (map), then the
+        per-chunk clauses are deduplicated and ranked by risk (reduce).
+        With clause_rules, literal references are classified locally and
+        only the spans with other clause keywords are sent, packed into
+        excerpts; without a client the rules alone produce the clauses.
+        Chunk count and token usage are written to stats when given.
+        """
+        usage = dict.fromkeys(self.usage, 0)  # only this detection's calls, not concurrent steps'
+        local_clauses = []
+        rule_stats = {}
+        if self.clause_rules:
+            started = time.perf_counter()
+            spans = self.clause_rules.scan(text, page_starts)
+            local_clauses = self.clause_rules.clauses(text, spans, include_ambiguous=not self.client)
+            ambiguous = [span for span in spans if span['ambiguous']]
+            # No more spans per excerpt than the model is asked to return, so none are crowded out
+            chunks = self.clause_rules.excerpts(text, ambiguous, self.chunk_chars, self.MAX_CHUNK_CLAUSES) \
+                if self.client else []
+            rule_stats = {
+                'rule_clauses': len(local_clauses),
+                'ambiguous_spans': len(ambiguous),
+                'sent_chars': sum(len(chunk['text']) for chunk in chunks),
+                'rules_ms': round((time.perf_counter() - started) * 1000, 2)
+            }
+        elif self.client:
+            chunks = chunk_text(text, self.chunk_chars, self.chunk_overlap)
+        else:
+            chunks = []
+        failed = []
+        
+        def detect(chunk):
+            try:
+                return self._detect_chunk_clauses(chunk, len(chunks), usage)
+            except Exception as e:
+                print(f"Clause detection error in chunk {chunk['index'] + 1}/{len(chunks)}: {e}")
+                failed.append(chunk['index'])
+                if raise_errors:
+                    raise
+                return []
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, max(1, len(chunks)))) as executor:
+            chunk_clauses = [local_clauses] + list(executor.map(detect, chunks))
+        
+        clauses = self._merge_clauses(chunk_clauses)
+        
+        if stats is not None:
+            stats.update({
+                'chunks': len(chunks),
+                'failed_chunks': len(failed),
+                'clauses_found': sum(len(found) for found in chunk_clauses),
+                'clauses_kept': len(clauses),
+                'usage': usage,
+                **rule_stats
+            })
+        return clauses
+    
+    def _detect_chunk_clauses(self, chunk: Dict, chunk_count: int, usage: Optional[Dict] = None) -> List[Dict]:
+        """Detect clauses in one chunk of the contract"""
         prompt = """
-        Analyze the contract and identify important clauses. For each clause found, provide:
+        Analyze this excerpt (part {part} of {parts}, starting in section "{heading}") of a contract
+        and identify important clauses. For each clause found, provide:
         1. clause_type: One of ['regulatory', 'financial', 'penalty', 'renewal', 'termination', 'liability', 'warranty', 'confidentiality', 'other']
         2. clause_subtype: For regulatory, specify the standard (ISO, FDA, GDP, GMP, etc.)
         3. title: Brief title for the clause
@@ -108,41 +420,84 @@ class AIService:
         - Renewal and termination conditions
         - Liability and warranty terms
         
-        Return as JSON array. Maximum 20 most important clauses.
+        Return as JSON array (empty if the excerpt has no important clauses). Maximum {max_clauses} most important clauses.
         
-        Contract text:
+        Contract excerpt:
         {text}
         """
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.deployment_name,
-                messages=[
-                    {"role": "system", "content": "You are a legal contract analyst specializing in compliance. Identify and analyze contract clauses accurately."},
-                    {"role": "user", "content": prompt.format(text=text[:6000])}
-                ],
-                temperature=0.1,
-                max_tokens=3000
-            )
-            
-            result = response.choices[0].message.content
-            # Extract JSON array from response
-            json_match = re.search(r'\[.*\]', result, re.DOTALL)
-            if json_match:
-                clauses = json.loads(json_match.group())
-                # Ensure all clauses have required fields
-                for clause in clauses:
-                    clause.setdefault('clause_type', 'other')
-                    clause.setdefault('risk_assessment', 'medium')
-                    clause.setdefault('action_required', False)
-                return clauses
-            return []
-            
-        except Exception as e:
-            print(f"Clause detection error: {e}")
+        result = self._create_completion(
+            messages=[
+                {"role": "system", "content": "You are a legal contract analyst specializing in compliance. Identify and analyze contract clauses accurately."},
+                {"role": "user", "content": prompt.format(
+                    part=chunk['index'] + 1, parts=chunk_count, heading=chunk['heading'], text=chunk['text'],
+                    max_clauses=self.MAX_CHUNK_CLAUSES
+                )}
+            ],
+            temperature=0.1,
+            max_tokens=3000,
+            usage=usage
+        )
+        
+        # Extract JSON array from response
+        json_match = re.search(r'\[.*\]', result, re.DOTALL)
+        if not json_match:
             return []
+        
+        clauses = [clause for clause in json.loads(json_match.group()) if isinstance(clause, dict)]
+        # Ensure all clauses have required fields
+        for clause in clauses:
+            clause.setdefault('clause_type', 'other')
+            clause.setdefault('risk_assessment', 'medium')
+            clause.setdefault('action_required', False)
+        return clauses
+    
+    def _merge_clauses(self, chunk_clauses: List[List[Dict]]) -> List[Dict]:
+        """
+        Deduplicate clauses found in several chunks (overlapping boundaries
+        repeat text) keeping the higher-risk copy, then keep the max_clauses
+        riskiest, in document order within each risk level.
+        """
+        merged = []
+        seen = {}  # dedup key -> position in merged
+        
+        for clause in (clause for clauses in chunk_clauses for clause in clauses):
+            keys = self._clause_keys(clause)
+            position = next((seen[key] for key in keys if key in seen), None)
+            if position is None:
+                for key in keys:
+                    seen[key] = len(merged)
+                merged.append(clause)
+            elif self._risk_order(clause) < self._risk_order(merged[position]):
+                merged[position] = clause
+                for key in keys:
+                    seen.setdefault(key, position)
+        
+        ranked = sorted(
+            enumerate(merged),
+            key=lambda item: (self._risk_order(item[1]), not item[1].get('action_required'), item[0])
+        )
+        return [clause for _, clause in ranked[:self.max_clauses]]
+    
+    def _clause_keys(self, clause: Dict) -> List[str]:
+        """Normalized title and content fingerprints used to spot the same clause twice"""
+        keys = []
+        title = re.sub(r'[^a-z0-9]+', ' ', str(clause.get('title') or '').lower()).strip()
+        if title:
+            keys.append(f"title:{clause.get('clause_type')}:{title}")
+        content = re.sub(r'[^a-z0-9]+', '', str(clause.get('content') or '').lower())
+        if len(content) >= 40:
+            if clause.get('source') == 'rules':
+                # Different references quoted from the same text are different clauses
+                keys.append(f"content:{clause.get('clause_subtype')}:{title}:{content[:200]}")
+            else:
+                keys.append(f'content:{content[:200]}')
+        return keys
+    
+    def _risk_order(self, clause: Dict) -> int:
+        return RISK_RANK.get(clause.get('risk_assessment'), 1)
     
-    def _assess_contract_risk(self, clauses: List[Dict]) -> Dict:
+    def assess_contract_risk(self, clauses: List[Dict]) -> Dict:
         """Assess overall contract risk based on detected clauses"""
         if not clauses:
             return {
@@ -188,11 +543,39 @@ class AIService:
             'medium_risk_clauses': medium_risk_count
         }
     
-    def answer_contract_question(self, contract_text: str, question: str) -> str:
-        """Answer natural language questions about a contract"""
+    def answer_contract_question(self, contract_text: str, question: str,
+                                 index: Optional[LexicalIndex] = None, top_k: int = 4) -> str:
+        """
+        Answer natural language questions about a contract. With an index,
+        the prompt carries the top_k chunks most relevant to the question
+        instead of the start of the contract.
+        """
         if not self.client:
             return "AI service not configured"
         
+        try:
+            content = self._create_completion(
+                messages=self._question_messages(contract_text, question, index, top_k),
+                temperature=0.1,
+                max_tokens=500
+            )
+            
+            return content
+            
+        except Exception as e:
+            return f"Error processing question: {str(e)}"
+    
+    def stream_contract_answer(self, contract_text: str, question: str,
+                               index: Optional[LexicalIndex] = None, top_k: int = 4) -> Iterator[str]:
+        """Yield the answer to a question as it is generated; raises on failure"""
+        if not self.client:
+            raise RuntimeError("AI service not configured")
+        messages = self._question_messages(contract_text, question, index, top_k)
+        yield from self._stream_completion(messages, temperature=0.1, max_tokens=500)
+    
+    def _question_messages(self, contract_text: str, question: str,
+                           index: Optional[LexicalIndex] = None, top_k: int = 4) -> List[Dict]:
+        """Prompt shared by the plain and streamed answer, so both hit the same cache entry"""
         prompt = """
         Based on the contract text below, answer the following question accurately and concisely.
         If the information is not in the contract, say so clearly.
@@ -202,28 +585,58 @@ class AIService:
         Contract text:
         {text}
         """
+        if index is not None:
+            text = self._relevant_excerpts(contract_text, question, index, top_k)
+        else:
+            text = contract_text[:4000]
+        return [
+            {"role": "system", "content": "You are a contract analysis assistant. Answer questions based solely on the contract text provided."},
+            {"role": "user", "content": prompt.format(question=question, text=text)}
+        ]
+    
+    @staticmethod
+    def _relevant_excerpts(contract_text: str, question: str, index: LexicalIndex, top_k: int) -> str:
+        """The top_k chunks for the question in document order, or the first chunks if nothing matches"""
+        hits = index.search(question, top_k)
+        if hits:
+            spans = sorted((hit['start'], hit['end']) for hit in hits)
+        else:
+            spans = [tuple(chunk) for chunk in index.chunks[:top_k]]
+        return '\n[...]\n'.join(contract_text[start:end].strip() for start, end in spans)
+    
+    def summarize_contract(self, contract_text: str) -> str:
+        """Generate a brief summary of the contract"""
+        if not self.client:
+            return "AI service not configured"
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.deployment_name,
-                messages=[
-                    {"role": "system", "content": "You are a contract analysis assistant. Answer questions based solely on the contract text provided."},
-                    {"role": "user", "content": prompt.format(question=question, text=contract_text[:4000])}
-                ],
+            content = self._create_completion(
+                messages=self._summary_messages(contract_text),
                 temperature=0.1,
-                max_tokens=500
+                max_tokens=300
             )
             
-            return response.choices[0].message.content
+            return content
             
         except Exception as e:
-            return f"Error processing question: {str(e)}"
+            return f"Error generating summary: {str(e)}"
     
-    def summarize_contract(self, contract_text: str) -> str:
-        """Generate a brief summary of the contract"""
+    def generate_summary(self, contract_text: str, use_cache: bool = True) -> str:
+        """Summarize the contract, raising on failure so only real summaries get stored"""
         if not self.client:
-            return "AI service not configured"
-        
+            raise RuntimeError("AI service not configured")
+        return self._create_completion(self._summary_messages(contract_text), temperature=0.1, max_tokens=300,
+                                       use_cache=use_cache)
+    
+    def stream_contract_summary(self, contract_text: str, use_cache: bool = True) -> Iterator[str]:
+        """Yield the contract summary as it is generated; raises on failure"""
+        if not self.client:
+            raise RuntimeError("AI service not configured")
+        yield from self._stream_completion(self._summary_messages(contract_text), temperature=0.1, max_tokens=300,
+                                           use_cache=use_cache)
+    
+    def _summary_messages(self, contract_text: str) -> List[Dict]:
+        """Prompt shared by the plain and streamed summary"""
         prompt = """
         Provide a brief executive summary of this contract (maximum 200 words) covering:
         1. Main parties involved
@@ -235,19 +648,7 @@ class AIService:
         Contract text:
         {text}
         """
-        
-        try:
-            response = self.client.chat.completions.create(
-                model=self.deployment_name,
-                messages=[
-                    {"role": "system", "content": "You are a contract analyst. Provide clear, concise summaries."},
-                    {"role": "user", "content": prompt.format(text=contract_text[:4000])}
-                ],
-                temperature=0.1,
-                max_tokens=300
-            )
-            
-            return response.choices[0].message.content
-            
-        except Exception as e:
-            return f"Error generating summary: {str(e)}"
\ No newline at end of file
+        return [
+            {"role": "system", "content": "You are a contract analyst. Provide clear, concise summaries."},
+            {"role": "user", "content": prompt.format(text=contract_text[:4000])}
+        ]
\ No newline at end of file
@@ -0,0 +1,326 @@
+import re
+from bisect import bisect_right
+from typing import Dict, List, Optional
+from .text_chunking import split_sections
+from .section_index import HEADING
+
+# Sentence ends; a number opening a line ('2. Quality') is a heading, not the end of a sentence
+SENTENCE_END = re.compile(r'(?<!\n\d)(?<!\n\d\d)[.!?](?=\s)')
+
+# Literal references that settle a clause's type on their own; matched spans become clauses without a model call
+CERTAIN_RULES = [
+    {
+        'name': 'iso_13485', 'anchors': ['13485'],
+        'pattern': r'\bISO[ \t/-]*13485\b(?::[ \t]?\d{4})?',
+        'clause_type': 'regulatory', 'clause_subtype': 'ISO', 'risk_assessment': 'medium', 'action_required': True,
+        'title': 'ISO 13485 quality management system',
+        'summary': 'Requires a quality management system for medical devices certified to ISO 13485.',
+        'compliance_requirement': 'Maintain ISO 13485 certification and keep certificates and audit reports available.'
+    },
+    {
+        'name': 'iso_14971', 'anchors': ['14971'],
+        'pattern': r'\bISO[ \t/-]*14971\b(?::[ \t]?\d{4})?',
+        'clause_type': 'regulatory', 'clause_subtype': 'ISO', 'risk_assessment': 'medium', 'action_required': True,
+        'title': 'ISO 14971 risk management',
+        'summary': 'Requires medical device risk management according to ISO 14971.',
+        'compliance_requirement': 'Keep a risk management file covering the supplied products.'
+    },
+    {
+        'name': 'iso_9001', 'anchors': ['9001'],
+        'pattern': r'\bISO[ \t/-]*9001\b(?::[ \t]?\d{4})?',
+        'clause_type': 'regulatory', 'clause_subtype': 'ISO', 'risk_assessment': 'low', 'action_required': False,
+        'title': 'ISO 9001 quality management',
+        'summary': 'Requires a quality management system certified to ISO 9001.',
+        'compliance_requirement': 'Maintain ISO 9001 certification.'
+    },
+    {
+        'name': 'cfr_part_11', 'anchors': ['cfr', 'c.f.r'],
+        'pattern': r'\b21[ \t]*C\.?F\.?R\.?[ \t]*(?:Part[ \t]*)?11\b',
+        'clause_type': 'regulatory', 'clause_subtype': 'FDA', 'risk_assessment': 'high', 'action_required': True,
+        'title': '21 CFR Part 11 electronic records and signatures',
+        'summary': 'Electronic records and signatures must meet FDA 21 CFR Part 11.',
+        'compliance_requirement': 'Use validated systems with audit trails, access controls and compliant electronic signatures.'
+    },
+    {
+        'name': 'cfr_part_820', 'anchors': ['cfr', 'c.f.r'],
+        'pattern': r'\b21[ \t]*C\.?F\.?R\.?[ \t]*(?:Part[ \t]*)?820\b',
+        'clause_type': 'regulatory', 'clause_subtype': 'FDA', 'risk_assessment': 'medium', 'action_required': True,
+        'title': '21 CFR Part 820 quality system regulation',
+        'summary': 'Manufacturing must follow the FDA quality system regulation (21 CFR Part 820).',
+        'compliance_requirement': 'Operate a quality system that meets 21 CFR Part 820 and allow FDA inspection.'
+    },
+    {
+        'name': 'cfr_part_211', 'anchors': ['cfr', 'c.f.r'],
+        'pattern': r'\b21[ \t]*C\.?F\.?R\.?[ \t]*(?:Parts?[ \t]*)?21[01]\b',
+        'clause_type': 'regulatory', 'clause_subtype': 'GMP', 'risk_assessment': 'medium', 'action_required': True,
+        'title': '21 CFR Parts 210/211 current good manufacturing practice',
+        'summary': 'Drug manufacturing must follow FDA current good manufacturing practice (21 CFR Parts 210/211).',
+        'compliance_requirement': 'Manufacture, test and release batches under cGMP.'
+    },
+    {
+        'name': 'gmp_annex_1', 'anchors': ['annex'],
+        'pattern': r'\b(?:EU[ \t]+)?(?:c?GMP|Good[ \t]+Manufacturing[ \t]+Practices?)[ \t]+Annex[ \t]+1\b',
+        'clause_type': 'regulatory', 'clause_subtype': 'GMP', 'risk_assessment': 'high', 'action_required': True,
+        'title': 'EU GMP Annex 1 sterile manufacturing',
+        'summary': 'Sterile products must be manufactured according to EU GMP Annex 1.',
+        'compliance_requirement': 'Keep a contamination control strategy and sterile manufacturing controls per Annex 1.'
+    },
+    {
+        'name': 'eu_gdp', 'anchors': ['gdp', 'good distribution', '2013/c'],
+        'pattern': r'\bEU[ \t]+GDP\b|\bGood[ \t]+Distribution[ \t]+Practices?\b|\bGDP[ \t]+guidelines?\b|\b2013/C[ \t]*343/01\b',
+        'clause_type': 'regulatory', 'clause_subtype': 'GDP', 'risk_assessment': 'medium', 'action_required': True,
+        'title': 'EU Good Distribution Practice',
+        'summary': 'Storage and transport must follow EU Good Distribution Practice.',
+        'compliance_requirement': 'Control and record storage and transport conditions according to EU GDP.'
+    },
+    {
+        'name': 'gmp', 'anchors': ['gmp', 'good manufacturing'],
+        'pattern': r'\bc?GMP\b|\bGood[ \t]+Manufacturing[ \t]+Practices?\b',
+        'clause_type': 'regulatory', 'clause_subtype': 'GMP', 'risk_assessment': 'medium', 'action_required': True,
+        'title': 'Good Manufacturing Practice',
+        'summary': 'Products must be manufactured according to Good Manufacturing Practice.',
+        'compliance_requirement': 'Manufacture and release products under GMP.'
+    },
+    {
+        'name': 'liquidated_damages', 'anchors': ['liquidated'],
+        'pattern': r'\bliquidated[ \t]+damages\b',
+        'clause_type': 'penalty', 'clause_subtype': None, 'risk_assessment': 'high', 'action_required': True,
+        'title': 'Liquidated damages',
+        'summary': 'Sets pre-agreed damages that are owed without proof of the actual loss.',
+        'compliance_requirement': 'Track the events that trigger liquidated damages, such as late delivery.'
+    },
+]
+
+# Keywords that only mark a candidate span; the model decides whether and what kind of clause it is
+AMBIGUOUS_RULES = [
+    {'name': 'penalty', 'clause_type': 'penalty', 'clause_subtype': None,
+     'anchors': ['penalt', 'service credit'],
+     'pattern': r'\bpenalt(?:y|ies)\b|\bservice[ \t]+credits?\b'},
+    {'name': 'liability', 'clause_type': 'liability', 'clause_subtype': None,
+     'anchors': ['liab', 'indemnif', 'consequential'],
+     'pattern': r'\blimitation[ \t]+of[ \t]+liability\b|\bliab(?:le|ility)\b|\bindemnif\w*|\bconsequential[ \t]+damages\b'},
+    {'name': 'termination', 'clause_type': 'termination', 'clause_subtype': None,
+     'anchors': ['terminat'],
+     'pattern': r'\b(?:may|right[ \t]+to|entitled[ \t]+to)[ \t]+terminate\b|\bterminat(?:e|ion[ \t]+of)[ \t]+(?:this|the)[ \t]+'
+                r'(?:agreement|contract)\b|\btermination[ \t]+(?:for|upon|notice)\b|\bnotice[ \t]+of[ \t]+termination\b'},
+    {'name': 'renewal', 'clause_type': 'renewal', 'clause_subtype': None,
+     'anchors': ['renew'],
+     'pattern': r'\b(?:auto(?:matic(?:ally)?)?[ \t-]+)?renew(?:al|als|s|ed)?\b'},
+    {'name': 'warranty', 'clause_type': 'warranty', 'clause_subtype': None,
+     'anchors': ['warrant'],
+     'pattern': r'\bwarrant(?:y|ies|s)\b'},
+    {'name': 'confidentiality', 'clause_type': 'confidentiality', 'clause_subtype': None,
+     'anchors': ['confidential', 'non-disclosure', 'trade secret'],
+     'pattern': r'\bconfidential(?:ity)?\b|\bnon-disclosure\b|\btrade[ \t]+secrets?\b'},
+    {'name': 'financial', 'clause_type': 'financial', 'clause_subtype': None,
+     'anchors': ['payment', 'payable', 'invoice', 'net', 'fee', 'usd', 'eur', 'gbp', 'chf', '$', '€', '£'],
+     'pattern': r'\bpayment[ \t]+terms?\b|\bpayable\b|\binvoice[sd]?\b|\bnet[ \t]+\d{1,3}[ \t]+days\b|\bfees?\b'
+                r'|(?:\b(?:USD|EUR|GBP|CHF)|[$€£])[ \t]?\d'},
+    {'name': 'regulatory', 'clause_type': 'regulatory', 'clause_subtype': None,
+     'anchors': ['fda', 'ema', 'regulatory', 'audit', 'recall', 'iso'],
+     'pattern': r'\bFDA\b|\bEMA\b|\bregulatory\b|\baudit(?:s|ed)?\b|\brecalls?\b|\bISO[ \t]?\d{4,5}\b'},
+]
+
+
+class ClauseRules:
+    """
+    Rule-based clause pre-classifier. Every rule lists literal anchors, at
+    least one of which occurs in any text its pattern matches. The text is
+    searched once per anchor (a C-speed substring search) and a rule's
+    compiled pattern only runs in a small window around its anchors' hits,
+    so a 100-page contract takes milliseconds where one big alternation
+    would be tried at every offset. Each match is widened to its paragraph
+    (or sentence, for long paragraphs). Literal references (ISO 13485,
+    21 CFR Part 11, EU GDP, GMP Annex 1, liquidated damages, ...) become
+    clauses directly, each quoting the sentence around its match; spans
+    with other clause keywords are the only text the model still needs to
+    read.
+    """
+
+    WINDOW = 40  # characters a match can extend before or after its anchor
+
+    def __init__(self, max_span_chars: int = 600):
+        self.max_span_chars = max_span_chars
+        # Certain rules come first so a literal reference wins over a keyword at the same offset
+        self.rules = {rule['name']: dict(rule, certain=True) for rule in CERTAIN_RULES}
+        self.rules.update({rule['name']: dict(rule, certain=False) for rule in AMBIGUOUS_RULES})
+        self.order = {name: position for position, name in enumerate(self.rules)}
+        self.patterns = {name: re.compile(rule['pattern'], re.IGNORECASE) for name, rule in self.rules.items()}
+        self.anchors = {}  # anchor -> rules it can start a match for
+        for name, rule in self.rules.items():
+            for anchor in rule['anchors']:
+                self.anchors.setdefault(anchor, []).append(name)
+
+    def scan(self, text: str, page_starts: Optional[List[int]] = None) -> List[Dict]:
+        """
+        Candidate spans in document order, each with start/end offsets, page
+        number (when page_starts, the offset of each page in text, is given),
+        the certain and ambiguous rules that matched in it, and the terms found.
+        """
+        spans = {}
+        for start, end, name in self._matches(text):
+            low, high = self._span(text, start, end)
+            span = spans.get((low, high))
+            if span is None:
+                span = spans[(low, high)] = {
+                    'start': low,
+                    'end': high,
+                    'page_number': bisect_right(page_starts, low) if page_starts else None,
+                    'certain': [],
+                    'ambiguous': [],
+                    'terms': [],
+                    'matches': []  # (start, end, rule) of each match in the span
+                }
+            kind = 'certain' if self.rules[name]['certain'] else 'ambiguous'
+            if name not in span[kind]:
+                span[kind].append(name)
+            span['terms'].append(text[start:end])
+            span['matches'].append((start, end, name))
+        return sorted(spans.values(), key=lambda span: span['start'])
+
+    def clauses(self, text: str, spans: List[Dict], include_ambiguous: bool = False) -> List[Dict]:
+        """
+        Clause records for the literal references in spans, in the shape the
+        model returns. include_ambiguous also turns keyword-only spans into
+        clauses of the keyword's type, for when no model is available.
+        """
+        clauses = []
+        for span in spans:
+            names = span['certain'] or (span['ambiguous'][:1] if include_ambiguous else [])
+            for name in names:
+                rule = self.rules[name]
+                # Each clause quotes the sentence around its own match, not the whole span it shares
+                start, end = next((start, end) for start, end, match in span['matches'] if match == name)
+                low, high = self._sentence(text, span, start, end)
+                content = text[low:high][:500]
+                clauses.append({
+                    'clause_type': rule['clause_type'],
+                    'clause_subtype': rule['clause_subtype'],
+                    'title': rule.get('title') or self._title(rule, content),
+                    'content': content,
+                    'summary': rule.get('summary'),
+                    'compliance_requirement': rule.get('compliance_requirement'),
+                    'risk_assessment': rule.get('risk_assessment', 'medium'),
+                    'action_required': rule.get('action_required', False),
+                    'penalty_trigger': content if rule['clause_type'] == 'penalty' else None,
+                    'page_number': span['page_number'],
+                    'offset': low,
+                    'match_offset': start,  # where the reference itself is, for the section it is in
+                    'source': 'rules'
+                })
+        return clauses
+
+    def excerpts(self, text: str, spans: List[Dict], max_chars: int = 6000,
+                 max_spans: Optional[int] = None) -> List[Dict]:
+        """
+        Pack the spans that still need the model into excerpts of at most
+        max_chars and max_spans spans, shaped like text_chunking chunks
+        (index, start, end, heading, text); spans within an excerpt are
+        joined with '[...]'.
+        """
+        ranges = []  # [start, end, spans merged into the range]
+        for span in spans:
+            if ranges and span['start'] <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], span['end'])
+                ranges[-1][2] += 1
+            else:
+                ranges.append([span['start'], span['end'], 1])
+
+        sections = split_sections(text)
+        section_starts = [section['start'] for section in sections]
+        separator = '\n[...]\n'
+
+        excerpts, packed = [], 0  # packed: spans in the last excerpt
+        for start, end, count in ranges:
+            piece = text[start:end]
+            if excerpts and len(excerpts[-1]['text']) + len(separator) + len(piece) <= max_chars \
+                    and (max_spans is None or packed + count <= max_spans):
+                excerpts[-1]['text'] += separator + piece
+                excerpts[-1]['end'] = end
+                packed += count
+                continue
+            packed = count
+            section = sections[max(0, bisect_right(section_starts, start) - 1)] if sections else None
+            excerpts.append({
+                'index': len(excerpts),
+                'start': start,
+                'end': end,
+                'heading': section['heading'] if section else '',
+                'text': piece
+            })
+        return excerpts
+
+    @staticmethod
+    def _title(rule: Dict, content: str) -> str:
+        """Title of a keyword-only clause: its type and opening words, so separate clauses stay apart"""
+        words = content.split()
+        opening = ' '.join(words[:8]) + (' ...' if len(words) > 8 else '')
+        return f"{rule['clause_type'].capitalize()}: {opening}"
+
+    def _matches(self, text: str) -> List[tuple]:
+        """Non-overlapping (start, end, rule) matches in document order"""
+        lowered = text.lower()
+        found = set()
+        if len(lowered) != len(text):  # a character lower-cased to two, so offsets would not line up
+            for name, pattern in self.patterns.items():
+                found.update((match.start(), match.end(), name) for match in pattern.finditer(text))
+        else:
+            for anchor, names in self.anchors.items():
+                position = lowered.find(anchor)
+                while position != -1:
+                    low = max(0, position - self.WINDOW)
+                    high = min(len(text), position + len(anchor) + self.WINDOW)
+                    while high < len(text) and (text[high].isalnum() or text[high] == '_'):
+                        high += 1  # do not cut a word, so a trailing \b sees its real end
+                    for name in names:
+                        for match in self.patterns[name].finditer(text, low, high):
+                            found.add((match.start(), match.end(), name))
+                    position = lowered.find(anchor, position + 1)
+
+        matches, last_end = [], 0
+        for start, end, name in sorted(found, key=lambda match: (match[0], self.order[match[2]], -match[1])):
+            if start >= last_end:
+                matches.append((start, end, name))
+                last_end = end
+        return matches
+
+    def _sentence(self, text: str, span: Dict, start: int, end: int) -> tuple:
+        """The sentence around a match, within its span and at most max_span_chars long"""
+        half = self.max_span_chars // 2
+        low = max(span['start'], start - half)
+        high = min(span['end'], end + half)
+        headings = [match.end() for match in HEADING.finditer(text, low, start) if match.end() <= start]
+        if headings:
+            low = headings[-1]  # start after a heading line such as '2. Quality'
+        previous = [match.end() for match in SENTENCE_END.finditer(text, low, start)]
+        if previous:
+            low = previous[-1]
+        following = SENTENCE_END.search(text, end, high)
+        if following:
+            high = following.end()
+        while low < start and text[low].isspace():
+            low += 1
+        return low, high
+
+    def _span(self, text: str, start: int, end: int) -> tuple:
+        """The paragraph around a match, narrowed to the surrounding sentences if it is too long"""
+        low = text.rfind('\n\n', 0, start)
+        low = 0 if low == -1 else low + 2
+        high = text.find('\n\n', end)
+        high = len(text) if high == -1 else high
+
+        if high - low > self.max_span_chars:
+            half = self.max_span_chars // 2
+            low, high = max(low, start - half), min(high, end + half)
+            cut = max(text.rfind('. ', low, start), text.rfind('\n', low, start))
+            if cut != -1:
+                low = cut + 1
+            cut = text.find('. ', end, high)
+            if cut != -1:
+                high = cut + 1
+
+        while low < start and text[low].isspace():
+            low += 1
+        while high > end and text[high - 1].isspace():
+            high -= 1
+        return low, high
@@ -0,0 +1,181 @@
+import hashlib
+from typing import Dict, List, Optional, Type
+from PyPDF2 import PdfReader
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # Optional, faster text-layer extraction
+    pdfium = None
+
+try:
+    from pdfminer.high_level import extract_pages as pdfminer_extract_pages
+    from pdfminer.layout import LTTextContainer
+except ImportError:  # Optional, layout-aware text-layer extraction
+    pdfminer_extract_pages = None
+
+try:
+    import pytesseract
+except ImportError:  # Optional, local OCR engine
+    pytesseract = None
+
+
+BACKENDS: Dict[str, Type['ExtractionBackend']] = {}
+
+
+def register_backend(cls):
+    """Make a backend selectable by its name in configuration"""
+    BACKENDS[cls.name] = cls
+    return cls
+
+
+def get_backend(name: str, service) -> 'ExtractionBackend':
+    """Instantiate a registered backend for an OCRService"""
+    if name not in BACKENDS:
+        raise ValueError(f'Unknown text extraction backend: {name}')
+    return BACKENDS[name](service)
+
+
+class ExtractionBackend:
+    """
+    A text extraction engine. 'text' backends read the PDF text layer,
+    'ocr' backends recognise rendered page images. Both return page dicts
+    with page_number, text and method (the backend name).
+    """
+    name = None
+    kind = 'text'
+
+    def __init__(self, service):
+        # The OCRService supplies rendering, concurrency and cache settings
+        self.service = service
+
+    def available(self) -> bool:
+        """Whether the engine's libraries and credentials are present"""
+        return True
+
+    def extract_pages(self, pdf_path: str, page_numbers: Optional[List[int]] = None) -> List[Dict]:
+        """Extract the given 1-based pages, or every page when page_numbers is None"""
+        raise NotImplementedError
+
+    def _page_numbers(self, pdf_path: str, page_numbers: Optional[List[int]]) -> List[int]:
+        if page_numbers is None:
+            return list(range(1, len(PdfReader(pdf_path).pages) + 1))
+        return page_numbers
+
+    def _pages(self, page_numbers: List[int], texts: List[str]) -> List[Dict]:
+        return [
+            {'page_number': page_number, 'text': text, 'method': self.name}
+            for page_number, text in zip(page_numbers, texts)
+        ]
+
+
+@register_backend
+class PyPDF2Backend(ExtractionBackend):
+    name = 'pypdf2'
+
+    def extract_pages(self, pdf_path, page_numbers=None):
+        _, pages = self.service._extract_with_pypdf2(pdf_path)
+        if page_numbers is not None:
+            wanted = set(page_numbers)
+            pages = [page for page in pages if page['page_number'] in wanted]
+        for page in pages:
+            page['method'] = self.name
+        return pages
+
+
+@register_backend
+class PdfiumBackend(ExtractionBackend):
+    name = 'pdfium'
+
+    def available(self):
+        return pdfium is not None
+
+    def extract_pages(self, pdf_path, page_numbers=None):
+        texts = []
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            if page_numbers is None:
+                page_numbers = list(range(1, len(pdf) + 1))
+            for page_number in page_numbers:
+                page = pdf[page_number - 1]
+                text_page = page.get_textpage()
+                texts.append(text_page.get_text_range().replace('\r\n', '\n'))
+                text_page.close()
+                page.close()
+        finally:
+            pdf.close()
+        return self._pages(page_numbers, texts)
+
+
+@register_backend
+class PdfMinerBackend(ExtractionBackend):
+    name = 'pdfminer'
+
+    def available(self):
+        return pdfminer_extract_pages is not None
+
+    def extract_pages(self, pdf_path, page_numbers=None):
+        page_numbers = self._page_numbers(pdf_path, page_numbers)
+        # pdfminer yields the selected pages in document order
+        layouts = pdfminer_extract_pages(pdf_path, page_numbers=[n - 1 for n in sorted(page_numbers)])
+        texts_by_page = {
+            page_number: ''.join(element.get_text() for element in layout if isinstance(element, LTTextContainer))
+            for page_number, layout in zip(sorted(page_numbers), layouts)
+        }
+        return self._pages(page_numbers, [texts_by_page.get(n, '') for n in page_numbers])
+
+
+@register_backend
+class TesseractBackend(ExtractionBackend):
+    name = 'tesseract'
+    kind = 'ocr'
+
+    def available(self):
+        if pytesseract is None:
+            return False
+        try:
+            pytesseract.get_tesseract_version()  # Fails when the tesseract binary is missing
+            return True
+        except Exception:
+            return False
+
+    def extract_pages(self, pdf_path, page_numbers=None):
+        page_numbers = self._page_numbers(pdf_path, page_numbers)
+        engine_version = f'tesseract-{pytesseract.get_tesseract_version()}'
+        cache = self.service.cache
+        texts = []
+
+        # Pages are rendered a window at a time under the service's memory cap
+        for image in self.service._iter_pdf_images(pdf_path, page_numbers):
+            key = None
+            if cache:
+                key = cache.make_key(hashlib.sha256(image.tobytes()).digest(), self.service.dpi, engine_version)
+                cached = cache.get(key)
+                if cached is not None:
+                    texts.append(cached)
+                    continue
+
+            try:
+                text = pytesseract.image_to_string(image)
+            except Exception as e:
+                print(f"Tesseract OCR error: {e}")
+                text = ''
+            del image
+
+            if cache and text.strip():
+                cache.put(key, text)
+            texts.append(text)
+
+        return self._pages(page_numbers, texts)
+
+
+@register_backend
+class AzureReadBackend(ExtractionBackend):
+    name = 'azure_ocr'
+    kind = 'ocr'
+
+    def available(self):
+        return self.service.client is not None
+
+    def extract_pages(self, pdf_path, page_numbers=None):
+        _, pages = self.service._extract_with_azure_ocr(pdf_path, page_numbers)
+        return pages
@@ -0,0 +1,259 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import redis
+except ImportError:  # Redis is optional; the in-process or SQLite backend is used without it
+    redis = None
+
+
+class MemoryCacheBackend:
+    """In-process LRU dict; each worker process has its own copy"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: str, ttl: int):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def entries(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """Cache file shared by all worker processes on one host"""
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS llm_cache ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)')
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per call keeps the cache safe across threads and processes
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute('SELECT value, expires_at FROM llm_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                conn.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+                return None
+            conn.execute('UPDATE llm_cache SET last_access = ? WHERE key = ?', (now, key))
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: int):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)',
+                (key, value, now + ttl, now)
+            )
+            conn.execute('DELETE FROM llm_cache WHERE expires_at < ?', (now,))
+            excess = conn.execute('SELECT COUNT(*) FROM llm_cache').fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    'DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access LIMIT ?)',
+                    (excess,)
+                )
+                self.evictions += excess
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM llm_cache')
+
+    def entries(self) -> int:
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM llm_cache').fetchone()[0]
+
+
+class RedisCacheBackend:
+    """
+    Cache shared by every process using the same Redis. Entries expire
+    through Redis TTLs; a sorted set of access times enforces max_entries.
+    """
+
+    PREFIX = 'llm-cache:'
+    INDEX = 'llm-cache-index'
+
+    def __init__(self, url: str, max_entries: int):
+        self.client = redis.Redis.from_url(url)
+        self.max_entries = max_entries
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self.PREFIX + key)
+        if value is None:
+            return None
+        self.client.zadd(self.INDEX, {key: time.time()})
+        return value.decode('utf-8')
+
+    def set(self, key: str, value: str, ttl: int):
+        pipe = self.client.pipeline()
+        pipe.setex(self.PREFIX + key, ttl, value)
+        pipe.zadd(self.INDEX, {key: time.time()})
+        pipe.zcard(self.INDEX)
+        excess = pipe.execute()[-1] - self.max_entries
+        if excess > 0:
+            oldest = self.client.zrange(self.INDEX, 0, excess - 1)
+            pipe = self.client.pipeline()
+            pipe.delete(*[self.PREFIX + k.decode('utf-8') for k in oldest])
+            pipe.zrem(self.INDEX, *oldest)
+            pipe.execute()
+            self.evictions += len(oldest)
+
+    def clear(self):
+        keys = [self.PREFIX + k.decode('utf-8') for k in self.client.zrange(self.INDEX, 0, -1)]
+        if keys:
+            self.client.delete(*keys)
+        self.client.delete(self.INDEX)
+
+    def entries(self) -> int:
+        return self.client.zcard(self.INDEX)
+
+
+class LLMCache:
+    """
+    Response cache for chat completions keyed by a hash of the deployment,
+    messages, temperature and max_tokens. Entries live for LLM_CACHE_TTL
+    seconds and the least recently used are dropped beyond
+    LLM_CACHE_MAX_ENTRIES. LLM_CACHE_BACKEND selects 'memory', 'sqlite',
+    'redis' (REDIS_URL) or 'none'.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.backend_name = 'none'
+        self.ttl = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.backend_name = app.config.get('LLM_CACHE_BACKEND', 'memory')
+        self.ttl = app.config.get('LLM_CACHE_TTL', 86400)
+        max_entries = app.config.get('LLM_CACHE_MAX_ENTRIES', 1000)
+
+        if self.backend_name == 'redis' and redis is None:
+            print("redis is not installed, falling back to in-process LLM cache")
+            self.backend_name = 'memory'
+
+        if self.backend_name == 'redis':
+            self.backend = RedisCacheBackend(app.config['REDIS_URL'], max_entries)
+        elif self.backend_name == 'sqlite':
+            self.backend = SQLiteCacheBackend(app.config['LLM_CACHE_PATH'], max_entries)
+        elif self.backend_name == 'memory':
+            self.backend = MemoryCacheBackend(max_entries)
+        else:
+            self.backend = None
+
+        app.extensions['llm_cache'] = self
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def make_key(deployment: str, messages: List[Dict], temperature: float, max_tokens: int) -> str:
+        """Hash of everything that determines the model's answer"""
+        payload = json.dumps(
+            {'deployment': deployment, 'messages': messages, 'temperature': temperature, 'max_tokens': max_tokens},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response content, or None on a miss. Backend errors count as misses."""
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            print(f"LLM cache read error: {e}")
+            value = None
+            with self._lock:
+                self.errors += 1
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str):
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            print(f"LLM cache write error: {e}")
+            with self._lock:
+                self.errors += 1
+
+    def clear(self):
+        if self.backend:
+            self.backend.clear()
+
+    def stats(self) -> Dict[str, any]:
+        """Hit-rate counters for this process and the backend size"""
+        try:
+            entries = self.backend.entries() if self.backend else 0
+        except Exception:
+            entries = None
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.backend_name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'errors': self.errors,
+            'evictions': getattr(self.backend, 'evictions', 0),
+            'entries': entries,
+            'ttl_seconds': self.ttl
+        }
@@ -0,0 +1,333 @@
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from dateutil import parser as date_parser
+from dateutil.relativedelta import relativedelta
+
+MONTH = r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?'
+
+# Every date form ends in a four-digit year, which is what the scan looks for first
+YEAR = re.compile(r'(?:19|20)\d\d(?!\d)')
+DATE = re.compile(
+    r'(?P<iso>\b\d{4}-\d{1,2}-\d{1,2}\b)'
+    r'|(?P<numeric>\b\d{1,2}[./-]\d{1,2}[./-]\d{4}\b)'
+    rf'|(?P<dmy>\b\d{{1,2}}(?:st|nd|rd|th)?(?:\s+day\s+of)?\s+{MONTH},?\s+\d{{4}}\b)'
+    rf'|(?P<mdy>\b{MONTH}\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}\b)',
+    re.IGNORECASE
+)
+
+AMOUNT = r"\d{1,3}(?:[,.' \u00a0]\d{3})+(?:[.,]\d{1,2})?|\d+(?:[.,]\d{1,2})?"
+SCALE = r'million|mio\.?|m|thousand|k|billion|bn'
+MONEY = re.compile(
+    rf'(?P<prefix>US\$|USD|EUR|GBP|CHF|\$|€|£)\s?(?P<amount>{AMOUNT})(?:\s?(?P<scale>{SCALE})\b)?'
+    rf'|(?P<amount2>{AMOUNT})(?:\s?(?P<scale2>{SCALE})\b)?\s?(?P<suffix>USD|EUR|GBP|CHF|€|dollars|euros?|pounds)\b',
+    re.IGNORECASE
+)
+MONEY_ANCHORS = ['$', '€', '£', 'usd', 'eur', 'gbp', 'chf', 'dollar', 'pound']
+
+TERM = re.compile(
+    r'\b(?:term|period)\s+of\s+(?:(?P<word>[a-z]+(?:[ -][a-z]+)?)\s+)?(?:\((?P<digits>\d{1,3})\)\s+)?'
+    r'(?P<number>\d{1,3}\s+)?(?P<unit>years?|months?)\b',
+    re.IGNORECASE
+)
+NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7, 'eight': 8, 'nine': 9,
+    'ten': 10, 'eleven': 11, 'twelve': 12, 'eighteen': 18, 'twenty-four': 24, 'twenty four': 24,
+    'thirty-six': 36, 'thirty six': 36
+}
+
+CURRENCIES = {
+    'us$': 'USD', 'usd': 'USD', '$': 'USD', 'dollars': 'USD', 'eur': 'EUR', '€': 'EUR', 'euro': 'EUR',
+    'euros': 'EUR', 'gbp': 'GBP', '£': 'GBP', 'pounds': 'GBP', 'chf': 'CHF'
+}
+SCALES = {'k': 1e3, 'thousand': 1e3, 'm': 1e6, 'mio': 1e6, 'mio.': 1e6, 'million': 1e6, 'bn': 1e9, 'billion': 1e9}
+
+# Words before (or, quoted as a defined term, right after) a date that say what it is, with their weight
+DATE_CUES = {
+    'start_date': [
+        ('effective date', 0.95), ('commencement date', 0.95), ('start date', 0.9), ('effective as of', 0.9),
+        ('effective from', 0.9), ('effective on', 0.9), ('commenc', 0.85), ('entered into', 0.75),
+        ('dated as of', 0.7), ('as of', 0.6)
+    ],
+    'end_date': [
+        ('expiration date', 0.95), ('expiry date', 0.95), ('end date', 0.9), ('expire', 0.9), ('expiry', 0.9),
+        ('ending on', 0.85), ('terminate on', 0.85), ('in force until', 0.85), ('until', 0.7),
+        ('through', 0.6)
+    ],
+    'renewal_date': [('renewal date', 0.95), ('renew', 0.8), ('extended until', 0.8), ('extended to', 0.75)]
+}
+# Words before an amount that make it the contract's total value, and words that make it something else
+VALUE_CUES = [
+    ('total contract value', 0.95), ('contract value', 0.9), ('total value', 0.9), ('total consideration', 0.9),
+    ('contract price', 0.9), ('not to exceed', 0.85), ('not exceed', 0.85), ('total price', 0.85), ('aggregate', 0.8), ('total fee', 0.8),
+    ('annual fee', 0.6), ('fee', 0.5), ('price', 0.5)
+]
+NOT_VALUE_CUES = [
+    'liquidated damages', 'penalt', 'insurance', 'liabilit', 'per day', 'per week', 'per unit', 'per hour',
+    'per batch', 'deductible', 'service credit'
+]
+
+CONTEXT_CHARS = 150  # characters before a date or amount searched for cues
+
+
+def parse_date(value) -> Optional[date]:
+    """A date from an ISO string, a date or datetime, or a written date; None if it cannot be read"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return datetime.strptime(value.strip(), '%Y-%m-%d').date()
+    except ValueError:
+        pass
+    try:
+        return date_parser.parse(re.sub(r'\bday\s+of\b', ' ', value, flags=re.IGNORECASE)).date()
+    except (ValueError, OverflowError):
+        return None
+
+
+def parse_amount(value) -> Optional[float]:
+    """A number from 250000, '250,000.00', '1.250.000,50', 'EUR 2.5 million' and the like; None if unreadable"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not value or not isinstance(value, str):
+        return None
+    match = re.search(rf'({AMOUNT})(?:\s?({SCALE})\b)?', value, re.IGNORECASE)
+    if not match:
+        return None
+    number = _parse_number(match.group(1))
+    if number is None:
+        return None
+    return number * SCALES.get((match.group(2) or '').lower(), 1)
+
+
+def _parse_number(text: str) -> Optional[float]:
+    """Read thousands and decimal separators in either the English or the continental convention"""
+    text = re.sub(r"[' \u00a0]", '', text)
+    if ',' in text and '.' in text:
+        decimal = ',' if text.rfind(',') > text.rfind('.') else '.'
+    elif text.count(',') == 1 and len(text.split(',')[1]) != 3:
+        decimal = ','
+    elif text.count('.') == 1 and len(text.split('.')[1]) != 3:
+        decimal = '.'
+    else:
+        decimal = None  # only thousands separators
+    thousands = {',', '.'} - {decimal}
+    for separator in thousands:
+        text = text.replace(separator, '')
+    if decimal == ',':
+        text = text.replace(',', '.')
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+class MetadataExtractor:
+    """
+    Deterministic extraction of a contract's effective, expiry and renewal
+    dates and its total value and currency. Dates are found from their
+    four-digit year and amounts from their currency, so the text is only
+    searched around those; each candidate is scored by the cue words near
+    it ('effective date', 'expire', 'total contract value', ...). An expiry
+    date can also follow from 'a term of three (3) years' and the start
+    date. Every field comes with a confidence between 0 and 1, so callers
+    can ask the model only about fields that are uncertain or missing.
+    """
+
+    WINDOW = 32  # characters before its year that a written date can start
+
+    def __init__(self, dayfirst: bool = False):
+        self.dayfirst = dayfirst  # how to read 03/04/2025 when both parts could be the month
+
+    def extract(self, text: str) -> Dict:
+        """Metadata in the shape the model returns (ISO dates), plus a confidence per field"""
+        text = text or ''
+        lowered = text.lower()
+        if len(lowered) != len(text):  # a character lower-cased to two, so offsets would not line up
+            lowered = ''.join(character.lower()[0] for character in text)
+
+        fields = {}
+        dates = self._find_dates(text)
+        for field, cues in DATE_CUES.items():
+            fields[field] = self._best([
+                (value, self._cue_weight(lowered, start, end, previous_end, cues) * weight)
+                for value, start, end, previous_end, weight in dates
+            ])
+
+        start_value, start_confidence = fields['start_date']
+        end_value, end_confidence = fields['end_date']
+        if start_value and end_value and end_value <= start_value:
+            fields['end_date'] = (end_value, end_confidence * 0.5)
+        elif start_value:
+            derived = self._term_end(text, lowered, start_value)
+            if derived and min(start_confidence, 0.85) * 0.95 > end_confidence:
+                fields['end_date'] = (derived, min(start_confidence, 0.85) * 0.95)
+
+        amount, currency, value_confidence = self._find_value(text, lowered)
+
+        metadata = {
+            field: value.isoformat() if value else None
+            for field, (value, _) in fields.items()
+        }
+        metadata.update({'contract_value': amount, 'currency': currency})
+        metadata['confidence'] = {field: round(confidence, 2) for field, (_, confidence) in fields.items()}
+        metadata['confidence'].update({
+            'contract_value': round(value_confidence, 2),
+            'currency': round(value_confidence * (0.9 if currency == 'USD' else 1.0), 2) if currency else 0.0
+        })
+        return metadata
+
+    def _find_dates(self, text: str) -> List[tuple]:
+        """
+        (date, start, end, end of the previous date, weight) for every date
+        in the text; weight < 1 for day/month order guesses
+        """
+        dates, seen = [], set()
+        previous_end = 0
+        for year in YEAR.finditer(text):
+            low, high = max(0, year.start() - self.WINDOW), min(len(text), year.end() + 6)
+            for match in DATE.finditer(text, low, high):
+                # The date this year belongs to (written dates end in it, ISO dates start with it)
+                if not match.start() <= year.start() < match.end() or match.start() in seen:
+                    continue
+                seen.add(match.start())
+                value, weight = self._read_date(match)
+                if value:
+                    dates.append((value, match.start(), match.end(), previous_end, weight))
+                    previous_end = match.end()
+        return dates
+
+    def _read_date(self, match) -> tuple:
+        raw = match.group()
+        weight = 1.0
+        if match.lastgroup == 'numeric':
+            first, second = (int(part) for part in re.split(r'[./-]', raw)[:2])
+            if first <= 12 and second <= 12 and first != second:
+                weight = 0.8  # 03/04/2025 reads either way
+        try:
+            value = date_parser.parse(
+                re.sub(r'\bday\s+of\b', ' ', raw, flags=re.IGNORECASE),
+                dayfirst=self.dayfirst,
+                yearfirst=match.lastgroup == 'iso'
+            ).date()
+        except (ValueError, OverflowError):
+            return None, 0.0
+        return value, weight
+
+    def _cue_weight(self, lowered: str, start: int, end: int, previous_end: int, cues: List[tuple]) -> float:
+        """
+        Weight of the cue nearest before the date in its sentence (and after
+        the previous date, whose cue it is otherwise), or of a defined term
+        right after it ('1 May 2025 (the "Effective Date")').
+        """
+        after = lowered[end:end + 40]
+        for cue, weight in cues:
+            if weight >= 0.9 and f'"{cue}' in after.replace('“', '"'):
+                return weight
+
+        before = self._sentence_before(lowered, max(previous_end, start - CONTEXT_CHARS), start)
+        cue_end, weight = self._nearest_cue(before, cues)
+        if cue_end == -1:
+            return 0.0
+        return weight * (1.0 if len(before) - cue_end <= 40 else 0.85)
+
+    @staticmethod
+    def _sentence_before(lowered: str, low: int, start: int) -> str:
+        """The text from low to start, cut at the last sentence or clause break"""
+        before = lowered[low:start]
+        boundary = max(before.rfind('. '), before.rfind('\n\n'), before.rfind(';'))
+        return before[boundary + 1:] if boundary != -1 else before
+
+    @staticmethod
+    def _nearest_cue(before: str, cues: List[tuple]) -> tuple:
+        """(end offset, weight) of the cue ending last in before; the longer cue wins a tie"""
+        best_end, best_weight = -1, 0.0
+        for cue, weight in cues:
+            position = before.rfind(cue)
+            if position == -1:
+                continue
+            end = position + len(cue)
+            if end > best_end or (end == best_end and weight > best_weight):
+                best_end, best_weight = end, weight
+        return best_end, best_weight
+
+    def _best(self, candidates: List[tuple]) -> tuple:
+        """
+        The best-scored value: repeated mentions of the same value add a
+        little confidence, a different value scored almost as high takes
+        some away.
+        """
+        scores = {}
+        for value, score in candidates:
+            if score <= 0:
+                continue
+            best, count = scores.get(value, (0.0, 0))
+            scores[value] = (max(best, score), count + 1)
+        if not scores:
+            return None, 0.0
+
+        ranked = sorted(scores.items(), key=lambda item: item[1][0], reverse=True)
+        value, (confidence, count) = ranked[0]
+        confidence = min(0.99, confidence + 0.03 * (count - 1))
+        if len(ranked) > 1 and ranked[1][1][0] >= confidence - 0.1:
+            confidence *= 0.7  # two different values with similar cues
+        return value, confidence
+
+    def _term_end(self, text: str, lowered: str, start_value: date) -> Optional[date]:
+        """Expiry implied by the first 'a term of three (3) years' counted from the start date"""
+        positions = []
+        for anchor in ('term of', 'period of'):
+            position = lowered.find(anchor)
+            while position != -1:
+                positions.append(position)
+                position = lowered.find(anchor, position + 1)
+
+        for position in sorted(positions):
+            match = TERM.match(text, position)
+            if not match:
+                continue
+            count = match.group('digits') or (match.group('number') or '').strip()
+            if not count and match.group('word'):
+                count = NUMBER_WORDS.get(match.group('word').lower())  # None for 'term of the agreement'
+            if not count:
+                continue
+            count = int(count)
+            if match.group('unit').lower().startswith('year'):
+                return start_value + relativedelta(years=count) - timedelta(days=1)
+            return start_value + relativedelta(months=count) - timedelta(days=1)
+        return None
+
+    def _find_value(self, text: str, lowered: str) -> tuple:
+        """(amount, currency, confidence) of the contract's total value"""
+        candidates = {}
+        for anchor in MONEY_ANCHORS:
+            position = lowered.find(anchor)
+            while position != -1:
+                low, high = max(0, position - 24), min(len(text), position + len(anchor) + 24)
+                for match in MONEY.finditer(text, low, high):
+                    candidates.setdefault(match.start(), match)
+                position = lowered.find(anchor, position + 1)
+
+        scored = []
+        for start, match in candidates.items():
+            amount = _parse_number(match.group('amount') or match.group('amount2'))
+            if not amount:
+                continue
+            scale = (match.group('scale') or match.group('scale2') or '').lower()
+            amount *= SCALES.get(scale, 1)
+            currency = CURRENCIES.get((match.group('prefix') or match.group('suffix')).lower())
+
+            context = self._sentence_before(lowered, max(0, start - CONTEXT_CHARS), start)
+            following = lowered[match.end():match.end() + 30].split('. ', 1)[0]
+            if any(cue in context[-60:] or cue in following for cue in NOT_VALUE_CUES):
+                continue
+            cue_end, weight = self._nearest_cue(context, VALUE_CUES)
+            scored.append(((amount, currency), weight if cue_end != -1 else 0.3))  # 0.3: an amount with no cue
+
+        (value, confidence) = self._best(scored)
+        if value is None:
+            return None, None, 0.0
+        return value[0], value[1], confidence
@@ -0,0 +1,108 @@
+import os
+import sqlite3
+import time
+import hashlib
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+class OCRCache:
+    """
+    Disk-backed cache of OCR text keyed by the hash of the rendered page
+    image plus the render DPI and OCR engine version. Entries are evicted
+    least-recently-used first once the stored text exceeds max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS ocr_cache ('
+                'key TEXT PRIMARY KEY, text TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_ocr_cache_last_access ON ocr_cache (last_access)')
+            conn.execute('CREATE TABLE IF NOT EXISTS ocr_cache_stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per call keeps the cache safe across threads and processes
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(image_bytes: bytes, dpi: int, engine_version: str) -> str:
+        """Build a cache key for a rendered page image"""
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        return f'{digest}:{dpi}:{engine_version}'
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached text for a page, or None on a miss"""
+        with self._connect() as conn:
+            row = conn.execute('SELECT text FROM ocr_cache WHERE key = ?', (key,)).fetchone()
+            if row:
+                conn.execute('UPDATE ocr_cache SET last_access = ? WHERE key = ?', (time.time(), key))
+            self._increment(conn, 'hits' if row else 'misses')
+
+        if row:
+            self.hits += 1
+            return row[0]
+        self.misses += 1
+        return None
+
+    def put(self, key: str, text: str):
+        """Store OCR text for a page and evict old entries if over the size limit"""
+        size = len(text.encode('utf-8'))
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO ocr_cache (key, text, size, last_access) VALUES (?, ?, ?, ?)',
+                (key, text, size, time.time())
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM ocr_cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        expired = []
+        for key, size in conn.execute('SELECT key, size FROM ocr_cache ORDER BY last_access'):
+            if total <= self.max_bytes:
+                break
+            expired.append((key,))
+            total -= size
+        conn.executemany('DELETE FROM ocr_cache WHERE key = ?', expired)
+        self._increment(conn, 'evictions', len(expired))
+
+    def _increment(self, conn: sqlite3.Connection, name: str, amount: int = 1):
+        conn.execute(
+            'INSERT INTO ocr_cache_stats (name, value) VALUES (?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+            (name, amount)
+        )
+
+    def stats(self) -> Dict[str, any]:
+        """Lifetime counters and current size of the cache"""
+        with self._connect() as conn:
+            counters = dict(conn.execute('SELECT name, value FROM ocr_cache_stats').fetchall())
+            entries, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_cache').fetchone()
+
+        hits = counters.get('hits', 0)
+        misses = counters.get('misses', 0)
+        return {
+            'hits': hits,
+            'misses': misses,
+            'evictions': counters.get('evictions', 0),
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+            'entries': entries,
+            'size_bytes': size
+        }
@@ -1,6 +1,8 @@
 import os
 import io
 import time
+import threading
+import multiprocessing
 from typing import List, Dict, Optional
 from azure.cognitiveservices.vision.computervision import ComputerVisionClient
 from azure.cognitiveservices.vision.computervision.models import OperationStatusCodes
@@ -8,24 +10,104 @@ from msrest.authentication import CognitiveServicesCredentials
 from PyPDF2 import PdfReader
 from pdf2image import convert_from_path
 from PIL import Image
-import tempfile
+from flask import current_app, has_app_context
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from .ocr_cache import OCRCache
+from .extraction_backends import get_backend
+from .page_image import prepare_page_image
+
+_text_pool = None
+_text_pool_lock = threading.Lock()
+
+def _get_text_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool shared by all OCRService instances for PyPDF2 extraction"""
+    global _text_pool
+    with _text_pool_lock:
+        if _text_pool is None:
+            # spawn avoids forking a multi-threaded web worker
+            _text_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _text_pool
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[Dict]:
+    """Extract text for pages [start, end) with PyPDF2 (runs in worker processes)"""
+    pages = []
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PdfReader(file)
+        for page_num in range(start, end):
+            page_text = pdf_reader.pages[page_num].extract_text()
+            pages.append({
+                'page_number': page_num + 1,
+                'text': page_text
+            })
+    return pages
+
+def _default_cache() -> Optional[OCRCache]:
+    """The OCR cache configured for the app (OCR_CACHE_PATH), if running in one with the cache enabled"""
+    if not has_app_context() or not current_app.config.get('OCR_CACHE_ENABLED', True):
+        return None
+    return OCRCache(
+        current_app.config['OCR_CACHE_PATH'],
+        max_bytes=current_app.config.get('OCR_CACHE_MAX_MB', 256) * 1024 * 1024
+    )
 
 class OCRService:
-    def __init__(self, endpoint: str, key: str):
+    # Part of every OCR cache key; bump when the engine or its output format changes
+    ENGINE_VERSION = 'azure-read-v3.2'
+    
+    # Adaptive backoff (seconds) for polling Read API operations
+    POLL_INITIAL_DELAY = 0.25
+    POLL_MAX_DELAY = 2.0
+    POLL_BACKOFF_FACTOR = 1.5
+    
+    def __init__(self, endpoint: str, key: str, max_concurrency: int = 4,
+                 dpi: int = 300, max_render_memory: Optional[int] = None,
+                 min_page_chars: int = 50, cache: Optional[OCRCache] = None,
+                 text_workers: int = 1, parallel_min_pages: int = 100,
+                 text_backend: str = 'pypdf2', ocr_backend: str = 'azure_ocr',
+                 ocr_fallback_backend: Optional[str] = None, image_prep: bool = True,
+                 min_dpi: int = 150, max_image_bytes: int = 4 * 1024 * 1024,
+                 client: Optional[ComputerVisionClient] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
         self.endpoint = endpoint
         self.key = key
-        self.client = None
-        if endpoint and key:
+        # Processes for PyPDF2 extraction of large documents; more than the CPU count only adds overhead
+        self.text_workers = min(text_workers, os.cpu_count() or 1)
+        self.parallel_min_pages = parallel_min_pages
+        self.cache = cache if cache is not None else _default_cache()  # the app's cache unless one is given
+        self.min_page_chars = min_page_chars  # pages with less embedded text are OCRed
+        self.max_concurrency = max(1, max_concurrency)
+        self.dpi = dpi
+        self.max_render_memory = max_render_memory  # bytes of rendered page bitmaps held at once
+        # Send grayscale/bilevel pages at an adaptive DPI instead of full-resolution colour PNGs
+        self.image_prep = image_prep
+        self.min_dpi = min_dpi
+        self.max_image_bytes = max_image_bytes
+        self.client = client  # shared pooled client from the app's ClientRegistry, if given
+        # Threads that submit and poll Read operations; the registry's shared pool, or one kept by this service
+        self.executor = executor
+        self._executor_lock = threading.Lock()
+        if self.client is None and endpoint and key:
             self.client = ComputerVisionClient(
                 endpoint=self.endpoint,
                 credentials=CognitiveServicesCredentials(self.key)
             )
+        
+        # Engines are swappable through configuration; the fallback OCR backend
+        # gets the pages the primary one could not read (e.g. local first, Azure for hard cases)
+        self.text_backend = get_backend(text_backend, self)
+        self.ocr_backends = [get_backend(ocr_backend, self)]
+        if ocr_fallback_backend:
+            self.ocr_backends.append(get_backend(ocr_fallback_backend, self))
     
     def extract_text_from_pdf(self, pdf_path: str) -> Dict[str, any]:
         """
-        Extract text from PDF using multiple methods:
-        1. Try PyPDF2 for text-based PDFs
-        2. Fall back to Azure OCR for scanned PDFs
+        Extract text from PDF page by page:
+        1. Use the text backend (PyPDF2 by default) for pages with a dense enough text layer
+        2. Send only the sparse (scanned) pages to the OCR backends (Azure Read by default)
+        Each entry in 'pages' records the method used for that page.
         """
         result = {
             'text': '',
@@ -36,89 +118,299 @@ class OCRService:
         }
         
         try:
-            # First try PyPDF2 for text-based PDFs
-            text, pages = self._extract_with_pypdf2(pdf_path)
-            if text and len(text.strip()) > 100:  # Minimum text threshold
+            # First read the text layer
+            pages = self.text_backend.extract_pages(pdf_path)
+            text = "".join(page['text'] + "\n\n" for page in pages)
+            
+            sparse_pages = [
+                page['page_number'] for page in pages
+                if len(page['text'].strip()) < self.min_page_chars
+            ]
+            
+            ocr_backends = [backend for backend in self.ocr_backends if backend.available()]
+            
+            # OCR only the pages that lack a text layer (or every page if text extraction failed)
+            if ocr_backends and (sparse_pages or not pages):
+                ocr_pages = self._ocr_pages(ocr_backends, pdf_path, sparse_pages or None)
+                if not pages:
+                    pages = ocr_pages
+                else:
+                    for ocr_page in ocr_pages:
+                        if ocr_page['text'].strip():
+                            pages[ocr_page['page_number'] - 1] = ocr_page
+                text = "".join(page['text'] + "\n\n" for page in pages)
+            elif not ocr_backends and len(text.strip()) <= 100:  # Minimum text threshold
+                names = ', '.join(backend.name for backend in self.ocr_backends)
+                result['error'] = f'OCR backend ({names}) not configured and PDF appears to be scanned'
+                return result
+            
+            if text.strip():
+                methods = {page['method'] for page in pages}
                 result['text'] = text
                 result['pages'] = pages
-                result['method'] = 'pypdf2'
+                result['method'] = methods.pop() if len(methods) == 1 else 'hybrid'
                 result['success'] = True
-                return result
-            
-            # If PyPDF2 fails or returns minimal text, use Azure OCR
-            if self.client:
-                text, pages = self._extract_with_azure_ocr(pdf_path)
-                if text:
-                    result['text'] = text
-                    result['pages'] = pages
-                    result['method'] = 'azure_ocr'
-                    result['success'] = True
-                    return result
-            else:
-                result['error'] = 'Azure OCR not configured and PDF appears to be scanned'
+                
+                ocr_stats = [page['ocr'] for page in pages if page.get('ocr')]
+                if ocr_stats:
+                    result['ocr_stats'] = self._summarize_ocr_stats(ocr_stats)
                 
         except Exception as e:
             result['error'] = str(e)
         
         return result
     
+    def _ocr_pages(self, ocr_backends: List, pdf_path: str, page_numbers: Optional[List[int]]) -> List[Dict]:
+        """
+        OCR pages with each backend in turn; a backend only receives the pages
+        that earlier backends returned too little text for.
+        """
+        results = {}
+        remaining = page_numbers
+        
+        for backend in ocr_backends:
+            for page in backend.extract_pages(pdf_path, remaining):
+                if page['text'].strip() or page['page_number'] not in results:
+                    results[page['page_number']] = page
+            
+            if remaining is None:
+                remaining = list(range(1, len(PdfReader(pdf_path).pages) + 1))
+            remaining = [
+                page_number for page_number in remaining
+                if len(results.get(page_number, {}).get('text', '').strip()) < self.min_page_chars
+            ]
+            if not remaining:
+                break
+        
+        return [results[page_number] for page_number in sorted(results)]
+    
     def _extract_with_pypdf2(self, pdf_path: str) -> tuple:
-        """Extract text using PyPDF2"""
-        text = ""
+        """
+        Extract text using PyPDF2. Documents with at least
+        parallel_min_pages pages are split into page ranges across a
+        process pool; results are joined in page order.
+        """
         pages = []
         
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PdfReader(file)
-                num_pages = len(pdf_reader.pages)
-                
-                for page_num in range(num_pages):
-                    page = pdf_reader.pages[page_num]
-                    page_text = page.extract_text()
-                    text += page_text + "\n\n"
-                    pages.append({
-                        'page_number': page_num + 1,
-                        'text': page_text
-                    })
+            num_pages = len(PdfReader(pdf_path).pages)
+            
+            if self.text_workers > 1 and num_pages >= self.parallel_min_pages:
+                pages = self._extract_pages_in_parallel(pdf_path, num_pages)
+            else:
+                pages = _extract_page_range(pdf_path, 0, num_pages)
                     
         except Exception as e:
             print(f"PyPDF2 extraction error: {e}")
-            
+        
+        text = "".join(page['text'] + "\n\n" for page in pages)
         return text, pages
     
-    def _extract_with_azure_ocr(self, pdf_path: str) -> tuple:
-        """Extract text using Azure Computer Vision OCR"""
+    def _extract_pages_in_parallel(self, pdf_path: str, num_pages: int) -> List[Dict]:
+        """Extract page ranges on the shared process pool, falling back to one process"""
+        # One contiguous range per worker: every range pays for opening the
+        # reader and parsing shared fonts again, so more ranges cost more
+        range_size = -(-num_pages // self.text_workers)
+        starts = range(0, num_pages, range_size)
+        
+        try:
+            pool = _get_text_pool(self.text_workers)
+            futures = [
+                pool.submit(_extract_page_range, pdf_path, start, min(start + range_size, num_pages))
+                for start in starts
+            ]
+            return [page for future in futures for page in future.result()]
+        except Exception as e:
+            # e.g. daemonic worker processes, which cannot start children
+            print(f"Parallel PyPDF2 extraction unavailable, using one process: {e}")
+            return _extract_page_range(pdf_path, 0, num_pages)
+    
+    def _extract_with_azure_ocr(self, pdf_path: str, page_numbers: Optional[List[int]] = None) -> tuple:
+        """Extract text using Azure Computer Vision OCR, optionally for selected pages only"""
         text = ""
         pages = []
         
         try:
-            # Convert PDF to images
-            with tempfile.TemporaryDirectory() as temp_dir:
-                images = convert_from_path(pdf_path, dpi=300)
-                
-                for i, image in enumerate(images):
-                    # Convert PIL Image to bytes
-                    img_byte_arr = io.BytesIO()
-                    image.save(img_byte_arr, format='PNG')
-                    img_byte_arr.seek(0)
-                    
-                    # Perform OCR
-                    page_text = self._ocr_image(img_byte_arr)
-                    text += page_text + "\n\n"
-                    pages.append({
-                        'page_number': i + 1,
-                        'text': page_text
-                    })
+            if page_numbers is None:
+                page_numbers = list(range(1, len(PdfReader(pdf_path).pages) + 1))
+            
+            # Render pages a window at a time and OCR them as they arrive,
+            # keeping page order
+            page_stats = []
+            page_texts = self._ocr_images(self._iter_pdf_images(pdf_path, page_numbers), page_stats)
+            
+            for page_number, page_text, stats in zip(page_numbers, page_texts, page_stats):
+                text += page_text + "\n\n"
+                pages.append({
+                    'page_number': page_number,
+                    'text': page_text,
+                    'method': 'azure_ocr',
+                    'ocr': stats
+                })
                     
         except Exception as e:
             print(f"Azure OCR extraction error: {e}")
             
         return text, pages
     
-    def _ocr_image(self, image_stream: io.BytesIO) -> str:
-        """Perform OCR on a single image"""
+    def _iter_pdf_images(self, pdf_path: str, page_numbers: List[int]):
+        """
+        Yield images for the given pages one at a time, rendering only a
+        window of consecutive pages per convert_from_path call so the whole
+        document is never in memory.
+        """
+        window = self._render_window(PdfReader(pdf_path))
+        
+        for first_page, last_page in self._page_runs(page_numbers, window):
+            images = convert_from_path(pdf_path, dpi=self.dpi, first_page=first_page, last_page=last_page,
+                                       grayscale=self.image_prep)
+            # Hand over ownership so consumed pages can be freed immediately
+            while images:
+                yield images.pop(0)
+    
+    def _page_runs(self, page_numbers: List[int], window: int) -> List[tuple]:
+        """Group sorted page numbers into (first_page, last_page) runs of at most window pages"""
+        runs = []
+        for page_number in page_numbers:
+            if runs and page_number == runs[-1][1] + 1 and page_number - runs[-1][0] < window:
+                runs[-1] = (runs[-1][0], page_number)
+            else:
+                runs.append((page_number, page_number))
+        return runs
+    
+    def _render_window(self, reader: PdfReader) -> int:
+        """
+        Number of pages to render per batch so that the window plus the
+        encoded pages waiting to be submitted stay under max_render_memory.
+        At least one page is always rendered.
+        """
+        if not self.max_render_memory:
+            return 1
+        
+        page_bytes = max(
+            (self._rendered_page_bytes(page) for page in reader.pages),
+            default=1
+        )
+        return max(1, self.max_render_memory // page_bytes - self.max_concurrency)
+    
+    def _rendered_page_bytes(self, page) -> int:
+        """Size of a page rendered as a grayscale (image_prep) or RGB bitmap at the configured DPI"""
+        width = float(page.mediabox.width) / 72 * self.dpi
+        height = float(page.mediabox.height) / 72 * self.dpi
+        channels = 1 if self.image_prep else 3
+        return max(1, int(width * height * channels))
+    
+    def _ocr_images(self, images, page_stats: Optional[List[Dict]] = None) -> List[str]:
+        """
+        OCR a sequence of PIL images with at most max_concurrency Read
+        operations in flight, polling all pending operations together.
+        Returns page texts in the same order as the images; per-page payload
+        size and latency are appended to page_stats when given.
+        """
+        texts = []
+        stats = page_stats if page_stats is not None else []
+        pending = {}  # page index -> operation id
+        cache_keys = {}  # page index -> cache key
+        submitted_at = {}  # page index -> submit time
+        image_iter = iter(images)
+        exhausted = False
+        
+        executor = self._get_executor()
+        while not exhausted or pending:
+            # Top up the window of in-flight operations
+            streams = {}  # page index -> encoded image
+            while not exhausted and len(pending) + len(streams) < self.max_concurrency:
+                image = next(image_iter, None)
+                if image is None:
+                    exhausted = True
+                    break
+                payload, page_info = self._page_payload(image)
+                del image  # Release the rendered page before the next one is rendered
+                
+                index = len(texts)
+                texts.append('')
+                stats.append(page_info)
+                if payload is None:
+                    continue  # Blank page, nothing to read
+                cached = self._cache_lookup(index, payload, self.dpi, cache_keys)
+                if cached is not None:
+                    texts[index] = cached
+                    page_info.update({'cached': True, 'bytes_sent': 0})
+                else:
+                    streams[index] = io.BytesIO(payload)
+                del payload
+            
+            for index in streams:
+                submitted_at[index] = time.monotonic()
+            operation_ids = executor.map(self._submit_read, streams.values())
+            for index, operation_id in zip(list(streams), operation_ids):
+                if operation_id:
+                    pending[index] = operation_id
+            streams.clear()  # Submitted images are no longer needed
+            
+            if pending:
+                for index, page_text in self._wait_for_any(pending, executor).items():
+                    texts[index] = page_text
+                    stats[index]['latency_seconds'] = round(time.monotonic() - submitted_at.pop(index), 3)
+                    self._cache_store(cache_keys.pop(index, None), page_text)
+        
+        return texts
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """The thread pool for Read calls, created once and reused for every document and image"""
+        with self._executor_lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='ocr')
+            return self.executor
+    
+    def _page_payload(self, image) -> tuple:
+        """Encode a rendered page for the Read API, returning (bytes or None for blank pages, stats)"""
+        if self.image_prep:
+            return prepare_page_image(image, self.dpi, self.min_dpi, self.max_image_bytes)
+        
+        payload = self._image_to_stream(image).getvalue()
+        return payload, {'source_dpi': self.dpi, 'dpi': self.dpi, 'encoding': 'png', 'bytes_sent': len(payload)}
+    
+    def _summarize_ocr_stats(self, page_stats: List[Dict]) -> Dict[str, any]:
+        """Totals of the per-page OCR payload stats for the extraction result"""
+        latencies = [stats['latency_seconds'] for stats in page_stats if 'latency_seconds' in stats]
+        bytes_sent = sum(stats.get('bytes_sent', 0) for stats in page_stats)
+        return {
+            'image_prep': self.image_prep,
+            'pages': len(page_stats),
+            'pages_sent': len(latencies),
+            'blank_pages': sum(1 for stats in page_stats if stats.get('encoding') == 'blank'),
+            'cached_pages': sum(1 for stats in page_stats if stats.get('cached')),
+            'bytes_sent': bytes_sent,
+            'bytes_per_page': bytes_sent // len(latencies) if latencies else 0,
+            'mean_latency_seconds': round(sum(latencies) / len(latencies), 3) if latencies else None
+        }
+    
+    def _cache_lookup(self, index: int, image_bytes: bytes, dpi: int, cache_keys: Dict[int, str]) -> Optional[str]:
+        """Return cached text for a page image, remembering its key for a later store on a miss"""
+        if not self.cache:
+            return None
+        key = OCRCache.make_key(image_bytes, dpi, self.ENGINE_VERSION)
+        cached = self.cache.get(key)
+        if cached is None:
+            cache_keys[index] = key
+        return cached
+    
+    def _cache_store(self, key: Optional[str], text: str):
+        """Cache successful OCR output; failures and empty pages are retried next time"""
+        if self.cache and key and text.strip():
+            self.cache.put(key, text)
+    
+    def _image_to_stream(self, image: Image.Image) -> io.BytesIO:
+        """Convert PIL Image to bytes"""
+        img_byte_arr = io.BytesIO()
+        image.save(img_byte_arr, format='PNG')
+        img_byte_arr.seek(0)
+        return img_byte_arr
+    
+    def _submit_read(self, image_stream) -> Optional[str]:
+        """Submit an image to the Azure Read API and return the operation id"""
         try:
-            # Call Azure Read API
             read_response = self.client.read_in_stream(
                 image_stream,
                 raw=True
@@ -126,14 +418,18 @@ class OCRService:
             
             # Get operation location
             read_operation_location = read_response.headers["Operation-Location"]
-            operation_id = read_operation_location.split("/")[-1]
+            return read_operation_location.split("/")[-1]
             
-            # Wait for the operation to complete
-            while True:
-                read_result = self.client.get_read_result(operation_id)
-                if read_result.status not in ['notStarted', 'running']:
-                    break
-                time.sleep(1)
+        except Exception as e:
+            print(f"OCR error: {e}")
+            return None
+    
+    def _get_read_text(self, operation_id: str) -> Optional[str]:
+        """Return the text of a finished Read operation, or None while it is still running"""
+        try:
+            read_result = self.client.get_read_result(operation_id)
+            if read_result.status in ['notStarted', 'running']:
+                return None
             
             # Extract text
             text = ""
@@ -141,13 +437,46 @@ class OCRService:
                 for text_result in read_result.analyze_result.read_results:
                     for line in text_result.lines:
                         text += line.text + "\n"
-                        
             return text
             
         except Exception as e:
             print(f"OCR error: {e}")
             return ""
     
+    def _wait_for_any(self, pending: Dict[int, str], executor: ThreadPoolExecutor) -> Dict[int, str]:
+        """
+        Poll all pending operations until at least one finishes, backing off
+        while none complete. Finished operations are removed from pending.
+        """
+        delay = self.POLL_INITIAL_DELAY
+        while True:
+            indexes = list(pending)
+            statuses = executor.map(self._get_read_text, [pending[i] for i in indexes])
+            finished = {i: text for i, text in zip(indexes, statuses) if text is not None}
+            if finished:
+                for i in finished:
+                    del pending[i]
+                return finished
+            time.sleep(delay)
+            delay = min(delay * self.POLL_BACKOFF_FACTOR, self.POLL_MAX_DELAY)
+    
+    def _ocr_image(self, image_stream: io.BytesIO) -> str:
+        """Perform OCR on a single image"""
+        image_bytes = image_stream.read()
+        cache_keys = {}
+        cached = self._cache_lookup(0, image_bytes, 0, cache_keys)  # DPI 0: image used at source resolution
+        if cached is not None:
+            return cached
+        
+        operation_id = self._submit_read(io.BytesIO(image_bytes))
+        if not operation_id:
+            return ""
+        
+        pending = {0: operation_id}
+        text = self._wait_for_any(pending, self._get_executor())[0]
+        self._cache_store(cache_keys.get(0), text)
+        return text
+    
     def extract_text_from_image(self, image_path: str) -> str:
         """Extract text from a single image file"""
         try:
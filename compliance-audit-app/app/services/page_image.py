@@ -0,0 +1,101 @@
+import io
+from typing import Dict, Optional, Tuple
+import numpy as np
+from PIL import Image
+
+# Pixels darker than this count as ink
+INK_THRESHOLD = 160
+
+# Pages with less ink than this share of pixels are treated as blank and not sent
+BLANK_INK_RATIO = 0.0005
+
+# Typical text line height (pixels) to keep after downscaling; Azure Read needs
+# text at least ~12 px tall, so this leaves a margin for small print and accents
+TARGET_LINE_HEIGHT = 28
+
+# Pages with fewer mid-grey pixels than this are clean enough for bilevel encoding
+BILEVEL_MIDTONE_RATIO = 0.05
+
+# Azure Read accepts images up to 10000 x 10000 pixels
+MAX_DIMENSION = 10000
+
+JPEG_QUALITY = 85
+
+
+def prepare_page_image(image: Image.Image, dpi: int, min_dpi: int = 150,
+                       max_bytes: int = 4 * 1024 * 1024) -> Tuple[Optional[bytes], Dict]:
+    """
+    Turn a rendered page into a compact OCR payload:
+    1. Measure ink density and typical text line height
+    2. Downscale to the lowest DPI (not below min_dpi) that keeps text legible
+    3. Encode clean pages as 1-bit PNG, others as grayscale JPEG
+    4. Shrink further until the payload fits in max_bytes
+    Returns (None, info) for blank pages, which need no OCR.
+    """
+    gray = image.convert('L')
+    ink = np.asarray(gray) < INK_THRESHOLD
+    ink_ratio = float(ink.mean())
+
+    info = {
+        'source_dpi': dpi,
+        'ink_ratio': round(ink_ratio, 4)
+    }
+
+    if ink_ratio < BLANK_INK_RATIO:
+        info.update({'dpi': 0, 'encoding': 'blank', 'bytes_sent': 0})
+        return None, info
+
+    line_height = _line_height(ink)
+    del ink
+
+    scale = 1.0
+    if line_height:
+        scale = max(min_dpi / dpi, min(1.0, TARGET_LINE_HEIGHT / line_height))
+    scale = min(scale, MAX_DIMENSION / max(gray.size))
+
+    midtones = np.asarray(gray)
+    midtone_ratio = float(((midtones >= 64) & (midtones < 192)).mean())
+    del midtones
+    bilevel = midtone_ratio < BILEVEL_MIDTONE_RATIO
+
+    while True:
+        payload = _encode(gray, scale, bilevel)
+        if len(payload) <= max_bytes or scale * dpi < 72:
+            break
+        scale *= 0.8
+
+    info.update({
+        'line_height': line_height,
+        'dpi': int(round(dpi * scale)),
+        'encoding': 'png-bilevel' if bilevel else 'jpeg-gray',
+        'bytes_sent': len(payload)
+    })
+    return payload, info
+
+
+def _line_height(ink: np.ndarray) -> Optional[int]:
+    """
+    Estimate text line height from the horizontal projection profile: runs
+    of consecutive rows containing ink. The lower quartile is used so merged
+    multi-column lines and large headings do not inflate the estimate.
+    """
+    rows = (ink.sum(axis=1) >= 2).astype(np.int8)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], rows, [0]))))
+    runs = edges[1::2] - edges[::2]
+    runs = runs[runs >= 3]  # Ignore rules, underlines and specks
+    if not len(runs):
+        return None
+    return int(np.percentile(runs, 25))
+
+
+def _encode(gray: Image.Image, scale: float, bilevel: bool) -> bytes:
+    if scale < 1.0:
+        size = (max(1, int(gray.width * scale)), max(1, int(gray.height * scale)))
+        gray = gray.resize(size, Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    if bilevel:
+        gray.point(lambda p: 255 if p >= INK_THRESHOLD else 0, mode='1').save(buffer, format='PNG', optimize=True)
+    else:
+        gray.save(buffer, format='JPEG', quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue()
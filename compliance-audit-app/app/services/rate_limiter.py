@@ -0,0 +1,212 @@
+import time
+import heapq
+import random
+import itertools
+import threading
+from typing import Callable, Dict, Optional
+from openai import APIConnectionError
+
+
+class RateLimitTimeout(TimeoutError):
+    """A request waited longer than AI_RATE_LIMIT_MAX_WAIT for capacity"""
+
+
+class TokenBucket:
+    """
+    Capacity that refills continuously at per_minute / 60 units a second.
+    Bursts are capped at burst_seconds worth, since Azure enforces its
+    per-minute quota over short windows.
+    """
+
+    def __init__(self, per_minute: int, burst_seconds: float = 10):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        self.capacity = self.rate * burst_seconds
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount is available (call refill first)"""
+        amount = min(amount, self.capacity)  # an oversized request waits for a full bucket, not forever
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+
+class RateLimiter:
+    """
+    Process-wide limiter for Azure OpenAI requests. Every call takes one
+    request from the requests-per-minute bucket and its estimated tokens
+    from the tokens-per-minute bucket (settled against the actual usage
+    afterwards). Waiting calls are served strictly by lane, interactive
+    before bulk, and first-come within a lane; bulk calls also leave
+    AI_RATE_LIMIT_INTERACTIVE_RESERVE of each bucket free. 429 and
+    transient errors are retried with jittered exponential backoff,
+    honouring retry-after and pausing every caller until it has passed.
+    """
+
+    LANES = ('interactive', 'bulk')  # highest priority first
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+    def __init__(self, app=None):
+        self.requests = None  # TokenBucket, or None when unlimited
+        self.tokens = None
+        self.interactive_reserve = 0.0
+        self.max_retries = 5
+        self.backoff_base = 1.0
+        self.backoff_max = 60.0
+        self.max_wait = None
+        self._paused_until = 0.0
+        self._waiting = []  # heap of (lane rank, arrival) tickets
+        self._arrivals = itertools.count()
+        self._cond = threading.Condition()
+        self._metrics = {lane: {'queued': 0, 'acquired': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+                         for lane in self.LANES}
+        self._throttled = 0
+        self._retries = 0
+        self._timeouts = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        rpm = app.config.get('AI_RATE_LIMIT_RPM', 0)
+        tpm = app.config.get('AI_RATE_LIMIT_TPM', 0)
+        burst = app.config.get('AI_RATE_LIMIT_BURST_SECONDS', 10)
+        self.requests = TokenBucket(rpm, burst) if rpm else None
+        self.tokens = TokenBucket(tpm, burst) if tpm else None
+        self.interactive_reserve = app.config.get('AI_RATE_LIMIT_INTERACTIVE_RESERVE', 0.2)
+        self.max_retries = app.config.get('AI_RATE_LIMIT_MAX_RETRIES', 5)
+        self.backoff_base = app.config.get('AI_RATE_LIMIT_BACKOFF_BASE', 1.0)
+        self.backoff_max = app.config.get('AI_RATE_LIMIT_BACKOFF_MAX', 60.0)
+        self.max_wait = app.config.get('AI_RATE_LIMIT_MAX_WAIT') or None
+        app.extensions['rate_limiter'] = self
+
+    def _wait_time(self, lane: str, tokens: int, now: float) -> float:
+        """Seconds until the buckets can serve this call (0 if it can go now)"""
+        reserve = self.interactive_reserve if lane == 'bulk' else 0.0
+        wait = max(0.0, self._paused_until - now)
+        for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+            if bucket:
+                bucket.refill(now)
+                wait = max(wait, bucket.wait_time(amount + reserve * bucket.capacity))
+        return wait
+
+    def acquire(self, tokens: int, priority: str = 'bulk'):
+        """Block until this call may be sent, then take its request and tokens"""
+        lane = priority if priority in self.LANES else 'bulk'
+        start = time.monotonic()
+        ticket = (self.LANES.index(lane), next(self._arrivals))
+
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            self._metrics[lane]['queued'] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._wait_time(lane, tokens, now) if self._waiting[0] == ticket else None
+                    if wait == 0:
+                        break
+                    if self.max_wait is not None:
+                        remaining = self.max_wait - (now - start)
+                        if remaining <= 0:
+                            self._timeouts += 1
+                            raise RateLimitTimeout(f"waited more than {self.max_wait}s for AI rate limit capacity")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    # Only the head of the queue sleeps on a deadline; others wait to be notified
+                    self._cond.wait(wait)
+
+                if self.requests:
+                    self.requests.level -= 1
+                if self.tokens:
+                    self.tokens.level -= tokens
+                waited = time.monotonic() - start
+                metrics = self._metrics[lane]
+                metrics['acquired'] += 1
+                metrics['wait_seconds'] += waited
+                metrics['max_wait_seconds'] = max(metrics['max_wait_seconds'], waited)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._metrics[lane]['queued'] -= 1
+                self._cond.notify_all()
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Correct the token bucket once a response reports its real usage"""
+        if self.tokens is None or actual_tokens is None:
+            return
+        with self._cond:
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + estimated_tokens - actual_tokens)
+            self._cond.notify_all()
+
+    def call(self, send: Callable, tokens: int, priority: str = 'bulk'):
+        """Run send() within the limits, retrying 429s and transient errors"""
+        attempt = 0
+        while True:
+            self.acquire(tokens, priority)
+            try:
+                return send()
+            except Exception as e:
+                status = getattr(e, 'status_code', None)
+                if attempt >= self.max_retries or not (
+                        status in self.RETRY_STATUS_CODES or isinstance(e, APIConnectionError)):
+                    raise
+                delay = self._backoff(attempt, self._retry_after(e))
+                with self._cond:
+                    self._retries += 1
+                    if status == 429:
+                        # The whole deployment is over quota: hold every caller, not just this one
+                        self._throttled += 1
+                        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                        self._cond.notify_all()
+                if status != 429:
+                    time.sleep(delay)
+                attempt += 1
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Full-jitter exponential backoff, or retry-after plus jitter so callers do not retry in step"""
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(error) -> Optional[float]:
+        headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+        try:
+            if headers.get('retry-after-ms'):
+                return float(headers['retry-after-ms']) / 1000
+            if headers.get('retry-after'):
+                return float(headers['retry-after'])
+        except ValueError:  # HTTP-date form; fall back to exponential backoff
+            pass
+        return None
+
+    def stats(self) -> Dict[str, any]:
+        """Queue depth, wait times and throttling counters for this process"""
+        with self._cond:
+            now = time.monotonic()
+            lanes = {}
+            for lane, metrics in self._metrics.items():
+                lanes[lane] = {
+                    'queue_depth': metrics['queued'],
+                    'acquired': metrics['acquired'],
+                    'mean_wait_seconds': metrics['wait_seconds'] / metrics['acquired'] if metrics['acquired'] else 0.0,
+                    'max_wait_seconds': metrics['max_wait_seconds']
+                }
+            for bucket in (self.requests, self.tokens):
+                if bucket:
+                    bucket.refill(now)
+            return {
+                'requests_per_minute': self.requests.per_minute if self.requests else None,
+                'tokens_per_minute': self.tokens.per_minute if self.tokens else None,
+                'requests_available': round(self.requests.level, 1) if self.requests else None,
+                'tokens_available': round(self.tokens.level) if self.tokens else None,
+                'paused_seconds': round(max(0.0, self._paused_until - now), 2),
+                'lanes': lanes,
+                'throttled': self._throttled,
+                'retries': self._retries,
+                'timeouts': self._timeouts
+            }
@@ -0,0 +1,151 @@
+import re
+from bisect import bisect_right
+from typing import Dict, List, Optional
+from .text_index import text_digest
+
+# Heading lines: "ARTICLE IV ...", "Section 5.2 ...", "Schedule B", "12.3.1 Title", "IV. Title"
+HEADING = re.compile(
+    r'^[ \t]*(?:'
+    r'(?P<keyword>(?i:article|section|clause|schedule|annex|appendix|exhibit|attachment))[ \t]+'
+    r'(?P<label>\d{1,3}(?:\.\d{1,3})*|[IVXLC]{1,6}|[A-Z])\b\.?'
+    r'|(?P<number>\d{1,3}(?:\.\d{1,3})*)\.?(?=[ \t]+[A-Z])'
+    r'|(?P<roman>[IVXLC]{1,6})\.(?=[ \t]+[A-Z])'
+    r')[ \t]*(?P<title>[^\n]*)',
+    re.MULTILINE
+)
+
+# Attachments sit above the numbered sections they contain
+ATTACHMENTS = {'schedule', 'annex', 'appendix', 'exhibit', 'attachment'}
+
+
+def find_passage(text: str, passage: Optional[str], probe_chars: int = 80) -> Optional[int]:
+    """
+    Offset of a quoted passage (such as a clause's content) in text,
+    tolerating different whitespace and line breaks; None if not found.
+    """
+    passage = (passage or '').strip()
+    if len(passage) < 20:
+        return None  # too short to place with confidence
+    position = text.find(passage[:probe_chars])
+    if position != -1:
+        return position
+    words = re.findall(r'\w+', passage)[:12]
+    if len(words) < 4:
+        return None
+    match = re.search(r'\W+'.join(re.escape(word) for word in words), text)
+    return match.start() if match else None
+
+
+class SectionIndex:
+    """
+    Section tree of a contract stored as a compact table of offsets. Each
+    row is [start, end, level, parent, page, number, title]: a section
+    runs to the next heading at its level or above, so it includes its
+    subsections; parent is the row of the enclosing section (-1 at the
+    top) and page the page its heading is on. Section text is never kept;
+    callers slice (or SUBSTR) extracted_text with the offsets.
+    """
+
+    VERSION = 1
+    COLUMNS = ['start', 'end', 'level', 'parent', 'page', 'number', 'title']
+
+    def __init__(self, digest: str, rows: List[List], page_starts: Optional[List[int]] = None):
+        self.digest = digest
+        self.rows = rows
+        self.page_starts = page_starts or []
+        self._starts = [row[0] for row in rows]
+
+    @classmethod
+    def build(cls, text: str, page_starts: Optional[List[int]] = None) -> 'SectionIndex':
+        headings = []
+        for match in HEADING.finditer(text):
+            number, level = cls._numbering(match)
+            headings.append((match.start(), level, number, match.group('title').strip()[:120]))
+
+        if not headings or text[:headings[0][0]].strip():
+            headings.insert(0, (0, 1, None, 'Preamble'))
+
+        rows, stack = [], []  # stack: rows of the open sections, outermost first
+        for start, level, number, title in headings:
+            while stack and rows[stack[-1]][2] >= level:
+                rows[stack.pop()][1] = start
+            parent = stack[-1] if stack else -1
+            page = bisect_right(page_starts, start) if page_starts else None
+            rows.append([start, len(text), level, parent, page, number, title])
+            stack.append(len(rows) - 1)
+        return cls(text_digest(text), rows, page_starts)
+
+    @staticmethod
+    def _numbering(match) -> tuple:
+        """(number as cited, level) of a heading; attachments are level 0, '12.3.1' is level 3"""
+        if match.group('keyword'):
+            keyword = match.group('keyword').lower()
+            label = match.group('label')
+            if keyword in ATTACHMENTS:
+                return f'{keyword.capitalize()} {label}', 0
+            if keyword in ('section', 'clause') and label[0].isdigit():
+                return label, label.count('.') + 1
+            return f'{keyword.capitalize()} {label}', 1
+        if match.group('number'):
+            return match.group('number'), match.group('number').count('.') + 1
+        return match.group('roman'), 1
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> Optional['SectionIndex']:
+        """Load a stored index; None if missing or built by another version"""
+        if not data or data.get('version') != cls.VERSION:
+            return None
+        return cls(data['digest'], data['rows'], data.get('page_starts'))
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': self.VERSION,
+            'digest': self.digest,
+            'columns': self.COLUMNS,
+            'rows': self.rows,
+            'page_starts': self.page_starts
+        }
+
+    def matches(self, text: str) -> bool:
+        """Whether the index was built from this text"""
+        return self.digest == text_digest(text)
+
+    def locate(self, offset: int) -> Optional[int]:
+        """Row of the innermost section containing an offset"""
+        position = bisect_right(self._starts, offset) - 1
+        return position if position >= 0 else None
+
+    def page_at(self, offset: int) -> Optional[int]:
+        """Page number of an offset, if page boundaries are known"""
+        return bisect_right(self.page_starts, offset) if self.page_starts else None
+
+    def reference(self, row: int) -> Optional[str]:
+        """
+        How the section is cited: its number, prefixed by the attachment it
+        sits in ('Schedule B, 1.2'), or its title if it has no number
+        """
+        start, end, level, parent, page, number, title = self.rows[row]
+        if number is None:
+            return title[:100] or None
+        while parent != -1:
+            if self.rows[parent][2] == 0:
+                return f'{self.rows[parent][5]}, {number}'[:100]
+            parent = self.rows[parent][3]
+        return number[:100]
+
+    def section(self, row: int) -> Dict:
+        start, end, level, parent, page, number, title = self.rows[row]
+        return {
+            'index': row,
+            'start': start,
+            'end': end,
+            'level': level,
+            'parent': parent if parent != -1 else None,
+            'page_number': page,
+            'number': number,
+            'title': title,
+            'reference': self.reference(row)
+        }
+
+    def sections(self) -> List[Dict]:
+        return [self.section(row) for row in range(len(self.rows))]
@@ -0,0 +1,151 @@
+import time
+import uuid
+import threading
+from typing import Callable, Dict, Optional
+
+try:
+    import redis
+except ImportError:  # Redis is optional; calls are then only coalesced within the process
+    redis = None
+
+
+class _Call:
+    """One in-flight call that other callers with the same key wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce identical in-flight AI requests. Concurrent callers with the
+    same key in this process wait for one call and share its result. With
+    REDIS_URL set and a shared LLM cache (redis or sqlite), the caller that
+    makes the request also holds a short-lived Redis lock, and callers in
+    other processes wait for the answer to appear in the cache instead of
+    repeating the request. Nothing is kept once the call finishes.
+    """
+
+    PREFIX = 'single-flight:'
+    # Delete the lock only if this process still owns it
+    RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+
+    def __init__(self, app=None):
+        self.redis = None
+        self.lock_ttl = 120
+        self.wait_timeout = 120
+        self.poll_interval = 0.1
+        self.leaders = 0
+        self.coalesced = 0
+        self.remote_waits = 0
+        self.errors = 0
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.lock_ttl = app.config.get('SINGLE_FLIGHT_LOCK_TTL', 120)
+        self.wait_timeout = app.config.get('SINGLE_FLIGHT_WAIT', 120)
+        self.poll_interval = app.config.get('SINGLE_FLIGHT_POLL_INTERVAL', 0.1)
+
+        # Waiters in other processes can only receive the result through a shared cache
+        shared_cache = app.config.get('LLM_CACHE_BACKEND', 'memory') in ('redis', 'sqlite')
+        if shared_cache and app.config.get('REDIS_URL') and redis is not None:
+            self.redis = redis.Redis.from_url(app.config['REDIS_URL'])
+
+        app.extensions['single_flight'] = self
+
+    def do(self, key: str, call: Callable[[], str], lookup: Optional[Callable[[], Optional[str]]] = None) -> str:
+        """
+        Return call()'s result, sharing one execution among concurrent
+        callers with the same key. lookup reads the shared cache and lets
+        callers in other processes pick up the result.
+        """
+        with self._lock:
+            pending = self._calls.get(key)
+            if pending is None:
+                pending = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+
+        try:
+            pending.result = self._lead(key, call, lookup)
+            return pending.result
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            pending.done.set()
+
+    def _lead(self, key: str, call: Callable[[], str], lookup: Optional[Callable[[], Optional[str]]]) -> str:
+        """Make the call, or wait for another process that already is"""
+        if self.redis is None or lookup is None:
+            return call()
+
+        lock_key = self.PREFIX + key
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_timeout
+        waited = False
+        while True:
+            try:
+                acquired = self.redis.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+            except Exception as e:
+                print(f"Single-flight lock error: {e}")
+                with self._lock:
+                    self.errors += 1
+                return call()
+
+            if acquired:
+                try:
+                    return call()  # stores the answer in the shared cache before the lock goes
+                finally:
+                    try:
+                        self.redis.eval(self.RELEASE_SCRIPT, 1, lock_key, token)
+                    except Exception as e:
+                        print(f"Single-flight unlock error: {e}")  # the lock expires after lock_ttl
+
+            if not waited:
+                waited = True
+                with self._lock:
+                    self.remote_waits += 1
+            try:
+                while self.redis.exists(lock_key) and time.monotonic() < deadline:
+                    time.sleep(self.poll_interval)
+            except Exception as e:
+                print(f"Single-flight lock error: {e}")
+                with self._lock:
+                    self.errors += 1
+                return call()
+
+            result = lookup()
+            if result is not None:
+                return result
+            if time.monotonic() >= deadline:
+                return call()
+            # The other process finished without an answer (e.g. it failed): try to take over
+
+    def stats(self) -> Dict[str, any]:
+        """Coalescing counters for this process"""
+        with self._lock:
+            return {
+                'backend': 'redis' if self.redis is not None else 'process',
+                'in_flight': len(self._calls),
+                'leaders': self.leaders,
+                'coalesced': self.coalesced,
+                'remote_waits': self.remote_waits,
+                'errors': self.errors
+            }
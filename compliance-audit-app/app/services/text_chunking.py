@@ -0,0 +1,69 @@
+import re
+from typing import Dict, List
+
+# Lines that start a new section: "12.3 Title", "ARTICLE IV", "Section 5", "Schedule B", ...
+SECTION_HEADING = re.compile(
+    r'^[ \t]*(?:'
+    r'(?:article|section|clause|schedule|annex|appendix|exhibit|attachment)\b[ \t]*[\w.\-]*'
+    r'|\d{1,3}(?:\.\d{1,3})*\.?[ \t]+[A-Z]'
+    r'|[IVXLC]{1,6}\.[ \t]+[A-Z]'
+    r')',
+    re.IGNORECASE | re.MULTILINE
+)
+
+
+def split_sections(text: str) -> List[Dict]:
+    """Split text at section headings into spans with start/end offsets and the heading line"""
+    starts = sorted({0} | {match.start() for match in SECTION_HEADING.finditer(text)})
+    sections = []
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(text)
+        if not text[start:end].strip():
+            continue
+        heading = text[start:end].strip().split('\n', 1)[0][:120]
+        sections.append({'start': start, 'end': end, 'heading': heading})
+    return sections
+
+
+def chunk_text(text: str, max_chars: int = 6000, overlap: int = 300) -> List[Dict]:
+    """
+    Split text into chunks of at most max_chars that follow section
+    boundaries: whole sections are packed together, and a section longer
+    than max_chars is split at paragraph, line or sentence breaks with
+    `overlap` characters repeated so clauses on a boundary are seen whole.
+    Each chunk has index, start, end, text and the heading it starts in.
+    """
+    pieces = []
+    for section in split_sections(text):
+        pieces.extend(_split_long_span(text, section['start'], section['end'], section['heading'], max_chars, overlap))
+
+    chunks = []
+    for start, end, heading in pieces:
+        if chunks and end - chunks[-1]['start'] <= max_chars and chunks[-1]['end'] == start:
+            chunks[-1]['end'] = end  # Pack adjacent small sections together
+        else:
+            chunks.append({'start': start, 'end': end, 'heading': heading})
+
+    for index, chunk in enumerate(chunks):
+        chunk['index'] = index
+        chunk['text'] = text[chunk['start']:chunk['end']]
+    return chunks
+
+
+def _split_long_span(text: str, start: int, end: int, heading: str, max_chars: int, overlap: int) -> List[tuple]:
+    """Cut a span into pieces of at most max_chars at the latest natural break"""
+    pieces = []
+    while end - start > max_chars:
+        limit = start + max_chars
+        cut = -1
+        for separator in ('\n\n', '\n', '. '):
+            cut = text.rfind(separator, start + max_chars // 2, limit)
+            if cut != -1:
+                cut += len(separator)
+                break
+        if cut == -1:
+            cut = limit
+        pieces.append((start, cut, heading))
+        start = max(cut - overlap, start + 1)
+    pieces.append((start, end, heading))
+    return pieces
@@ -0,0 +1,106 @@
+import re
+import math
+import heapq
+import hashlib
+from collections import Counter
+from typing import Dict, List, Optional
+from .text_chunking import chunk_text
+
+# Words, numbers and dotted references such as "13485", "part 11" or "4.2.1"
+TOKEN = re.compile(r'[a-z0-9]+(?:\.[0-9]+)*')
+
+STOPWORDS = frozenset(
+    'a an and any are as at be been by can do does for from has have if in into is it its may must no not of on '
+    'or our shall should such than that the their then there these this those to under upon was were what when '
+    'where which who will with within without would you your'.split()
+)
+
+
+def text_digest(text: str) -> str:
+    """Version hash of a contract's text, to tell whether data derived from it is stale"""
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms without stopwords, plurals reduced to the singular ('penalties' -> 'penalty')"""
+    terms = []
+    for term in TOKEN.findall(text.lower()):
+        if term in STOPWORDS:
+            continue
+        if len(term) > 4 and term.endswith('ies'):
+            term = term[:-3] + 'y'
+        elif len(term) > 3 and term.endswith('s') and not term.endswith('ss'):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+
+class LexicalIndex:
+    """
+    BM25 index over section-aware chunks of a contract. Only chunk offsets
+    and postings are kept, so the index is stored next to the contract as
+    JSON and chunk text is sliced from extracted_text at query time.
+    """
+
+    VERSION = 1
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self, digest: str, chunks: List[List[int]], postings: Dict[str, List[int]], lengths: List[int]):
+        self.digest = digest
+        self.chunks = chunks  # [start, end] offsets into the text
+        self.postings = postings  # term -> flat [chunk, term frequency, chunk, term frequency, ...]
+        self.lengths = lengths  # terms per chunk
+        self.avg_length = sum(lengths) / len(lengths) if lengths else 0.0
+
+    @classmethod
+    def build(cls, text: str, max_chars: int = 1500, overlap: int = 150) -> 'LexicalIndex':
+        chunks, postings, lengths = [], {}, []
+        for chunk in chunk_text(text, max_chars, overlap):
+            counts = Counter(tokenize(chunk['text']))
+            for term, count in counts.items():
+                postings.setdefault(term, []).extend((chunk['index'], count))
+            chunks.append([chunk['start'], chunk['end']])
+            lengths.append(sum(counts.values()))
+        return cls(text_digest(text), chunks, postings, lengths)
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> Optional['LexicalIndex']:
+        """Load a stored index; None if missing or built by another version"""
+        if not data or data.get('version') != cls.VERSION:
+            return None
+        return cls(data['digest'], data['chunks'], data['postings'], data['lengths'])
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': self.VERSION,
+            'digest': self.digest,
+            'chunks': self.chunks,
+            'postings': self.postings,
+            'lengths': self.lengths
+        }
+
+    def matches(self, text: str) -> bool:
+        """Whether the index was built from this text"""
+        return self.digest == text_digest(text)
+
+    def search(self, query: str, k: int = 4) -> List[Dict]:
+        """Top-k chunks for the query by BM25 score, best first"""
+        count = len(self.chunks)
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            frequency = len(postings) // 2
+            idf = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for i in range(0, len(postings), 2):
+                chunk, tf = postings[i], postings[i + 1]
+                norm = 1 - self.B + self.B * self.lengths[chunk] / self.avg_length
+                scores[chunk] = scores.get(chunk, 0.0) + idf * tf * (self.K1 + 1) / (tf + self.K1 * norm)
+
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [
+            {'index': chunk, 'start': self.chunks[chunk][0], 'end': self.chunks[chunk][1], 'score': score}
+            for chunk, score in best
+        ]
@@ -0,0 +1,176 @@
+import re
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, List, Optional
+from .section_index import HEADING
+
+LINE = re.compile(r'[^\n]*\n?')
+
+# Runs of horizontal whitespace inside a line, and single tabs / no-break spaces
+SPACES = re.compile(r'[ \t ]{2,}|[\t ]')
+
+# 'Page 3', '3 of 12', '- 3 -', '[3]', '3/12'
+PAGE_NUMBER = re.compile(r'(?i)(?:page\s*)?[-–—(\[]?\s*\d{1,4}\s*(?:(?:of|/)\s*\d{1,4})?\s*[-–—)\]]?')
+
+DIGITS = re.compile(r'\d+')
+
+# Characters stripped from the ends of every line
+EDGE_WHITESPACE = ' \t\r\f '
+
+
+class NormalizedText:
+    """
+    Normalized contract text with an offset map back to the original. The
+    map is a list of runs: normalized text from new_starts[i] was copied
+    (or, for collapsed whitespace, replaced) from the original at
+    old_starts[i], so offsets inside a run translate by a constant.
+    """
+
+    def __init__(self, text: str, new_starts: List[int], old_starts: List[int], original_length: int,
+                 page_starts: Optional[List[int]] = None, stats: Optional[Dict] = None):
+        self.text = text
+        self.new_starts = new_starts
+        self.old_starts = old_starts
+        self.original_length = original_length
+        self.page_starts = page_starts
+        self.stats = stats or {}
+
+    def original_offset(self, offset: int) -> int:
+        """Offset in the original text of a normalized offset"""
+        run = bisect_right(self.new_starts, offset) - 1
+        if run < 0:
+            return 0
+        return min(self.old_starts[run] + offset - self.new_starts[run], self.original_length)
+
+    def normalized_offset(self, offset: int) -> int:
+        """Offset in the normalized text of an original one; removed text maps to where it was cut"""
+        run = bisect_right(self.old_starts, offset) - 1
+        if run < 0:
+            return 0
+        run_end = self.new_starts[run + 1] if run + 1 < len(self.new_starts) else len(self.text)
+        return min(self.new_starts[run] + offset - self.old_starts[run], run_end)
+
+
+class TextNormalizer:
+    """
+    Clean extracted text before it is sent to the model: repeated page
+    headers and footers and page numbers are removed, words hyphenated
+    across line breaks are joined, whitespace runs and blank lines are
+    collapsed and lines are trimmed. Line and paragraph breaks are kept,
+    since chunking, clause spans and section headings rely on them.
+    """
+
+    def __init__(self, edge_lines: int = 3, min_repeat_pages: int = 3, min_repeat_ratio: float = 0.5):
+        self.edge_lines = edge_lines  # lines at the top and bottom of a page searched for boilerplate
+        self.min_repeat_pages = min_repeat_pages
+        self.min_repeat_ratio = min_repeat_ratio
+
+    def normalize(self, text: str, page_starts: Optional[List[int]] = None) -> NormalizedText:
+        lines = self._lines(text)
+        removed = self._boilerplate(lines, page_starts or [])
+        kept, blank = [], False  # kept: (start, end, content, blank line before)
+        for number, (start, end, content) in enumerate(lines):
+            if not content:
+                blank = True
+            elif number not in removed:
+                kept.append((start, end, content, blank))
+                blank = False
+
+        pieces, new_starts, old_starts = [], [], []
+        length = 0
+
+        def emit(offset, piece):
+            nonlocal length
+            # A new run starts unless this piece continues the previous one in the original
+            if not new_starts or length - new_starts[-1] != offset - old_starts[-1]:
+                new_starts.append(length)
+                old_starts.append(offset)
+            pieces.append(piece)
+            length += len(piece)
+
+        hyphens, joined = 0, False
+        for position, (start, end, content, blank_before) in enumerate(kept):
+            if position and not joined:  # a joined word continues without a break
+                emit(kept[position - 1][1], '\n\n' if blank_before else '\n')
+            following = kept[position + 1] if position + 1 < len(kept) else None
+            joined = bool(following and not following[3] and content[-1:] == '-' and len(content) > 1
+                          and content[-2].isalpha() and following[2][:1].islower())
+            if joined:
+                content = content[:-1]
+                hyphens += 1
+            self._emit_line(start, content, emit)
+
+        normalized = ''.join(pieces)
+        result = NormalizedText(normalized, new_starts, old_starts, len(text))
+        if page_starts:
+            result.page_starts = [result.normalized_offset(start) for start in page_starts]
+        result.stats = {
+            'original_chars': len(text),
+            'normalized_chars': len(normalized),
+            'chars_saved': len(text) - len(normalized),
+            # Same estimate of roughly four characters per token as the AI rate limiter
+            'tokens_saved': (len(text) - len(normalized)) // 4,
+            'boilerplate_lines': len(removed),
+            'hyphens_joined': hyphens
+        }
+        return result
+
+    @staticmethod
+    def _emit_line(start, content, emit):
+        """Emit a trimmed line with whitespace runs collapsed to one space"""
+        position = 0
+        for match in SPACES.finditer(content):
+            if match.start() > position:
+                emit(start + position, content[position:match.start()])
+            emit(start + match.start(), ' ')
+            position = match.end()
+        if position < len(content):
+            emit(start + position, content[position:])
+
+    @staticmethod
+    def _lines(text):
+        """(start, end, trimmed content) of every line; start and end bound the content"""
+        lines = []
+        for match in LINE.finditer(text):
+            raw = match.group()
+            if not raw:
+                break
+            content = raw.rstrip('\n').strip(EDGE_WHITESPACE)
+            start = match.start() + raw.index(content) if content else match.start()
+            lines.append((start, start + len(content), content))
+        return lines
+
+    def _boilerplate(self, lines, page_starts):
+        """
+        Line numbers of page numbers and of headers/footers: lines at the
+        top or bottom of a page that recur, ignoring digits, on enough pages
+        """
+        if len(page_starts) < self.min_repeat_pages:
+            return set()
+        starts = [line[0] for line in lines]
+        edges = []  # per page: line numbers of its first and last non-blank lines
+        for page, page_start in enumerate(page_starts):
+            first = bisect_right(starts, page_start - 1)
+            last = bisect_right(starts, page_starts[page + 1] - 1) if page + 1 < len(page_starts) else len(lines)
+            numbers = [number for number in range(first, last) if lines[number][2]]
+            edges.append(set(numbers[:self.edge_lines] + numbers[-self.edge_lines:]))
+
+        keys = {}
+        repeats = Counter()
+        removed = set()
+        for numbers in edges:
+            page_keys = set()
+            for number in numbers:
+                content = lines[number][2]
+                if PAGE_NUMBER.fullmatch(content):
+                    removed.add(number)
+                    continue
+                if len(content) > 200 or HEADING.match(content):
+                    continue  # numbered headings such as '4. Term' differ only in digits too
+                keys[number] = DIGITS.sub('#', ' '.join(content.lower().split()))
+                page_keys.add(keys[number])
+            repeats.update(page_keys)
+
+        threshold = max(self.min_repeat_pages, self.min_repeat_ratio * len(page_starts))
+        removed.update(number for number, key in keys.items() if repeats[key] >= threshold)
+        return removed
@@ -0,0 +1,147 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import httpx
+from openai import AzureOpenAI, OpenAI
+from azure.cognitiveservices.vision.computervision import ComputerVisionClient
+from msrest.authentication import CognitiveServicesCredentials
+
+
+class ClientRegistry:
+    """
+    Process-wide Azure OpenAI, OpenAI and Computer Vision clients. Each
+    client is created once per process and shared by all threads, so HTTP
+    connections and TLS sessions are kept alive and reused between calls
+    instead of being set up again for every request. The thread pool that
+    submits and polls OCR operations is kept the same way.
+    """
+
+    # OpenAI clients for caller-supplied API keys kept at once
+    MAX_OPENAI_CLIENTS = 32
+
+    def __init__(self, app=None):
+        self.app = None
+        self._clients = {}
+        self._openai_clients = OrderedDict()  # api key hash -> OpenAI
+        self._http_client = None
+        self._ocr_executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['clients'] = self
+
+    def _config(self, name, default=None):
+        return self.app.config.get(name, default) if self.app else default
+
+    def _check_process(self):
+        """Drop clients inherited from a parent process; sockets must not be shared across a fork"""
+        if self._pid != os.getpid():
+            self._clients = {}
+            self._openai_clients = OrderedDict()
+            self._http_client = None
+            self._ocr_executor = None  # its threads do not survive a fork either
+            self._pid = os.getpid()
+
+    def http_client(self) -> httpx.Client:
+        """Shared connection pool for the OpenAI SDK clients"""
+        with self._lock:
+            self._check_process()
+            if self._http_client is None:
+                self._http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=self._config('AI_POOL_MAX_CONNECTIONS', 20),
+                        max_keepalive_connections=self._config('AI_POOL_MAX_KEEPALIVE', 10),
+                        keepalive_expiry=self._config('AI_POOL_KEEPALIVE_SECONDS', 60)
+                    ),
+                    timeout=self._config('AI_REQUEST_TIMEOUT', 60)
+                )
+            return self._http_client
+
+    def azure_openai(self) -> Optional[AzureOpenAI]:
+        """The Azure OpenAI client, or None if it is not configured"""
+        endpoint = self._config('AZURE_OPENAI_ENDPOINT')
+        key = self._config('AZURE_OPENAI_KEY')
+        if not endpoint or not key:
+            return None
+
+        http_client = self.http_client()
+        with self._lock:
+            if 'azure_openai' not in self._clients:
+                self._clients['azure_openai'] = AzureOpenAI(
+                    azure_endpoint=endpoint,
+                    api_key=key,
+                    api_version="2024-02-01",
+                    timeout=self._config('AI_REQUEST_TIMEOUT', 60),
+                    max_retries=0,  # AIService retries through the rate limiter, which honours retry-after
+                    http_client=http_client
+                )
+            return self._clients['azure_openai']
+
+    def openai(self, api_key: str) -> OpenAI:
+        """An OpenAI client for the given key, sharing the connection pool with all others"""
+        http_client = self.http_client()
+        key_hash = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+        with self._lock:
+            client = self._openai_clients.get(key_hash)
+            if client is None:
+                client = OpenAI(api_key=api_key, http_client=http_client)
+                self._openai_clients[key_hash] = client
+                while len(self._openai_clients) > self.MAX_OPENAI_CLIENTS:
+                    self._openai_clients.popitem(last=False)
+            self._openai_clients.move_to_end(key_hash)
+            return client
+
+    def computer_vision(self) -> Optional[ComputerVisionClient]:
+        """
+        The Computer Vision client, or None if it is not configured. msrest
+        keeps one keep-alive requests session per thread for each client.
+        """
+        endpoint = self._config('AZURE_COMPUTER_VISION_ENDPOINT')
+        key = self._config('AZURE_COMPUTER_VISION_KEY')
+        if not endpoint or not key:
+            return None
+
+        with self._lock:
+            self._check_process()
+            if 'computer_vision' not in self._clients:
+                self._clients['computer_vision'] = ComputerVisionClient(
+                    endpoint=endpoint,
+                    credentials=CognitiveServicesCredentials(key)
+                )
+            return self._clients['computer_vision']
+
+    def ocr_executor(self) -> ThreadPoolExecutor:
+        """
+        Threads for OCR Read calls, shared by every document. Sized for
+        OCR_MAX_CONCURRENCY operations from each of INGESTION_WORKERS jobs.
+        """
+        with self._lock:
+            self._check_process()
+            if self._ocr_executor is None:
+                self._ocr_executor = ThreadPoolExecutor(
+                    max_workers=self._config('OCR_MAX_CONCURRENCY', 4) * self._config('INGESTION_WORKERS', 4),
+                    thread_name_prefix='ocr'
+                )
+            return self._ocr_executor
+
+    def close(self):
+        """Close pooled connections (e.g. on worker shutdown)"""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            for client in self._clients.values():
+                if hasattr(client, 'close'):
+                    client.close()
+            if self._ocr_executor is not None:
+                self._ocr_executor.shutdown(wait=False)
+            self._clients = {}
+            self._openai_clients = OrderedDict()
+            self._http_client = None
+            self._ocr_executor = None
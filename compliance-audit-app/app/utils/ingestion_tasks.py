@@ -0,0 +1,421 @@
+import os
+from datetime import datetime
+from flask import current_app
+from app import db, task_queue, llm_cache, clients, rate_limiter, single_flight
+from app.models import Contract, Clause, IngestionJob
+from app.services import OCRService, AIService, LexicalIndex, ClauseRules, MetadataExtractor, SectionIndex, TextNormalizer
+from app.services.metadata_extractor import parse_date, parse_amount
+from app.services.section_index import find_passage
+from app.services.text_index import text_digest
+
+# Ingestion stages in order; each completed stage is checkpointed on the contract
+INGESTION_STAGES = ['stored', 'text_extracted', 'metadata_extracted', 'clauses_detected', 'persisted']
+
+
+@task_queue.task
+def process_contract_job(job_id):
+    """Run OCR and AI analysis for an uploaded contract outside the request"""
+    job = IngestionJob.query.get(job_id)
+    if not job:
+        print(f"Ingestion job {job_id} not found")
+        return
+
+    job.status = 'running'
+    job.started_at = datetime.utcnow()
+    db.session.commit()
+
+    contract = job.contract
+    file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], contract.stored_filename)
+
+    try:
+        result = process_contract(contract, file_path)
+
+        job.status = 'completed'
+        job.result = result
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+        # Summaries are precomputed so viewing one is a DB read
+        if result['ai_analysis'] and not summary_is_current(contract):
+            task_queue.submit(generate_summary_job, contract.id)
+
+    except Exception as e:
+        db.session.rollback()
+        # Completed stages stay checkpointed on the contract so a retry resumes from them
+        job = IngestionJob.query.get(job_id)
+        job.status = 'failed'
+        job.error = f'Processing failed at {_next_stage(job.contract)}: {str(e)}'
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+
+def process_contract(contract, file_path):
+    """
+    Run the remaining ingestion stages for a contract, committing a
+    checkpoint after each one so a failure never repeats finished work.
+    """
+    resumed_from = contract.ingestion_stage or 'stored'
+    checkpoint = dict(contract.ingestion_checkpoint or {})
+
+    if _stage_pending(contract, 'text_extracted'):
+        checkpoint['ocr'] = _extract_text(contract, file_path)
+        # Analysis saved from an earlier attempt was made on the previous text
+        for key in ('metadata', 'clauses', 'clause_detection', 'normalization'):
+            checkpoint.pop(key, None)
+        _complete_stage(contract, 'text_extracted', checkpoint)
+
+    # Chat questions retrieve their context from this index instead of resending the whole text
+    build_text_index(contract)
+    # Clauses are placed in this tree to record their section and page
+    build_section_index(contract)
+
+    ai_service = build_ai_service()
+
+    _run_analysis(contract, checkpoint, ai_service)
+
+    if _stage_pending(contract, 'persisted'):
+        _persist_analysis(contract, checkpoint, ai_service)
+        _complete_stage(contract, 'persisted', checkpoint)
+
+    return {
+        'ocr_method': checkpoint.get('ocr', {}).get('method'),
+        'ocr_cache': checkpoint.get('ocr', {}).get('cache'),
+        'ocr_stats': checkpoint.get('ocr', {}).get('ocr_stats'),
+        'ai_analysis': ai_service.client is not None,
+        'clause_detection': checkpoint.get('clause_detection'),
+        'normalization': checkpoint.get('normalization'),
+        'resumed_from': resumed_from
+    }
+
+
+def _run_analysis(contract, checkpoint, ai_service):
+    """
+    Run the pending metadata and clause stages concurrently. Whatever
+    finishes is checkpointed even if the other step fails or times out,
+    so a retry only repeats the missing step.
+    """
+    metadata_pending = _stage_pending(contract, 'metadata_extracted') and 'metadata' not in checkpoint
+    clauses_pending = _stage_pending(contract, 'clauses_detected') and 'clauses' not in checkpoint
+
+    text = contract.extracted_text
+    page_starts = checkpoint.get('ocr', {}).get('page_starts')
+    # The model sees the text without page boilerplate and whitespace runs
+    normalized = normalize_contract_text(contract) if metadata_pending or clauses_pending else None
+    if normalized:
+        text, page_starts = normalized.text, normalized.page_starts
+        checkpoint['normalization'] = normalized.stats
+
+    detection_stats = {}
+    steps = {}
+    if metadata_pending:
+        # Dates and value are read locally first, so this runs without a client too
+        steps['metadata'] = lambda: ai_service.extract_metadata(text)
+    if clauses_pending:
+        # Runs without a client too: the clause rules then produce the clauses on their own
+        steps['clauses'] = lambda: ai_service.detect_clauses(text, detection_stats, page_starts)
+
+    errors = {}
+    if steps:
+        results, errors = ai_service.run_concurrently(steps)
+        if 'clauses' in results and normalized:
+            _map_clause_offsets(results['clauses'], normalized)
+        checkpoint.update(results)
+        if 'clauses' in results:
+            checkpoint['clause_detection'] = detection_stats
+
+    if _stage_pending(contract, 'metadata_extracted') and 'metadata' in checkpoint:
+        _complete_stage(contract, 'metadata_extracted', checkpoint)
+    if _stage_pending(contract, 'clauses_detected') and 'clauses' in checkpoint \
+            and not _stage_pending(contract, 'metadata_extracted'):
+        _complete_stage(contract, 'clauses_detected', checkpoint)
+
+    if errors:
+        # Keep clauses found while metadata failed, for the retry to reuse
+        contract.ingestion_checkpoint = dict(checkpoint)
+        db.session.commit()
+        raise next(iter(errors.values()))
+
+
+def _map_clause_offsets(clauses, normalized):
+    """Record where each clause is in the original text, for its page and section"""
+    for clause in clauses:
+        offset = clause.get('offset')
+        if offset is None:
+            offset = find_passage(normalized.text, clause.get('content'))
+        if offset is not None:
+            clause['offset'] = normalized.original_offset(offset)
+        if clause.get('match_offset') is not None:
+            clause['match_offset'] = normalized.original_offset(clause['match_offset'])
+
+
+def _stage_pending(contract, stage):
+    """Whether a stage still has to run for this contract"""
+    current = contract.ingestion_stage or 'stored'
+    return INGESTION_STAGES.index(current) < INGESTION_STAGES.index(stage)
+
+
+def _next_stage(contract):
+    """The first stage that has not completed yet"""
+    current = contract.ingestion_stage or 'stored'
+    return INGESTION_STAGES[min(INGESTION_STAGES.index(current) + 1, len(INGESTION_STAGES) - 1)]
+
+
+def _complete_stage(contract, stage, checkpoint):
+    """Record a stage as completed along with the outputs gathered so far"""
+    contract.ingestion_stage = stage
+    contract.ingestion_checkpoint = dict(checkpoint)  # New object so the JSON change is detected
+    db.session.commit()
+
+
+def _extract_text(contract, file_path):
+    """Extract text from the stored PDF onto the contract"""
+    # Extract text using OCR service; its page-level OCR cache (OCR_CACHE_PATH)
+    # means re-processing does not pay for Azure Read again
+    ocr_service = OCRService(
+        current_app.config.get('AZURE_COMPUTER_VISION_ENDPOINT'),
+        current_app.config.get('AZURE_COMPUTER_VISION_KEY'),
+        max_concurrency=current_app.config.get('OCR_MAX_CONCURRENCY', 4),
+        dpi=current_app.config.get('OCR_RENDER_DPI', 300),
+        max_render_memory=current_app.config.get('OCR_MAX_RENDER_MEMORY_MB', 256) * 1024 * 1024,
+        min_page_chars=current_app.config.get('OCR_MIN_PAGE_CHARS', 50),
+        text_workers=current_app.config.get('PDF_TEXT_WORKERS', 1),
+        parallel_min_pages=current_app.config.get('PDF_PARALLEL_MIN_PAGES', 100),
+        text_backend=current_app.config.get('TEXT_EXTRACTION_BACKEND', 'pypdf2'),
+        ocr_backend=current_app.config.get('OCR_BACKEND', 'azure_ocr'),
+        ocr_fallback_backend=current_app.config.get('OCR_FALLBACK_BACKEND'),
+        image_prep=current_app.config.get('OCR_IMAGE_PREP', True),
+        min_dpi=current_app.config.get('OCR_MIN_DPI', 150),
+        max_image_bytes=current_app.config.get('OCR_MAX_IMAGE_MB', 4) * 1024 * 1024,
+        client=clients.computer_vision(),
+        executor=clients.ocr_executor()
+    )
+
+    ocr_result = ocr_service.extract_text_from_pdf(file_path)
+    ocr_cache = ocr_service.cache
+
+    if not ocr_result['success']:
+        raise RuntimeError(f"OCR failed: {ocr_result['error']}")
+
+    contract.extracted_text = ocr_result['text']
+
+    # Offset of each page in the text (pages are joined with a blank line), for page numbers of clauses
+    page_starts, offset = [], 0
+    for page in ocr_result['pages']:
+        page_starts.append(offset)
+        offset += len(page['text']) + 2
+
+    return {
+        'method': ocr_result['method'],
+        'page_starts': page_starts,
+        'page_methods': [page.get('method') for page in ocr_result['pages']],
+        'ocr_stats': ocr_result.get('ocr_stats'),
+        'cache': {'hits': ocr_cache.hits, 'misses': ocr_cache.misses} if ocr_cache else None
+    }
+
+
+def _persist_analysis(contract, checkpoint, ai_service):
+    """Apply checkpointed metadata and clauses to the contract and its clause records"""
+    metadata = checkpoint.get('metadata') or {}
+    clauses = checkpoint.get('clauses') or []
+
+    # Dates and amounts may come back in any format from the model; ones that cannot be read are skipped
+    for field in ('start_date', 'end_date', 'renewal_date'):
+        value = parse_date(metadata.get(field))
+        if value:
+            setattr(contract, field, value)
+
+    contract_value = parse_amount(metadata.get('contract_value'))
+    if contract_value is not None:
+        contract.contract_value = contract_value
+
+    if isinstance(metadata.get('currency'), str) and len(metadata['currency']) == 3:
+        contract.currency = metadata['currency'].upper()
+
+    if ai_service.client or clauses:
+        # Set risk level based on AI (or rule-based) assessment
+        risk_assessment = ai_service.assess_contract_risk(clauses)
+        contract.risk_level = risk_assessment.get('overall_risk', 'medium')
+
+    # Replace any clauses left by an earlier, interrupted attempt
+    contract.clauses.delete()
+
+    sections = build_section_index(contract)
+
+    # Create clause records
+    for clause_data in clauses:
+        page_number, section_reference = _clause_location(contract.extracted_text or '', sections, clause_data)
+        clause = Clause(
+            contract_id=contract.id,
+            clause_type=clause_data.get('clause_type', 'other'),
+            clause_subtype=clause_data.get('clause_subtype'),
+            title=clause_data.get('title', 'Untitled Clause'),
+            content=clause_data.get('content', '')[:1000],  # Limit content length
+            summary=clause_data.get('summary'),
+            page_number=page_number,
+            section_reference=section_reference,
+            compliance_requirement=clause_data.get('compliance_requirement'),
+            risk_assessment=clause_data.get('risk_assessment', 'medium'),
+            action_required=clause_data.get('action_required', False),
+            financial_amount=clause_data.get('financial_amount'),
+            penalty_amount=clause_data.get('penalty_amount'),
+            penalty_trigger=clause_data.get('penalty_trigger')
+        )
+        db.session.add(clause)
+
+
+def _clause_location(text, sections, clause_data):
+    """
+    (page_number, section_reference) of a clause: rule-detected clauses carry
+    the offset of their match, model ones are found by their content in the text
+    """
+    page_number = clause_data.get('page_number')
+    if sections is None:
+        return page_number, None
+    offset = clause_data.get('match_offset')
+    if offset is None:
+        offset = clause_data.get('offset')
+    if offset is None:
+        offset = find_passage(text, clause_data.get('content'))
+    if offset is None:
+        return page_number, None
+    row = sections.locate(offset)
+    if page_number is None or clause_data.get('match_offset') is not None:
+        page_number = sections.page_at(offset) or page_number  # the page of the match, not of its span
+    return page_number, sections.reference(row) if row is not None else None
+
+
+@task_queue.task
+def generate_summary_job(contract_id, force=False):
+    """Generate and store a contract's summary in the background"""
+    contract = Contract.query.get(contract_id)
+    if not contract:
+        print(f"Contract {contract_id} not found for summary")
+        return
+    refresh_contract_summary(contract, build_ai_service(), force=force)
+
+
+def summary_is_current(contract):
+    """Whether the stored summary was made from the contract's current text"""
+    return bool(contract.summary) and contract.summary_text_hash == text_digest(contract.extracted_text)
+
+
+def refresh_contract_summary(contract, ai_service, force=False):
+    """
+    Return the stored summary, regenerating and storing it first if it is
+    missing, was made from other text, or force is set. Raises on failure.
+    """
+    if not force and summary_is_current(contract):
+        return contract.summary
+    summary = ai_service.generate_summary(analysis_text(contract), use_cache=not force)
+    store_contract_summary(contract, summary, text_digest(contract.extracted_text))
+    return summary
+
+
+def store_contract_summary(contract, summary, text_hash):
+    """Save a summary with the hash of the text it summarizes"""
+    contract.summary = summary
+    contract.summary_text_hash = text_hash
+    contract.summary_generated_at = datetime.utcnow()
+    db.session.commit()
+
+
+def normalize_contract_text(contract):
+    """The contract's text cleaned for the model, with its offset map, or None when normalization is off"""
+    if not contract.extracted_text or not current_app.config.get('TEXT_NORMALIZATION', True):
+        return None
+    page_starts = ((contract.ingestion_checkpoint or {}).get('ocr') or {}).get('page_starts')
+    normalizer = TextNormalizer(min_repeat_ratio=current_app.config.get('TEXT_BOILERPLATE_MIN_RATIO', 0.5))
+    return normalizer.normalize(contract.extracted_text, page_starts)
+
+
+def analysis_text(contract):
+    """The text AI analysis of the whole contract is run on"""
+    normalized = normalize_contract_text(contract)
+    return normalized.text if normalized else contract.extracted_text
+
+
+def build_ai_service(priority='bulk'):
+    """AIService for background work, using the shared client, cache and rate limiter"""
+    return AIService(
+        current_app.config.get('AZURE_OPENAI_ENDPOINT'),
+        current_app.config.get('AZURE_OPENAI_KEY'),
+        current_app.config.get('AZURE_OPENAI_DEPLOYMENT_NAME'),
+        chunk_chars=current_app.config.get('AI_CHUNK_CHARS', 6000),
+        chunk_overlap=current_app.config.get('AI_CHUNK_OVERLAP', 300),
+        max_concurrency=current_app.config.get('AI_MAX_CONCURRENCY', 4),
+        max_clauses=current_app.config.get('AI_MAX_CLAUSES', 30),
+        request_timeout=current_app.config.get('AI_REQUEST_TIMEOUT', 60),
+        step_timeout=current_app.config.get('AI_STEP_TIMEOUT', 300),
+        cache=llm_cache,
+        client=clients.azure_openai(),
+        rate_limiter=rate_limiter,
+        priority=priority,
+        single_flight=single_flight,
+        clause_rules=ClauseRules() if current_app.config.get('AI_CLAUSE_RULES', True) else None,
+        metadata_extractor=MetadataExtractor(dayfirst=current_app.config.get('METADATA_DATE_DAYFIRST', False))
+        if current_app.config.get('METADATA_LOCAL_EXTRACTION', True) else None,
+        metadata_min_confidence=current_app.config.get('METADATA_MIN_CONFIDENCE', 0.75)
+    )
+
+
+def build_text_index(contract):
+    """The contract's retrieval index, rebuilt if missing or made from other text (caller commits)"""
+    if not contract.extracted_text:
+        return None
+    index = LexicalIndex.from_dict(contract.text_index)
+    if index is None or not index.matches(contract.extracted_text):
+        index = LexicalIndex.build(
+            contract.extracted_text,
+            max_chars=current_app.config.get('QA_CHUNK_CHARS', 1500),
+            overlap=current_app.config.get('QA_CHUNK_OVERLAP', 150)
+        )
+        contract.text_index = index.to_dict()
+    return index
+
+
+def build_section_index(contract):
+    """The contract's section tree, rebuilt if missing or made from other text (caller commits)"""
+    if not contract.extracted_text:
+        return None
+    index = SectionIndex.from_dict(contract.section_index)
+    if index is None or not index.matches(contract.extracted_text):
+        page_starts = ((contract.ingestion_checkpoint or {}).get('ocr') or {}).get('page_starts')
+        index = SectionIndex.build(contract.extracted_text, page_starts)
+        contract.section_index = index.to_dict()
+    return index
+
+
+def copy_contract_analysis(source, contract):
+    """Reuse the extracted text, metadata and clauses of an identical, already processed contract"""
+    contract.extracted_text = source.extracted_text
+    contract.text_index = source.text_index
+    contract.section_index = source.section_index
+    contract.summary = source.summary
+    contract.summary_text_hash = source.summary_text_hash
+    contract.summary_generated_at = source.summary_generated_at
+    contract.start_date = source.start_date
+    contract.end_date = source.end_date
+    contract.renewal_date = source.renewal_date
+    contract.contract_value = source.contract_value
+    contract.currency = source.currency
+    contract.risk_level = source.risk_level
+    contract.ingestion_stage = 'persisted'
+    contract.ingestion_checkpoint = source.ingestion_checkpoint
+
+    copied_columns = [
+        'clause_type', 'clause_subtype', 'title', 'content', 'summary', 'page_number',
+        'section_reference', 'compliance_requirement', 'risk_assessment', 'action_required',
+        'action_deadline', 'financial_amount', 'financial_currency', 'payment_terms',
+        'penalty_amount', 'penalty_trigger'
+    ]
+    for source_clause in source.clauses:
+        clause = Clause(contract_id=contract.id)
+        for column in copied_columns:
+            setattr(clause, column, getattr(source_clause, column))
+        db.session.add(clause)
+
+    return {
+        'ocr_method': 'duplicate',
+        'ai_analysis': source.clauses.count() > 0,
+        'duplicate_of': source.id
+    }
@@ -1,7 +1,9 @@
+import os
 from datetime import datetime, timedelta
 from app import db
-from app.models import Contract, Alert, User
+from app.models import Contract, Alert, User, UploadSession
 from app.services import EmailService
+from app.api.uploads import discard_running_hash
 
 def setup_scheduler(app, scheduler):
     """Setup scheduled tasks"""
@@ -182,6 +184,25 @@ def setup_scheduler(app, scheduler):
             
             db.session.commit()
     
+    def cleanup_stale_uploads():
+        """Discard chunked uploads that have not received data recently"""
+        with app.app_context():
+            cutoff_date = datetime.utcnow() - timedelta(hours=app.config['CHUNKED_UPLOAD_EXPIRY_HOURS'])
+            
+            stale_uploads = UploadSession.query.filter(
+                UploadSession.status == 'uploading',
+                UploadSession.updated_at < cutoff_date
+            ).all()
+            
+            for upload in stale_uploads:
+                part_path = os.path.join(app.config['UPLOAD_FOLDER'], upload.part_filename)
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                discard_running_hash(upload.id)
+                upload.status = 'aborted'
+            
+            db.session.commit()
+    
     # Add scheduled jobs
     scheduler.add_job(
         func=check_contract_expiry,
@@ -234,4 +255,13 @@ def setup_scheduler(app, scheduler):
         hour=2,
         minute=0,
         replace_existing=True
+    )
+    
+    scheduler.add_job(
+        func=cleanup_stale_uploads,
+        trigger='cron',
+        id='cleanup_stale_uploads',
+        hour=3,
+        minute=0,
+        replace_existing=True
     )
\ No newline at end of file
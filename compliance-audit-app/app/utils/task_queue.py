@@ -0,0 +1,84 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+try:
+    from celery import Celery
+except ImportError:  # Celery is optional; the thread pool is used without it
+    Celery = None
+
+
+class TaskQueue:
+    """
+    Dispatch background work either to Celery (using the configured
+    CELERY_BROKER_URL / CELERY_RESULT_BACKEND) or to an in-process
+    thread pool when no broker is available.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.backend = 'thread'
+        self.celery = None
+        self.executor = None
+        self._tasks: Dict[str, Callable] = {}
+        self._celery_task = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.backend = app.config.get('TASK_QUEUE_BACKEND', 'thread')
+
+        if self.backend == 'celery':
+            if Celery is None:
+                print("Celery is not installed, falling back to in-process task queue")
+                self.backend = 'thread'
+            else:
+                self._setup_celery(app)
+
+        if self.backend == 'thread':
+            self.executor = ThreadPoolExecutor(
+                max_workers=app.config.get('INGESTION_WORKERS', 4),
+                thread_name_prefix='ingestion'
+            )
+
+        app.extensions['task_queue'] = self
+
+    def _setup_celery(self, app):
+        """Create the Celery app and a single generic task that runs registered functions"""
+        self.celery = Celery(
+            app.import_name,
+            broker=app.config['CELERY_BROKER_URL'],
+            backend=app.config['CELERY_RESULT_BACKEND']
+        )
+
+        queue = self
+
+        @self.celery.task(name='compliance_audit.run_task')
+        def run_task(task_name, args):
+            queue._run(task_name, args)
+
+        self._celery_task = run_task
+
+    def task(self, func: Callable) -> Callable:
+        """Register a function so it can be submitted by name to any backend"""
+        self._tasks[func.__name__] = func
+        return func
+
+    def submit(self, func: Callable, *args):
+        """Queue a registered function to run in the background"""
+        task_name = func.__name__
+        if task_name not in self._tasks:
+            raise ValueError(f'Task {task_name} is not registered')
+
+        if self.backend == 'celery':
+            return self._celery_task.delay(task_name, list(args))
+        return self.executor.submit(self._run, task_name, args)
+
+    def _run(self, task_name: str, args):
+        """Run a registered task inside an application context"""
+        with self.app.app_context():
+            try:
+                return self._tasks[task_name](*args)
+            except Exception as e:
+                print(f"Background task {task_name} error: {e}")
+                raise
@@ -0,0 +1,48 @@
+import os
+import io
+import csv
+import json
+import hashlib
+
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+def save_upload(stream, file_path):
+    """Stream an uploaded file to disk and return its SHA-256 hex digest"""
+    sha256 = hashlib.sha256()
+    with open(file_path, 'wb') as out:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            sha256.update(chunk)
+            out.write(chunk)
+    return sha256.hexdigest()
+
+
+def parse_manifest(filename, content):
+    """
+    Parse a bulk upload manifest into {filename: {vendor_name, contract_number, title}}.
+    Accepts CSV with a 'filename' column, a JSON list of objects with a
+    'filename' key, or a JSON object keyed by filename.
+    """
+    text = content.decode('utf-8-sig')
+    if filename.lower().endswith('.json'):
+        data = json.loads(text)
+        if isinstance(data, dict):
+            rows = [dict(fields, filename=name) for name, fields in data.items()]
+        else:
+            rows = data
+    else:
+        rows = list(csv.DictReader(io.StringIO(text)))
+
+    manifest = {}
+    for row in rows:
+        name = (row.get('filename') or '').strip()
+        if not name:
+            raise ValueError('Every manifest entry needs a filename')
+        manifest[os.path.basename(name)] = {
+            key: (row.get(key) or '').strip() or None
+            for key in ('vendor_name', 'contract_number', 'title')
+        }
+    return manifest
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Compare sequential and concurrent AIService.analyze_contract.
+
+Uses the in-process fake chat client, so the numbers reflect orchestration
+only. Also shows the partial result when clause detection exceeds its
+step timeout: metadata is still returned.
+
+    python benchmarks/analyze_contract_benchmark.py --latency 1.0
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.ai_service import AIService
+from fake_chat_client import FakeChatClient
+from clause_detection_benchmark import make_contract
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=1.0, help='Fake model latency per request (s)')
+    parser.add_argument('--sections', type=int, default=3, help='Contract sections (one clause chunk)')
+    args = parser.parse_args()
+
+    text = make_contract(args.sections)
+
+    service = AIService(None, None, 'fake')
+    service.client = FakeChatClient(latency=args.latency)
+    start = time.perf_counter()
+    service.extract_metadata(text)
+    service.detect_clauses(text)
+    sequential = time.perf_counter() - start
+
+    service.client = FakeChatClient(latency=args.latency)
+    start = time.perf_counter()
+    result = service.analyze_contract(text)
+    concurrent = time.perf_counter() - start
+    assert result['success'] and not result['partial'], result['errors']
+
+    print(f"sequential:  {sequential:.2f}s")
+    print(f"concurrent:  {concurrent:.2f}s (slowest single step ~{args.latency:.2f}s)")
+
+    service = AIService(None, None, 'fake', step_timeout=args.latency * 1.5)
+    service.client = FakeChatClient(latency=args.latency)
+    slow_clauses = service.detect_clauses
+    service.detect_clauses = lambda text: (time.sleep(args.latency * 2), slow_clauses(text))[1]
+    start = time.perf_counter()
+    result = service.analyze_contract(text)
+    elapsed = time.perf_counter() - start
+    print(f"clause step timeout after {elapsed:.2f}s: metadata={bool(result['metadata'])}, "
+          f"clauses={len(result['clauses'])}, errors={result['errors']}")
+
+
+if __name__ == '__main__':
+    main()
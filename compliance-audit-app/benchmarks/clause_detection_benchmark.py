@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Measure clause detection coverage against cost for different chunk sizes.
+
+A synthetic contract with numbered sections has one clause planted per
+section (schedules at the back included). The previous single request
+on text[:6000] is compared with map-reduce detection at each chunk size.
+Coverage is the share of planted clauses detected; 'found' counts
+per-chunk results before deduplication, 'kept' after it.
+
+    python benchmarks/clause_detection_benchmark.py --sections 60 --chunk-chars 4000 6000 12000
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.ai_service import AIService
+from fake_chat_client import FakeChatClient
+
+BOILERPLATE = ("The parties agree that the obligations set out in this section apply for the full term "
+               "of the agreement and survive its termination where the context requires. ")
+
+
+def make_contract(sections):
+    parts = []
+    for number in range(1, sections + 1):
+        heading = f'{number}. Schedule {number}' if number > sections - 5 else f'{number}. Section {number}'
+        body = BOILERPLATE * 8 + f'CLAUSE-{number} applies to this section. ' + BOILERPLATE * 4
+        parts.append(f'{heading}\n{body}\n')
+    return '\n'.join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sections', type=int, default=60)
+    parser.add_argument('--chunk-chars', type=int, nargs='+', default=[4000, 6000, 12000])
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.5, help='Fake model latency per request (s)')
+    args = parser.parse_args()
+
+    text = make_contract(args.sections)
+    print(f"{len(text):,} characters, {args.sections} planted clauses, {args.latency}s per request")
+    print(f"{'mode':<22}{'chunks':>8}{'coverage':>10}{'found':>7}{'kept':>7}{'tokens':>9}{'seconds':>9}")
+
+    service = AIService(None, None, 'fake')
+    service.client = FakeChatClient(latency=args.latency)
+    planted_prefix = text[:6000]
+    start = time.perf_counter()
+    legacy_found = sum(1 for n in range(1, args.sections + 1) if f'CLAUSE-{n} ' in planted_prefix)
+    service.client.create(model='fake', messages=[{'role': 'user', 'content': planted_prefix}])
+    elapsed = time.perf_counter() - start
+    print(f"{'text[:6000]':<22}{1:>8}{legacy_found / args.sections:>10.0%}{legacy_found:>7}{legacy_found:>7}"
+          f"{len(planted_prefix) // 4:>9}{elapsed:>9.2f}")
+
+    for chunk_chars in args.chunk_chars:
+        # No top-N cut, so coverage counts every distinct clause that was detected
+        service = AIService(None, None, 'fake', chunk_chars=chunk_chars, max_concurrency=args.concurrency,
+                            max_clauses=args.sections * 2)
+        service.client = FakeChatClient(latency=args.latency)
+        stats = {}
+        start = time.perf_counter()
+        clauses = service.detect_clauses(text, stats)
+        elapsed = time.perf_counter() - start
+        detected = {re.search(r'CLAUSE-(\d+)', clause['content']).group(1) for clause in clauses}
+        print(f"{f'chunks of {chunk_chars}':<22}{stats['chunks']:>8}{len(detected) / args.sections:>10.0%}"
+              f"{stats['clauses_found']:>7}{stats['clauses_kept']:>7}{stats['usage']['total_tokens']:>9}{elapsed:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Measure the rule-based clause pre-classifier against model-only detection.
+
+A synthetic contract of --pages pages has boilerplate paragraphs with
+clause sentences planted on each page: literal references (ISO 13485,
+21 CFR Part 11, EU GDP, GMP Annex 1, liquidated damages) and keyword
+clauses (payment, termination, warranty, ...), each tagged CLAUSE-<n> so
+the fake model can report it. Prints scan time, model requests, tokens,
+wall time, clauses kept and coverage for model-only detection, rules plus
+model on the ambiguous spans, and rules alone (no AI configured). Coverage
+is the share of planted clauses a rule matched or the model was shown;
+repeated literal references are kept as one clause per reference. Since
+the fake model returns no more clauses than the prompt allows, as a real
+one would, 'keywords kept' is the share of planted keyword clauses
+(payment, termination, ...) that survive as clauses.
+
+    python benchmarks/clause_rules_benchmark.py --pages 100 --latency 0.5
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.ai_service import AIService
+from app.services.clause_rules import ClauseRules
+from fake_chat_client import FakeChatClient
+
+PARAGRAPH = ("The parties agree that the obligations set out in this section apply for the full term "
+             "of the agreement where the context requires. ") * 4
+SURVIVAL = ("The obligations in this section survive its termination where the context requires, and "
+            "each party shall act in good faith in carrying them out. ") * 2
+
+CLAUSES = [
+    'The Supplier shall maintain ISO 13485 certification for all sites (CLAUSE-{n}).',
+    'Electronic batch records shall comply with 21 CFR Part 11 (CLAUSE-{n}).',
+    'Products are stored and transported at 2-8 degrees Celsius under EU GDP (CLAUSE-{n}).',
+    'Aseptic filling follows EU GMP Annex 1 (CLAUSE-{n}).',
+    'Late delivery incurs liquidated damages of 0.5% per week (CLAUSE-{n}).',
+    'Invoices are payable within 45 days of receipt (CLAUSE-{n}).',
+    'Either party may terminate this agreement with ninety days notice (CLAUSE-{n}).',
+    'The Supplier warrants that products conform to the specification (CLAUSE-{n}).',
+    'Each party keeps the other party\'s confidential information secret (CLAUSE-{n}).',
+    'Neither party is liable for consequential damages (CLAUSE-{n}).',
+]
+KEYWORD_CLAUSES = 5  # CLAUSES from this index on have no literal reference
+
+
+def make_contract(pages, paragraphs_per_page=7):
+    """Contract text and the offset of each page, joined the way OCRService joins pages"""
+    texts = []
+    for page in range(1, pages + 1):
+        paragraphs = [f'{page}. Section {page}'] + [PARAGRAPH] * (paragraphs_per_page - 1) + [SURVIVAL]
+        paragraphs.insert(3, CLAUSES[page % len(CLAUSES)].format(n=page))
+        texts.append('\n\n'.join(paragraphs))
+    page_starts, offset = [], 0
+    for page_text in texts:
+        page_starts.append(offset)
+        offset += len(page_text) + 2
+    return ''.join(page_text + '\n\n' for page_text in texts), page_starts
+
+
+def run(text, page_starts, pages, latency, rules, model):
+    service = AIService(None, None, 'fake', max_clauses=pages * 2,
+                        clause_rules=ClauseRules() if rules else None)
+    if model:
+        service.client = FakeChatClient(latency=latency)
+    stats = {}
+    start = time.perf_counter()
+    clauses = service.detect_clauses(text, stats, page_starts)
+    elapsed = time.perf_counter() - start
+    if rules:
+        reviewed = ' '.join(text[span['start']:span['end']] for span in service.clause_rules.scan(text, page_starts))
+    else:
+        reviewed = ' '.join(clause['content'] for clause in clauses)
+    covered = len(set(re.findall(r'CLAUSE-(\d+)', reviewed)))
+    kept = {int(number) for clause in clauses for number in re.findall(r'CLAUSE-(\d+)', clause['content'])}
+    keywords_kept = sum(1 for page in kept if page % len(CLAUSES) >= KEYWORD_CLAUSES)
+    on_page = sum(1 for clause in clauses if clause.get('page_number') is not None)
+    return stats, elapsed, len(clauses), covered, keywords_kept, on_page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.5, help='Fake model latency per request (s)')
+    args = parser.parse_args()
+
+    text, page_starts = make_contract(args.pages)
+    rules = ClauseRules()
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        spans = rules.scan(text, page_starts)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"{args.pages} pages, {len(text):,} characters: rule scan {min(timings):.1f} ms, "
+          f"{len(spans)} candidate spans ({sum(1 for span in spans if span['ambiguous'])} ambiguous)")
+
+    keyword_pages = sum(1 for page in range(1, args.pages + 1) if page % len(CLAUSES) >= KEYWORD_CLAUSES)
+    print(f"{'mode':<16}{'requests':>10}{'sent chars':>12}{'tokens':>9}{'seconds':>9}{'kept':>6}{'coverage':>10}"
+          f"{'keywords kept':>15}{'with page':>11}")
+    for label, use_rules, model in (('model only', False, True), ('rules + model', True, True), ('rules only', True, False)):
+        stats, elapsed, kept, covered, keywords_kept, on_page = run(
+            text, page_starts, args.pages, args.latency, use_rules, model)
+        sent = stats.get('sent_chars', len(text) if model else 0)
+        print(f"{label:<16}{stats['chunks']:>10}{sent:>12,}{stats['usage']['total_tokens']:>9}{elapsed:>9.2f}"
+              f"{kept:>6}{covered / args.pages:>10.0%}{keywords_kept / keyword_pages:>15.0%}{on_page:>11}")
+
+
+if __name__ == '__main__':
+    main()
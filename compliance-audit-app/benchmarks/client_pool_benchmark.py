@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Compare a new SDK client per call with the shared ClientRegistry clients.
+
+Starts a local HTTPS mock of Azure OpenAI chat completions and the
+Computer Vision Read API (self-signed certificate) and times sequential
+calls made the way the app used to (client constructed per request) and
+through the process-wide pooled clients. --rtt adds a simulated network
+round trip to every request and two more to every new connection (TCP
+and TLS handshakes), as a remote Azure region would.
+
+    python benchmarks/client_pool_benchmark.py --calls 50 --rtt 0.02
+"""
+
+import argparse
+import datetime
+import io
+import ipaddress
+import json
+import os
+import ssl
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from openai import AzureOpenAI
+from azure.cognitiveservices.vision.computervision import ComputerVisionClient
+from msrest.authentication import CognitiveServicesCredentials
+from app.utils.client_registry import ClientRegistry
+
+
+class FakeApp:
+    def __init__(self, config):
+        self.config = config
+        self.extensions = {}
+
+
+def write_self_signed_cert(directory):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'localhost')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([
+            x509.DNSName('localhost'), x509.IPAddress(ipaddress.ip_address('127.0.0.1'))
+        ]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, 'cert.pem')
+    key_path = os.path.join(directory, 'key.pem')
+    with open(cert_path, 'wb') as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, 'wb') as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    return cert_path, key_path
+
+
+class MockAzureServer(ThreadingHTTPServer):
+    """HTTPS server answering chat completions and Read API submit/poll requests"""
+
+    daemon_threads = True
+
+    def __init__(self, cert_path, key_path, rtt):
+        self.rtt = rtt
+        self.connections = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.context.load_cert_chain(cert_path, key_path)
+        super().__init__(('127.0.0.1', 0), MockHandler)
+
+    @property
+    def endpoint(self):
+        return f'https://localhost:{self.server_address[1]}'
+
+    def get_request(self):
+        sock, addr = self.socket.accept()
+        with self.lock:
+            self.connections += 1
+        # The handshake runs in the handler thread so slow connections do not block accept()
+        return self.context.wrap_socket(sock, server_side=True, do_handshake_on_connect=False), addr
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, as Azure does
+    disable_nagle_algorithm = True  # otherwise delayed ACKs add ~40 ms to every keep-alive response
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        time.sleep(2 * self.server.rtt)  # TCP and TLS handshakes
+        try:
+            self.request.do_handshake()
+        except (ssl.SSLError, OSError):
+            pass
+        super().setup()
+
+    def _read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() != 'chunked':
+            return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        body = b''
+        while True:
+            size = int(self.rfile.readline().split(b';')[0], 16)
+            chunk = self.rfile.read(size)
+            self.rfile.readline()
+            if not size:
+                return body
+            body += chunk
+
+    def _send(self, status, payload=None, headers=None):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _begin(self):
+        time.sleep(self.server.rtt)
+        with self.server.lock:
+            self.server.requests += 1
+
+    def do_POST(self):
+        self._read_body()
+        self._begin()
+        if 'chat/completions' in self.path:
+            self._send(200, {
+                'id': 'chatcmpl-mock', 'object': 'chat.completion', 'created': int(time.time()), 'model': 'gpt-4',
+                'choices': [{'index': 0, 'finish_reason': 'stop',
+                             'message': {'role': 'assistant', 'content': 'Mock answer'}}],
+                'usage': {'prompt_tokens': 10, 'completion_tokens': 2, 'total_tokens': 12}
+            })
+        else:
+            location = f'{self.server.endpoint}/vision/v3.2/read/analyzeResults/{uuid.uuid4().hex}'
+            self._send(202, headers={'Operation-Location': location})
+
+    def do_GET(self):
+        self._begin()
+        self._send(200, {
+            'status': 'succeeded',
+            'analyzeResult': {'version': '3.2', 'readResults': [
+                {'page': 1, 'lines': [{'boundingBox': [0] * 8, 'text': 'Mock OCR text', 'words': []}]}
+            ]}
+        })
+
+
+def chat_call(client):
+    client.chat.completions.create(
+        model='gpt-4', messages=[{'role': 'user', 'content': 'ping'}], temperature=0, max_tokens=5
+    )
+
+
+def read_call(client):
+    response = client.read_in_stream(io.BytesIO(b'\x89PNG mock page'), raw=True)
+    operation_id = response.headers['Operation-Location'].split('/')[-1]
+    client.get_read_result(operation_id)
+
+
+def timed(server, calls, make_client, call):
+    start_connections = server.connections
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call(make_client())
+        latencies.append(time.perf_counter() - start)
+    mean_ms = sum(latencies) / len(latencies) * 1000
+    return mean_ms, server.connections - start_connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=50)
+    parser.add_argument('--rtt', type=float, default=0.0, help='Simulated network round trip (s)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cert_path, key_path = write_self_signed_cert(tmp)
+        # Trust the mock's certificate in httpx (OpenAI SDK) and requests (msrest)
+        os.environ['SSL_CERT_FILE'] = cert_path
+        os.environ['REQUESTS_CA_BUNDLE'] = cert_path
+
+        server = MockAzureServer(cert_path, key_path, args.rtt)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        endpoint = server.endpoint
+
+        registry = ClientRegistry(FakeApp({
+            'AZURE_OPENAI_ENDPOINT': endpoint,
+            'AZURE_OPENAI_KEY': 'mock-key',
+            'AZURE_COMPUTER_VISION_ENDPOINT': endpoint,
+            'AZURE_COMPUTER_VISION_KEY': 'mock-key'
+        }))
+
+        cases = [
+            ('chat completion', chat_call,
+             lambda: AzureOpenAI(azure_endpoint=endpoint, api_key='mock-key', api_version='2024-02-01'),
+             registry.azure_openai),
+            ('read submit+poll', read_call,
+             lambda: ComputerVisionClient(endpoint=endpoint, credentials=CognitiveServicesCredentials('mock-key')),
+             registry.computer_vision),
+        ]
+
+        print(f"{args.calls} sequential calls, simulated RTT {args.rtt * 1000:.0f} ms")
+        for label, call, per_call, pooled in cases:
+            call(pooled())  # warm-up: imports, first connection
+            new_ms, new_conns = timed(server, args.calls, per_call, call)
+            pooled_ms, pooled_conns = timed(server, args.calls, pooled, call)
+            print(f"{label:<17} per-call client {new_ms:7.2f} ms ({new_conns} connections)   "
+                  f"pooled {pooled_ms:7.2f} ms ({pooled_conns} connections)   "
+                  f"saved {new_ms - pooled_ms:6.2f} ms/call")
+
+        registry.close()
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark every registered text extraction backend over a PDF corpus.
+
+Reports pages/sec, peak resident memory and character-level agreement.
+Agreement is measured against the known text of the generated fixtures,
+or against the --reference backend for a corpus directory of real PDFs.
+Each backend runs in its own process so its peak memory is isolated.
+Backends whose libraries or credentials are missing are listed as skipped.
+
+    python benchmarks/extraction_backend_benchmark.py
+    python benchmarks/extraction_backend_benchmark.py --corpus ~/contracts --reference pdfium
+"""
+
+import argparse
+import difflib
+import glob
+import multiprocessing
+import os
+import re
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PIL import Image, ImageDraw
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from app.services.extraction_backends import BACKENDS
+
+CLAUSE = ("{page}.{line} The Supplier shall comply with 21 CFR Part 11 and pay liquidated damages "
+          "of USD {amount:,} per day of delay.")
+
+
+def page_lines(page):
+    return [CLAUSE.format(page=page, line=line, amount=page * 1000 + line) for line in range(1, 31)]
+
+
+def generate_corpus(directory, pages):
+    """Write a text-layer PDF and a scanned (image-only) PDF with known page texts"""
+    expected = {}
+
+    text_pdf = os.path.join(directory, 'text_layer.pdf')
+    pdf = canvas.Canvas(text_pdf, pagesize=A4)
+    for page in range(1, pages + 1):
+        text = pdf.beginText(40, 800)
+        text.setFont('Helvetica', 9)
+        for line in page_lines(page):
+            text.textLine(line)
+        pdf.drawText(text)
+        pdf.showPage()
+    pdf.save()
+    expected[text_pdf] = ['\n'.join(page_lines(page)) for page in range(1, pages + 1)]
+
+    scanned_pdf = os.path.join(directory, 'scanned.pdf')
+    images = []
+    for page in range(1, pages + 1):
+        image = Image.new('L', (1654, 2339), color=255)  # A4 at 200 DPI
+        draw = ImageDraw.Draw(image)
+        for i, line in enumerate(page_lines(page)):
+            draw.text((100, 100 + i * 60), line, fill=0, font_size=28)
+        images.append(image)
+    images[0].save(scanned_pdf, save_all=True, append_images=images[1:], resolution=200)
+    expected[scanned_pdf] = ['\n'.join(page_lines(page)) for page in range(1, pages + 1)]
+
+    return expected
+
+
+def run_backend(name, pdf_paths, service_options):
+    """Extract every document with one backend (runs in a fresh process)"""
+    from app.services.ocr_service import OCRService
+
+    service = OCRService(
+        os.environ.get('AZURE_COMPUTER_VISION_ENDPOINT'),
+        os.environ.get('AZURE_COMPUTER_VISION_KEY'),
+        **service_options
+    )
+    backend = BACKENDS[name](service)
+    if not backend.available():
+        return None
+
+    start = time.perf_counter()
+    texts = {}
+    for pdf_path in pdf_paths:
+        pages = backend.extract_pages(pdf_path)
+        texts[pdf_path] = [page['text'] for page in sorted(pages, key=lambda page: page['page_number'])]
+    elapsed = time.perf_counter() - start
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Linux reports KB
+    return {'seconds': elapsed, 'texts': texts, 'peak_rss': peak_rss}
+
+
+def baseline_rss():
+    """Peak memory of a worker that only imports the service, for comparison"""
+    from app.services.ocr_service import OCRService  # noqa: F401
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def normalize(text):
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def agreement(expected_pages, actual_pages):
+    """Character-level similarity across pages, weighted by expected page length"""
+    matched = total = 0
+    for i, expected in enumerate(expected_pages):
+        expected = normalize(expected)
+        actual = normalize(actual_pages[i]) if i < len(actual_pages) else ''
+        if not expected:
+            continue
+        ratio = difflib.SequenceMatcher(None, expected, actual, autojunk=False).ratio()
+        matched += ratio * len(expected)
+        total += len(expected)
+    return matched / total if total else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help='Directory of PDFs (default: generate fixtures)')
+    parser.add_argument('--pages', type=int, default=20, help='Pages per generated fixture')
+    parser.add_argument('--reference', default='pypdf2', help='Backend used as ground truth for --corpus')
+    parser.add_argument('--backends', nargs='+', default=sorted(BACKENDS))
+    parser.add_argument('--dpi', type=int, default=200, help='Render DPI for OCR backends')
+    args = parser.parse_args()
+
+    service_options = {'dpi': args.dpi, 'max_render_memory': 256 * 1024 * 1024}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.corpus:
+            pdf_paths = sorted(glob.glob(os.path.join(args.corpus, '*.pdf')))
+            expected = None
+        else:
+            expected = generate_corpus(tmp, args.pages)
+            pdf_paths = sorted(expected)
+
+        results = {}
+        spawn = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            baseline = pool.submit(baseline_rss).result()
+        for name in args.backends:
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                try:
+                    results[name] = pool.submit(run_backend, name, pdf_paths, service_options).result()
+                except Exception as e:
+                    print(f"{name}: failed ({e})")
+                    results[name] = None
+
+        if expected is None:
+            reference = results.get(args.reference)
+            if not reference:
+                sys.exit(f"Reference backend {args.reference} is not available")
+            expected = reference['texts']
+
+        total_pages = sum(len(pages) for pages in expected.values())
+        documents = [os.path.basename(path) for path in pdf_paths]
+        print(f"{len(pdf_paths)} documents, {total_pages} pages, {os.cpu_count()} CPUs, "
+              f"{baseline / (1024 * 1024):.0f} MB baseline per worker")
+        print(f"{'backend':<12}{'kind':<6}{'pages/s':>10}{'peak MB':>10}" + ''.join(f"{d[:16]:>18}" for d in documents))
+
+        for name in args.backends:
+            kind = BACKENDS[name].kind
+            result = results.get(name)
+            if not result:
+                print(f"{name:<12}{kind:<6}{'skipped (not installed or not configured)':>40}")
+                continue
+            pages_per_second = total_pages / result['seconds'] if result['seconds'] else float('inf')
+            scores = ''.join(f"{agreement(expected[path], result['texts'][path]):>18.1%}" for path in pdf_paths)
+            print(f"{name:<12}{kind:<6}{pages_per_second:>10.1f}{result['peak_rss'] / (1024 * 1024):>10.0f}{scores}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+In-process stand-in for the AzureOpenAI chat completions client.
+
+Each request sleeps for `latency` seconds and answers from the prompt
+itself: clause detection prompts return one clause per planted
+"CLAUSE-<n>" marker in the excerpt, up to the prompt's "Maximum <n>" like
+a real model, metadata prompts return a fixed JSON
+object, summary prompts a 150-word summary, anything else a short text
+answer. Token usage is estimated at four characters per token. With
+stream=True the answer arrives word by word: the first after
+`first_token_latency`, the rest spread over the remaining latency. Used by the AI benchmarks so they run
+without Azure credentials.
+"""
+
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+
+class FakeChatClient:
+    def __init__(self, latency: float = 0.5, fail_on: str = None, first_token_latency: float = None):
+        self.latency = latency
+        self.first_token_latency = latency / 10 if first_token_latency is None else first_token_latency
+        self.fail_on = fail_on  # Raise for prompts containing this text
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, temperature=None, max_tokens=None, stream=False, **kwargs):
+        prompt = messages[-1]['content']
+        if stream:
+            with self.lock:
+                self.requests += 1
+            return self._stream(prompt)
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            if self.fail_on and self.fail_on in prompt:
+                raise RuntimeError('simulated API failure')
+            content = self._answer(prompt)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+        prompt_tokens = sum(len(message['content']) for message in messages) // 4
+        completion_tokens = len(content) // 4
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens
+            )
+        )
+
+    def _stream(self, prompt):
+        time.sleep(self.first_token_latency)
+        if self.fail_on and self.fail_on in prompt:
+            raise RuntimeError('simulated API failure')
+        words = self._answer(prompt).split(' ')
+        for number, word in enumerate(words):
+            if number:
+                time.sleep((self.latency - self.first_token_latency) / len(words))
+            delta = SimpleNamespace(content=word if number == 0 else ' ' + word)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    def _answer(self, prompt):
+        if 'identify important clauses' in prompt:
+            clauses = []
+            for number in sorted(set(re.findall(r'CLAUSE-(\d+)', prompt)), key=int):
+                number = int(number)
+                clauses.append({
+                    'clause_type': 'penalty' if number % 3 == 0 else 'regulatory',
+                    'title': f'Clause {number}',
+                    'content': f'CLAUSE-{number} obligations of the supplier under this agreement',
+                    'risk_assessment': ['low', 'medium', 'high'][number % 3],
+                    'action_required': number % 2 == 0
+                })
+            cap = re.search(r'Maximum (\d+)', prompt)
+            return json.dumps(clauses[:int(cap.group(1))] if cap else clauses)
+        if 'Extract the following information' in prompt:
+            return json.dumps({'vendor_name': 'Acme', 'start_date': '2025-01-01', 'end_date': '2027-12-31',
+                               'contract_value': 250000, 'currency': 'EUR'})
+        if 'executive summary' in prompt:
+            return ' '.join(['Acme supplies sterile components under ISO 13485 with quarterly audits.'] * 15)
+        return 'The contract does not specify this.'
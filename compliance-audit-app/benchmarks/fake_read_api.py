@@ -0,0 +1,106 @@
+"""
+Minimal local stand-in for the Azure Computer Vision Read API (v3.2).
+
+Each submitted image becomes an operation that reports 'running' until
+`latency` seconds have passed and then 'succeeded' with one line of text
+per page. An optional bandwidth (bytes/s) delays uploads as a slow egress
+link would. Used by the OCR benchmarks so they run without Azure credentials.
+"""
+
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeReadAPI:
+    def __init__(self, latency: float = 1.0, request_delay: float = 0.05, bandwidth: float = None):
+        self.latency = latency
+        self.request_delay = request_delay
+        self.bandwidth = bandwidth  # bytes/s shared by all uploads, to emulate a constrained link
+        self.upload_lock = threading.Lock()
+        self.operations = {}
+        self.submitted = 0
+        self.polled = 0
+        self.bytes_received = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server.server_address
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _read_body(self):
+                if self.headers.get('Transfer-Encoding', '').lower() != 'chunked':
+                    return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                # The SDK streams image bodies with chunked transfer encoding
+                body = b''
+                while True:
+                    size = int(self.rfile.readline().split(b';')[0], 16)
+                    chunk = self.rfile.read(size)
+                    self.rfile.readline()  # CRLF after each chunk
+                    if not size:
+                        return body
+                    body += chunk
+
+            def do_POST(self):
+                body = self._read_body()
+                if api.bandwidth:
+                    with api.upload_lock:  # Uploads queue for the link one at a time
+                        time.sleep(len(body) / api.bandwidth)
+                time.sleep(api.request_delay)
+                operation_id = uuid.uuid4().hex
+                with api.lock:
+                    api.submitted += 1
+                    api.bytes_received += len(body)
+                    api.operations[operation_id] = (time.monotonic(), api.submitted)
+                self.send_response(202)
+                self.send_header('Operation-Location', f'{api.endpoint}/vision/v3.2/read/analyzeResults/{operation_id}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_GET(self):
+                operation_id = self.path.rstrip('/').split('/')[-1]
+                time.sleep(api.request_delay)
+                with api.lock:
+                    api.polled += 1
+                    started, number = api.operations[operation_id]
+                if time.monotonic() - started < api.latency:
+                    payload = {'status': 'running'}
+                else:
+                    payload = {
+                        'status': 'succeeded',
+                        'analyzeResult': {
+                            'version': '3.2',
+                            'readResults': [{
+                                'page': 1,
+                                'lines': [{'boundingBox': [0] * 8, 'text': f'Fake OCR text for operation {number}', 'words': []}]
+                            }]
+                        }
+                    }
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
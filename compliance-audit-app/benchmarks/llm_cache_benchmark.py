@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Show repeat AI requests served from the LLM response cache.
+
+Runs a summary and a question twice against the in-process fake chat
+client for each available cache backend and prints per-call latency and
+the cache's hit-rate metrics.
+
+    python benchmarks/llm_cache_benchmark.py --latency 1.5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.ai_service import AIService
+from app.services.llm_cache import LLMCache, redis
+from fake_chat_client import FakeChatClient
+from clause_detection_benchmark import make_contract
+
+
+class FakeApp:
+    def __init__(self, config):
+        self.config = config
+        self.extensions = {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=1.5, help='Fake model latency per request (s)')
+    parser.add_argument('--redis-url', default=os.environ.get('REDIS_URL'))
+    args = parser.parse_args()
+
+    text = make_contract(10)
+    backends = ['memory', 'sqlite'] + (['redis'] if redis and args.redis_url else [])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            cache = LLMCache(FakeApp({
+                'LLM_CACHE_BACKEND': backend,
+                'LLM_CACHE_PATH': os.path.join(tmp, 'llm_cache.db'),
+                'REDIS_URL': args.redis_url,
+                'LLM_CACHE_TTL': 300,
+                'LLM_CACHE_MAX_ENTRIES': 100
+            }))
+            cache.clear()
+            service = AIService(None, None, 'fake', cache=cache)
+            service.client = FakeChatClient(latency=args.latency)
+
+            print(f"[{backend}]")
+            for view in ('first view', 'repeat view'):
+                start = time.perf_counter()
+                service.summarize_contract(text)
+                summary_ms = (time.perf_counter() - start) * 1000
+                start = time.perf_counter()
+                service.answer_contract_question(text, 'Are there any penalty clauses?')
+                question_ms = (time.perf_counter() - start) * 1000
+                print(f"  {view:<12} summary {summary_ms:8.1f} ms   question {question_ms:8.1f} ms")
+
+            stats = cache.stats()
+            print(f"  model requests {service.client.requests}, hits {stats['hits']}, misses {stats['misses']}, "
+                  f"hit rate {stats['hit_rate']:.0%}, entries {stats['entries']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Measure local metadata extraction against the model call it replaces.
+
+Synthetic contracts are generated from a set of differently worded
+openings (ISO, numeric and written dates, defined terms, 'a term of N
+years', continental and English number formats, damages amounts that are
+not the contract value) with random dates and values, padded with
+boilerplate. For each field the benchmark prints how often the local
+extractor was confident, how often confident answers were right, and how
+many contracts still needed the model. It also prints the time per
+contract next to one fake model request.
+
+    python benchmarks/metadata_extraction_benchmark.py --contracts 500 --latency 1.5
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from dateutil.relativedelta import relativedelta
+
+from app.services.ai_service import AIService
+from app.services.metadata_extractor import MetadataExtractor
+from clause_detection_benchmark import make_contract
+from fake_chat_client import FakeChatClient
+
+FIELDS = ['start_date', 'end_date', 'contract_value', 'currency']
+
+
+def long_date(value):
+    return value.strftime('%B %d, %Y').replace(' 0', ' ')
+
+
+def day_month(value):
+    return f"{value.day} {value.strftime('%B %Y')}"
+
+
+def english(amount):
+    return f'{amount:,.2f}'
+
+
+def continental(amount):
+    return f'{amount:,.2f}'.replace(',', ' ').replace('.', ',').replace(' ', '.')
+
+
+TEMPLATES = [
+    lambda s, e, v: (f'This Supply Agreement is made and entered into as of {long_date(s)} (the "Effective Date"). '
+                     f'It shall expire on {long_date(e)}. The total contract value is USD {english(v)}.', 'USD'),
+    lambda s, e, v: (f'This Agreement is effective from {s.isoformat()} and remains in force until {e.isoformat()}. '
+                     f'Contract price: EUR {continental(v)}. Late delivery incurs liquidated damages of EUR 5.000,00 per week.', 'EUR'),
+    lambda s, e, v: (f'The Commencement Date is {day_month(s)}. The Expiry Date is {day_month(e)}. '
+                     f'The fees payable under this Agreement shall not exceed £{english(v)} in aggregate.', 'GBP'),
+    lambda s, e, v: (f'This Agreement commences on {long_date(s)} and continues for an initial term of three (3) years. '
+                     f'Total consideration: {english(v)} USD. Insurance cover of USD 5,000,000 is required.', 'USD'),
+    lambda s, e, v: (f'Effective Date: {s.strftime("%m/%d/%Y")}\nEnd Date: {e.strftime("%m/%d/%Y")}\n'
+                     f'Total Contract Value: ${english(v)}', 'USD'),
+    lambda s, e, v: (f'Dated {day_month(s)}. This quality agreement covers the supply of sterile components. '
+                     f'Prices are agreed per batch at CHF {english(v / 100)} per batch.', 'CHF'),
+]
+# Template 3 has no end date but a three-year term; template 5 has no usable cues at all
+TERM_YEARS = {3: 3}
+
+
+def make_case(rng, number):
+    start = date(2020, 1, 1) + timedelta(days=rng.randrange(2000))
+    template = number % len(TEMPLATES)
+    years = TERM_YEARS.get(template, rng.choice([1, 2, 3, 5]))
+    end = start + relativedelta(years=years) - timedelta(days=1)
+    value = rng.randrange(20, 5000) * 1000.0
+    opening, currency = TEMPLATES[template](start, end, value)
+    expected = {'start_date': start.isoformat(), 'end_date': end.isoformat(), 'contract_value': value, 'currency': currency}
+    if template == 5:
+        expected = {'start_date': None, 'end_date': None, 'contract_value': None, 'currency': None}
+    return opening + '\n\n' + make_contract(4), expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--contracts', type=int, default=500)
+    parser.add_argument('--min-confidence', type=float, default=0.75)
+    parser.add_argument('--latency', type=float, default=1.5, help='Fake model latency per request (s)')
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    cases = [make_case(rng, number) for number in range(args.contracts)]
+    extractor = MetadataExtractor()
+
+    confident = {field: 0 for field in FIELDS}
+    correct = {field: 0 for field in FIELDS}
+    needs_model = 0
+    service = AIService(None, None, 'fake', metadata_extractor=extractor, metadata_min_confidence=args.min_confidence)
+    service.client = FakeChatClient(latency=0)
+
+    start = time.perf_counter()
+    results = [extractor.extract(text) for text, _ in cases]
+    local_us = (time.perf_counter() - start) / len(cases) * 1e6
+
+    for (text, expected), metadata in zip(cases, results):
+        for field in FIELDS:
+            if metadata['confidence'][field] >= args.min_confidence:
+                confident[field] += 1
+                correct[field] += metadata[field] == expected[field]
+        needs_model += not service._metadata_confident(metadata)
+
+    model = FakeChatClient(latency=args.latency)
+    start = time.perf_counter()
+    AIService(None, None, 'fake', client=model).extract_metadata(cases[0][0])
+    model_ms = (time.perf_counter() - start) * 1000
+
+    total = len(cases)
+    print(f"{total} contracts, minimum confidence {args.min_confidence}")
+    print(f"{'field':<16}{'confident':>11}{'correct when confident':>24}")
+    for field in FIELDS:
+        accuracy = correct[field] / confident[field] if confident[field] else 0
+        print(f"{field:<16}{confident[field] / total:>11.0%}{accuracy:>24.1%}")
+    print(f"model still asked for {needs_model / total:.0%} of contracts")
+    print(f"local extraction: {local_us:.0f} µs per contract; one model request: {model_ms:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
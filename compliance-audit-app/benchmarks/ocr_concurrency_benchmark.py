@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent Azure Read OCR against a local fake Read API.
+
+Compares the previous one-page-at-a-time loop (fixed 1 s polling) with
+OCRService._ocr_images at several concurrency limits.
+
+    python benchmarks/ocr_concurrency_benchmark.py --pages 12 --latency 1.5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PIL import Image
+from app.services.ocr_service import OCRService
+from fake_read_api import FakeReadAPI
+
+
+def legacy_serial_ocr(service, images):
+    """The original per-page loop: submit, then poll every second until done"""
+    texts = []
+    for image in images:
+        read_response = service.client.read_in_stream(service._image_to_stream(image), raw=True)
+        operation_id = read_response.headers["Operation-Location"].split("/")[-1]
+        while True:
+            read_result = service.client.get_read_result(operation_id)
+            if read_result.status not in ['notStarted', 'running']:
+                break
+            time.sleep(1)
+        texts.append("\n".join(line.text for r in read_result.analyze_result.read_results for line in r.lines))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=12)
+    parser.add_argument('--latency', type=float, default=1.5, help='Fake Read API processing time per page (s)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8])
+    args = parser.parse_args()
+
+    images = [Image.new('L', (1240, 1754), color=255) for _ in range(args.pages)]
+
+    print(f"{args.pages} pages, {args.latency}s simulated Read latency")
+    print(f"{'mode':<24}{'seconds':>10}{'pages/s':>10}{'polls':>8}")
+
+    with FakeReadAPI(latency=args.latency) as api:
+        service = OCRService(api.endpoint, 'fake-key', image_prep=False)
+        start = time.perf_counter()
+        legacy_serial_ocr(service, images)
+        elapsed = time.perf_counter() - start
+        print(f"{'legacy serial':<24}{elapsed:>10.2f}{args.pages / elapsed:>10.2f}{api.polled:>8}")
+
+    for concurrency in args.concurrency:
+        with FakeReadAPI(latency=args.latency) as api:
+            service = OCRService(api.endpoint, 'fake-key', max_concurrency=concurrency, image_prep=False)
+            start = time.perf_counter()
+            texts = service._ocr_images(images)
+            elapsed = time.perf_counter() - start
+            assert all(texts), 'every page should return text'
+            print(f"{f'concurrent (limit {concurrency})':<24}{elapsed:>10.2f}{args.pages / elapsed:>10.2f}{api.polled:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Check that streaming OCR rasterization stays under the configured memory
+ceiling (OCR_MAX_RENDER_MEMORY_MB).
+
+Pages are rendered by a stand-in for pdf2image whose bitmaps are Python
+buffers, so tracemalloc sees every rendered page; the Read API is stubbed
+in-process. Exits non-zero if the traced peak exceeds the ceiling.
+
+    python benchmarks/ocr_memory_check.py --pages 200 --max-memory-mb 64
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+import app.services.ocr_service as ocr_module
+from app.services.ocr_service import OCRService
+
+
+class FakePage:
+    """Rendered page whose bitmap is allocated where tracemalloc can see it"""
+
+    def __init__(self, size):
+        self.bitmap = bytearray(size)
+
+    def save(self, fp, format=None):
+        fp.write(self.bitmap)
+
+
+class FakeReadClient:
+    """In-process Read API that completes every operation immediately"""
+
+    def __init__(self):
+        self.operations = 0
+
+    def read_in_stream(self, image_stream, raw=True):
+        image_stream.read()
+        self.operations += 1
+        return SimpleNamespace(headers={'Operation-Location': f'/analyzeResults/{self.operations}'})
+
+    def get_read_result(self, operation_id):
+        line = SimpleNamespace(text=f'page text {operation_id}')
+        return SimpleNamespace(
+            status=ocr_module.OperationStatusCodes.succeeded,
+            analyze_result=SimpleNamespace(read_results=[SimpleNamespace(lines=[line])])
+        )
+
+
+def make_pdf(path, pages):
+    c = canvas.Canvas(path, pagesize=letter)
+    for i in range(pages):
+        c.drawString(72, 720, f'Scanned page {i + 1}')
+        c.showPage()
+    c.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--dpi', type=int, default=150)
+    parser.add_argument('--max-memory-mb', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    service = OCRService(None, None, max_concurrency=args.concurrency, dpi=args.dpi,
+                         max_render_memory=args.max_memory_mb * 1024 * 1024)
+    service.image_prep = False  # FakePage bitmaps are opaque; this checks rendering, not encoding
+    service.client = FakeReadClient()
+    service.POLL_INITIAL_DELAY = 0
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = os.path.join(temp_dir, 'scan.pdf')
+        make_pdf(pdf_path, args.pages)
+        reader = ocr_module.PdfReader(pdf_path)
+        page_bytes = service._rendered_page_bytes(reader.pages[0])
+        window = service._render_window(reader)
+
+        def fake_convert_from_path(path, dpi, first_page, last_page, **kwargs):
+            return [FakePage(page_bytes) for _ in range(first_page, last_page + 1)]
+
+        ocr_module.convert_from_path = fake_convert_from_path
+
+        tracemalloc.start()
+        text, pages = service._extract_with_azure_ocr(pdf_path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    whole_document = page_bytes * args.pages
+    ceiling = service.max_render_memory
+    print(f"{args.pages} pages at {args.dpi} DPI, {page_bytes / 2**20:.1f} MB per rendered page")
+    print(f"render window:          {window:8d} pages")
+    print(f"whole-document render:  {whole_document / 2**20:8.1f} MB")
+    print(f"streaming peak:         {peak / 2**20:8.1f} MB")
+    print(f"configured ceiling:     {ceiling / 2**20:8.1f} MB")
+
+    assert len(pages) == args.pages, f'expected {args.pages} pages, got {len(pages)}'
+    assert [p['page_number'] for p in pages] == list(range(1, args.pages + 1)), 'pages out of order'
+    if peak > ceiling:
+        print("FAIL: peak traced memory exceeds the configured ceiling")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
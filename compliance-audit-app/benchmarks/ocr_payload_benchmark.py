@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Compare OCR upload payloads: full-resolution colour PNG (image_prep off)
+against grayscale/bilevel pages at an adaptive DPI (image_prep on).
+
+Pages are synthetic 300 DPI scans: clean black-on-white text and noisy
+grey scans. The fake Read API throttles uploads to --bandwidth bytes/s to
+emulate a constrained egress link.
+
+    python benchmarks/ocr_payload_benchmark.py --pages 8 --bandwidth 2000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PIL import Image, ImageDraw, ImageFilter
+from app.services.ocr_service import OCRService
+from fake_read_api import FakeReadAPI
+
+LINE = "12.{n} Liquidated damages of EUR {amount:,} per week apply to late delivery under EU GDP."
+
+
+def scanned_page(number, noisy, dpi=300):
+    """A Letter page of 11pt text rendered at dpi, optionally with scanner noise"""
+    width, height = int(8.5 * dpi), int(11 * dpi)
+    font_px = int(11 / 72 * dpi)
+    image = Image.new('RGB', (width, height), color=(255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    for line in range(45):
+        draw.text((dpi, dpi + line * font_px * 1.4), LINE.format(n=line, amount=number * 1000 + line),
+                  fill=(20, 20, 20), font_size=font_px)
+    if noisy:
+        rng = random.Random(number)
+        noise = Image.effect_noise((width, height), 40).convert('RGB')
+        image = Image.blend(image, noise, 0.25).filter(ImageFilter.GaussianBlur(1))
+        image = image.rotate(rng.uniform(-0.8, 0.8), fillcolor=(235, 235, 230))
+    return image
+
+
+def run(images, args, image_prep):
+    with FakeReadAPI(latency=args.latency, bandwidth=args.bandwidth) as api:
+        service = OCRService(api.endpoint, 'fake-key', max_concurrency=args.concurrency, image_prep=image_prep)
+        page_stats = []
+        start = time.perf_counter()
+        service._ocr_images(images, page_stats)
+        elapsed = time.perf_counter() - start
+        summary = service._summarize_ocr_stats(page_stats)
+        return elapsed, summary, page_stats, api.bytes_received
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.5, help='Fake Read API processing time per page (s)')
+    parser.add_argument('--bandwidth', type=float, default=2_000_000, help='Upload bandwidth (bytes/s)')
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    images = [scanned_page(i, noisy=i % 2 == 1) for i in range(args.pages)]
+    print(f"{args.pages} pages (half noisy), {args.bandwidth / 1e6:.1f} MB/s upload, {args.latency}s Read latency")
+    print(f"{'mode':<20}{'seconds':>10}{'KB/page':>10}{'latency s':>12}")
+
+    results = {}
+    for image_prep in (False, True):
+        elapsed, summary, page_stats, received = run(images, args, image_prep)
+        results[image_prep] = (elapsed, summary)
+        mode = 'prepared' if image_prep else 'colour PNG 300 DPI'
+        print(f"{mode:<20}{elapsed:>10.2f}{summary['bytes_per_page'] / 1024:>10.0f}{summary['mean_latency_seconds']:>12.2f}")
+        if image_prep:
+            for i, stats in enumerate(page_stats):
+                print(f"    page {i + 1}: {stats['encoding']:<12} {stats['dpi']:>4} DPI "
+                      f"line height {stats.get('line_height')} px, {stats['bytes_sent'] / 1024:.0f} KB")
+
+    (before, legacy), (after, prepared) = results[False], results[True]
+    print(f"bytes sent: {legacy['bytes_sent'] / 2**20:.1f} MB -> {prepared['bytes_sent'] / 2**20:.1f} MB "
+          f"({1 - prepared['bytes_sent'] / legacy['bytes_sent']:.0%} less)")
+    print(f"wall time:  {before:.2f}s -> {after:.2f}s; mean page latency "
+          f"{legacy['mean_latency_seconds']:.2f}s -> {prepared['mean_latency_seconds']:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark PyPDF2 text extraction on a generated text-layer PDF.
+
+Compares the previous serial loop (string concatenation with +=) with
+OCRService._extract_with_pypdf2 in one process and on a process pool.
+
+    python benchmarks/pypdf2_parallel_benchmark.py --pages 500 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PyPDF2 import PdfReader
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from app.services.ocr_service import OCRService, _get_text_pool
+
+CLAUSE = ("{page}.{line} The Supplier shall maintain a quality management system certified "
+          "to ISO 13485 and notify the Buyer of any change within thirty (30) days.")
+
+
+def generate_pdf(path, pages):
+    """Write a contract-like PDF with about 50 lines of text per page"""
+    pdf = canvas.Canvas(path, pagesize=A4)
+    for page in range(1, pages + 1):
+        text = pdf.beginText(40, 800)
+        text.setFont('Helvetica', 7)
+        for line in range(1, 51):
+            text.textLine(CLAUSE.format(page=page, line=line))
+        pdf.drawText(text)
+        pdf.showPage()
+    pdf.save()
+
+
+def legacy_serial_extract(pdf_path):
+    """The original loop: one reader, text built with +="""
+    text = ""
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PdfReader(file)
+        for page in pdf_reader.pages:
+            text += page.extract_text() + "\n\n"
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, 'contract.pdf')
+        generate_pdf(pdf_path, args.pages)
+        size_mb = os.path.getsize(pdf_path) / (1024 * 1024)
+        print(f"{args.pages} pages ({size_mb:.1f} MB), {args.workers} workers, {os.cpu_count()} CPUs")
+        print(f"{'mode':<24}{'seconds':>10}{'pages/s':>10}")
+
+        start = time.perf_counter()
+        expected = legacy_serial_extract(pdf_path)
+        elapsed = time.perf_counter() - start
+        print(f"{'legacy serial':<24}{elapsed:>10.2f}{args.pages / elapsed:>10.2f}")
+
+        service = OCRService(None, None, text_workers=1)
+        start = time.perf_counter()
+        text, _ = service._extract_with_pypdf2(pdf_path)
+        elapsed = time.perf_counter() - start
+        assert text == expected, 'serial extraction must match the legacy output'
+        print(f"{'serial':<24}{elapsed:>10.2f}{args.pages / elapsed:>10.2f}")
+
+        if args.workers > 1:
+            service = OCRService(None, None, parallel_min_pages=1)
+            service.text_workers = args.workers  # Bypass the CPU-count cap so ordering is checked anywhere
+            _get_text_pool(args.workers).submit(int).result()  # Exclude worker start-up
+            start = time.perf_counter()
+            text, pages = service._extract_with_pypdf2(pdf_path)
+            elapsed = time.perf_counter() - start
+            assert text == expected, 'parallel extraction must keep page order'
+            assert [page['page_number'] for page in pages] == list(range(1, args.pages + 1))
+            print(f"{f'process pool ({args.workers})':<24}{elapsed:>10.2f}{args.pages / elapsed:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Bulk contract analysis and interactive chat sharing one AI quota.
+
+The fake chat client enforces a requests-per-second quota and answers
+excess requests with 429 and retry-after, as Azure OpenAI does. Several
+contracts are analyzed concurrently (bulk lane) while chat questions
+arrive every --question-interval seconds (interactive lane). Prints
+failed calls and chat latency without and with the shared RateLimiter,
+then the limiter's queue metrics.
+
+    python benchmarks/rate_limiter_benchmark.py --quota 10 --contracts 4
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.ai_service import AIService
+from app.services.rate_limiter import RateLimiter
+from fake_chat_client import FakeChatClient
+from clause_detection_benchmark import make_contract
+
+
+class FakeApp:
+    def __init__(self, config):
+        self.config = config
+        self.extensions = {}
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after):
+        super().__init__('Requests to the deployment have exceeded the rate limit')
+        self.response = SimpleNamespace(headers={'retry-after': str(retry_after)})
+
+
+class QuotaChatClient(FakeChatClient):
+    """FakeChatClient that rejects requests beyond `quota` per second (one second of burst)"""
+
+    def __init__(self, quota, latency):
+        super().__init__(latency=latency)
+        self.quota = quota
+        self.allowance = float(quota)
+        self.updated = time.monotonic()
+        self.rejected = 0
+
+    def create(self, *args, **kwargs):
+        with self.lock:
+            now = time.monotonic()
+            self.allowance = min(self.quota, self.allowance + (now - self.updated) * self.quota)
+            self.updated = now
+            if self.allowance < 1:
+                self.rejected += 1
+                raise FakeRateLimitError(retry_after=1)
+            self.allowance -= 1
+        return super().create(*args, **kwargs)
+
+
+def run(args, limiter):
+    client = QuotaChatClient(args.quota, args.latency)
+    contract = make_contract(args.sections)
+    analyses = []
+    latencies = []
+    failed_questions = 0
+
+    def analyze():
+        service = AIService(None, None, 'fake', chunk_chars=4000, rate_limiter=limiter, priority='bulk')
+        service.client = client
+        stats = {}
+        service._detect_clauses(contract, stats=stats)  # keeps going past failed chunks, so they can be counted
+        analyses.append(stats)
+
+    workers = [threading.Thread(target=analyze) for _ in range(args.contracts)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+
+    chat = AIService(None, None, 'fake', rate_limiter=limiter, priority='interactive')
+    chat.client = client
+    for number in range(args.questions):
+        time.sleep(args.question_interval)
+        asked = time.perf_counter()
+        answer = chat.answer_contract_question(contract, f'Question {number}: is there a penalty clause?')
+        latencies.append(time.perf_counter() - asked)
+        failed_questions += answer.startswith('Error processing question')
+
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    chunks = sum(stats['chunks'] for stats in analyses)
+    failed_chunks = sum(stats['failed_chunks'] for stats in analyses)
+    latencies.sort()
+    print(f"  bulk: {chunks - failed_chunks}/{chunks} chunks analyzed in {elapsed:.1f}s, "
+          f"429s from the service: {client.rejected}")
+    print(f"  chat: {args.questions - failed_questions}/{args.questions} answered, "
+          f"median {latencies[len(latencies) // 2]:.2f}s, max {latencies[-1]:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quota', type=int, default=10, help='Requests per second the fake service accepts')
+    parser.add_argument('--latency', type=float, default=0.2, help='Fake model latency per request (s)')
+    parser.add_argument('--contracts', type=int, default=4)
+    parser.add_argument('--sections', type=int, default=40, help='Sections per contract')
+    parser.add_argument('--questions', type=int, default=6)
+    parser.add_argument('--question-interval', type=float, default=0.5)
+    args = parser.parse_args()
+
+    print("without limiter")
+    run(args, None)
+
+    # The second limiter is set above the real quota, as when other processes share it: 429s are retried
+    for label, rpm in (('limiter at the quota', args.quota * 60),
+                       ('limiter 50% above the quota', int(args.quota * 90))):
+        limiter = RateLimiter(FakeApp({
+            'AI_RATE_LIMIT_RPM': rpm,
+            'AI_RATE_LIMIT_BURST_SECONDS': 1,
+            'AI_RATE_LIMIT_BACKOFF_BASE': 0.2
+        }))
+        print(f"{label} (interactive lane ahead of bulk)")
+        run(args, limiter)
+        stats = limiter.stats()
+        for lane, metrics in stats['lanes'].items():
+            print(f"  {lane:<12} calls {metrics['acquired']:4d}, mean wait {metrics['mean_wait_seconds']:.2f}s, "
+                  f"max wait {metrics['max_wait_seconds']:.2f}s")
+        print(f"  throttled {stats['throttled']}, retries {stats['retries']}")
+
+if __name__ == '__main__':
+    main()
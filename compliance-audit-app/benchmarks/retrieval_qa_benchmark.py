@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Compare chat context built from text[:4000] with top-k BM25 retrieval.
+
+A long synthetic contract has one distinctive fact planted in a section
+spread through the document. For each question the prompt context is
+built both ways; a question counts as answerable when its fact is in the
+context. Also prints index build time, stored size and retrieval latency.
+
+    python benchmarks/retrieval_qa_benchmark.py --sections 120 --top-k 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.ai_service import AIService
+from app.services.text_index import LexicalIndex
+from clause_detection_benchmark import make_contract
+
+FACTS = [
+    ('Liquidated damages for late delivery are 0.5% of the order value per week.',
+     'What are the liquidated damages for late delivery?'),
+    ('The supplier maintains ISO 13485 certification for all manufacturing sites.',
+     'Does the supplier need ISO 13485 certification?'),
+    ('Electronic records and signatures comply with 21 CFR Part 11.',
+     'Are electronic signatures covered by 21 CFR Part 11?'),
+    ('Products are stored and transported at 2-8 degrees Celsius under EU GDP.',
+     'What temperature must products be transported at?'),
+    ('Either party may terminate with ninety days written notice.',
+     'How much notice is needed to terminate?'),
+    ('Invoices are payable within 45 days of receipt.',
+     'What are the payment terms for invoices?'),
+]
+
+
+def plant_facts(text, sections):
+    """Put one fact into sections spread evenly across the contract"""
+    for number, (fact, _) in enumerate(FACTS):
+        section = 1 + (number + 1) * sections // (len(FACTS) + 1)
+        marker = f'CLAUSE-{section} applies to this section. '
+        text = text.replace(marker, marker + fact + ' ', 1)
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sections', type=int, default=120)
+    parser.add_argument('--chunk-chars', type=int, default=1500)
+    parser.add_argument('--top-k', type=int, default=4)
+    args = parser.parse_args()
+
+    text = plant_facts(make_contract(args.sections), args.sections)
+    service = AIService(None, None, 'fake')
+
+    start = time.perf_counter()
+    index = LexicalIndex.build(text, max_chars=args.chunk_chars)
+    build_ms = (time.perf_counter() - start) * 1000
+    stored = json.dumps(index.to_dict())
+    start = time.perf_counter()
+    index = LexicalIndex.from_dict(json.loads(stored))
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(text):,} characters, {len(index.chunks)} chunks; index built in {build_ms:.1f} ms, "
+          f"{len(stored) / 1024:.0f} KB stored, loaded in {load_ms:.1f} ms")
+
+    legacy_hits = retrieval_hits = 0
+    legacy_chars = retrieval_chars = 0
+    search_times = []
+    for fact, question in FACTS:
+        legacy = service._question_messages(text, question)[-1]['content']
+        retrieved = service._question_messages(text, question, index, args.top_k)[-1]['content']
+        legacy_hits += fact in legacy
+        retrieval_hits += fact in retrieved
+        legacy_chars += len(legacy)
+        retrieval_chars += len(retrieved)
+
+        start = time.perf_counter()
+        index.search(question, args.top_k)
+        search_times.append((time.perf_counter() - start) * 1000)
+
+    questions = len(FACTS)
+    print(f"{'context':<16}{'answerable':>12}{'prompt tokens/question':>26}")
+    print(f"{'text[:4000]':<16}{legacy_hits:>9}/{questions}{legacy_chars // 4 // questions:>26}")
+    print(f"{f'top-{args.top_k} BM25':<16}{retrieval_hits:>9}/{questions}{retrieval_chars // 4 // questions:>26}")
+    print(f"retrieval: mean {sum(search_times) / questions:.2f} ms, max {max(search_times):.2f} ms per question")
+
+
+if __name__ == '__main__':
+    main()
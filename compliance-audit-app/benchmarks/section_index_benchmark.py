@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Measure the section index: build time, stored size, clause placement and
+fetching one section by offset against loading the whole contract text.
+
+A synthetic contract of --pages pages has an article per page with
+numbered sections and subsections (12.3.1), followed by a schedule that
+restarts the numbering. One clause sentence is planted in a known section
+per page; each clause is placed both from its offset (rule-detected
+clauses) and by finding its content in the text (model clauses), and
+counted when the recorded page and section reference are right. The
+section fetch is timed against an in-process SQLite database, as SUBSTR
+on the stored text versus selecting the full text and slicing it in
+Python; with a database server the full text also crosses the network on
+every request, so the characters read matter more than the times here.
+
+    python benchmarks/section_index_benchmark.py --pages 100
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.section_index import SectionIndex, find_passage
+
+PARAGRAPH = ("The parties agree that the obligations set out in this section apply for the full term "
+             "of the agreement where the context requires. ") * 3
+
+
+def make_contract(pages):
+    """Contract text, page offsets and the planted clauses as (content, page, reference)"""
+    texts, planted = [], []
+    for page in range(1, pages + 1):
+        if page <= pages - 2:
+            lines = [f'ARTICLE {page} OBLIGATIONS OF THE PARTIES', f'{page}.1 General', PARAGRAPH,
+                     f'{page}.2 Performance', PARAGRAPH, f'{page}.2.1 Standards', PARAGRAPH]
+            reference = f'{page}.2.1'
+        else:
+            number = page - pages + 2
+            lines = ([f'Schedule B Quality Requirements'] if number == 1 else []) + [
+                f'{number}. Quality System', PARAGRAPH, f'{number}.1 Records', PARAGRAPH]
+            reference = f'Schedule B, {number}.1'
+        content = f'The Supplier shall retain batch records of clause {page} for five years after expiry.'
+        lines.append(content)
+        planted.append((content, page, reference))
+        lines.append(PARAGRAPH)
+        texts.append('\n'.join(lines))
+    page_starts, offset = [], 0
+    for page_text in texts:
+        page_starts.append(offset)
+        offset += len(page_text) + 2
+    return ''.join(page_text + '\n\n' for page_text in texts), page_starts, planted
+
+
+def timed(function, repeat=20):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=100)
+    args = parser.parse_args()
+
+    text, page_starts, planted = make_contract(args.pages)
+    build_ms, index = timed(lambda: SectionIndex.build(text, page_starts))
+    stored = len(json.dumps(index.to_dict()))
+    print(f"{args.pages} pages, {len(text):,} characters: {len(index.rows)} sections, "
+          f"built in {build_ms:.1f} ms, stored in {stored:,} bytes")
+
+    for label, locate in (('by offset', lambda content: text.find(content)),
+                          ('by content', lambda content: find_passage(text, content.replace(' ', '\n', 3)))):
+        start = time.perf_counter()
+        correct = 0
+        for content, page, reference in planted:
+            offset = locate(content)
+            correct += offset is not None and index.page_at(offset) == page \
+                and index.reference(index.locate(offset)) == reference
+        elapsed = (time.perf_counter() - start) / len(planted) * 1e6
+        print(f"clauses placed {label:<11} {correct}/{len(planted)} correct, {elapsed:.0f} µs per clause")
+
+    connection = sqlite3.connect(':memory:')
+    connection.execute('CREATE TABLE contracts (id INTEGER PRIMARY KEY, extracted_text TEXT)')
+    connection.execute('INSERT INTO contracts VALUES (1, ?)', (text,))
+    row = index.locate(text.find(planted[len(planted) // 2][0]))
+    start_offset, end_offset = index.rows[row][0], index.rows[row][1]
+
+    full_ms, full = timed(lambda: connection.execute(
+        'SELECT extracted_text FROM contracts WHERE id = 1').fetchone()[0][start_offset:end_offset])
+    substr_ms, part = timed(lambda: connection.execute(
+        'SELECT substr(extracted_text, ?, ?) FROM contracts WHERE id = 1',
+        (start_offset + 1, end_offset - start_offset)).fetchone()[0])
+    assert full == part
+    print(f"fetch section {index.reference(row)}: full text {len(text):,} chars read in {full_ms:.3f} ms, "
+          f"SUBSTR {len(part):,} chars read in {substr_ms:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
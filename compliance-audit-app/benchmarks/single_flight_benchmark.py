@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Show identical in-flight AI requests coalesced into one model call.
+
+N callers ask for the same contract summary and the same compliance
+check at once (e.g. a team opening a freshly ingested contract). Both
+runs use the in-memory LLM cache; without single-flight every caller
+misses it while the first answer is still being generated. Prints model
+requests, wall time and tokens spent for each run.
+
+    python benchmarks/single_flight_benchmark.py --callers 20 --latency 1.5
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.ai_service import AIService
+from app.services.llm_cache import LLMCache
+from app.services.single_flight import SingleFlight
+from fake_chat_client import FakeChatClient
+from clause_detection_benchmark import make_contract
+
+QUESTION = 'Does this contract contain requirements for ISO 13485 compliance? If yes, what are they?'
+
+
+class FakeApp:
+    def __init__(self, config):
+        self.config = config
+        self.extensions = {}
+
+
+def run(text, callers, latency, coalesce):
+    cache = LLMCache(FakeApp({'LLM_CACHE_BACKEND': 'memory', 'LLM_CACHE_TTL': 300, 'LLM_CACHE_MAX_ENTRIES': 100}))
+    service = AIService(
+        None, None, 'fake',
+        cache=cache,
+        client=FakeChatClient(latency=latency),
+        single_flight=SingleFlight() if coalesce else None
+    )
+
+    def caller(number):
+        if number % 2:
+            return service.answer_contract_question(text, QUESTION)
+        return service.generate_summary(text)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        answers = list(pool.map(caller, range(callers)))
+    elapsed = time.perf_counter() - start
+    assert all(answers)
+    return service.client.requests, elapsed, service.usage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--callers', type=int, default=20, help='Concurrent callers (half summary, half question)')
+    parser.add_argument('--latency', type=float, default=1.5, help='Fake model latency per request (s)')
+    args = parser.parse_args()
+
+    text = make_contract(10)
+    print(f"{args.callers} concurrent callers, {args.latency}s model latency")
+    print(f"{'mode':<16}{'model requests':>16}{'wall (s)':>10}{'tokens':>10}{'coalesced':>11}")
+    for label, coalesce in (('cache only', False), ('single-flight', True)):
+        requests, elapsed, usage = run(text, args.callers, args.latency, coalesce)
+        print(f"{label:<16}{requests:>16}{elapsed:>10.2f}{usage['total_tokens']:>10}{usage['coalesced_calls']:>11}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Time to first token for blocking and streamed chat answers and summaries.
+
+Uses the in-process fake chat client, which in stream mode sends the
+first word after --first-token seconds and the rest over the remaining
+--latency. The blocking calls show nothing until the whole completion
+is in; the streamed calls show their first words almost at once, with
+the same total time and the same single request.
+
+    python benchmarks/streaming_benchmark.py --latency 8 --first-token 0.4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.ai_service import AIService
+from fake_chat_client import FakeChatClient
+from clause_detection_benchmark import make_contract
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=8.0, help='Fake model time for the whole completion (s)')
+    parser.add_argument('--first-token', type=float, default=0.4, help='Fake model time to first token (s)')
+    args = parser.parse_args()
+
+    text = make_contract(10)
+    question = 'Are there any penalty clauses?'
+    service = AIService(None, None, 'fake')
+    service.client = FakeChatClient(latency=args.latency, first_token_latency=args.first_token)
+
+    cases = [
+        ('question', lambda: service.answer_contract_question(text, question),
+         lambda: service.stream_contract_answer(text, question)),
+        ('summary', lambda: service.summarize_contract(text),
+         lambda: service.stream_contract_summary(text)),
+    ]
+
+    print(f"{'':<10}{'blocking first/total':>24}{'streamed first/total':>24}{'requests':>10}")
+    for label, blocking, streamed in cases:
+        requests_before = service.client.requests
+        start = time.perf_counter()
+        blocking()
+        blocking_total = time.perf_counter() - start
+
+        start = time.perf_counter()
+        first = None
+        for _ in streamed():
+            if first is None:
+                first = time.perf_counter() - start
+        streamed_total = time.perf_counter() - start
+
+        print(f"{label:<10}{blocking_total:>11.2f}s /{blocking_total:>6.2f}s"
+              f"{first:>15.2f}s /{streamed_total:>6.2f}s{service.client.requests - requests_before:>10}")
+
+
+if __name__ == '__main__':
+    main()
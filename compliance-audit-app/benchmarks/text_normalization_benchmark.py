@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Measure how much the text normalization stage saves before AI calls.
+
+A synthetic contract of --pages pages is laid out the way PyPDF2 and OCR
+return it: a two-line header and a 'Page N of M' footer on every page,
+body text wrapped at --width columns with words hyphenated across line
+breaks, indented lines and runs of spaces. One clause sentence tagged
+CLAUSE-<n> is planted per page. Prints characters, estimated tokens and
+clause detection chunks (at --chunk-chars) before and after, the time to
+normalize, and checks that every planted clause survives and maps back to
+its position in the original text.
+
+    python benchmarks/text_normalization_benchmark.py --pages 50 --chunk-chars 6000
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.text_chunking import chunk_text
+from app.services.text_normalizer import TextNormalizer
+
+WORDS = ('the supplier shall ensure that all products delivered under this agreement conform to the '
+         'specification and are manufactured stored and transported in accordance with applicable '
+         'regulatory requirements including documentation traceability and quality control').split()
+
+
+def wrap(words, width, rng):
+    """Wrap words into lines, hyphenating some long words across the break and indenting some lines"""
+    lines, line = [], ''
+    for word in words:
+        if len(line) + len(word) + 1 <= width:
+            line = f'{line} {word}' if line else word
+            continue
+        if len(word) > 7 and rng.random() < 0.5:
+            cut = len(word) // 2
+            lines.append(f'{line} {word[:cut]}-')
+            line = word[cut:]
+        else:
+            lines.append(line)
+            line = word
+    lines.append(line)
+    return [('    ' if rng.random() < 0.2 else '') + line.replace(' ', '  ', 1 if rng.random() < 0.3 else 0)
+            for line in lines]
+
+
+def make_contract(pages, width, rng):
+    """Contract text, page offsets and the planted clause sentences"""
+    texts, planted = [], []
+    for page in range(1, pages + 1):
+        clause = f'Either party may terminate this agreement on ninety days notice CLAUSE-{page}.'
+        planted.append(clause)
+        lines = ['ACME PHARMA GMBH  -  SUPPLY AND QUALITY AGREEMENT', f'Contract No. QA-2024-017   Rev. 3   Confidential', '']
+        for paragraph in range(4):
+            words = [rng.choice(WORDS) for _ in range(rng.randrange(60, 110))]
+            lines += wrap(words, width, rng) + ['', '']
+            if paragraph == 1:
+                lines += [clause, '']
+        lines += [f'Page {page} of {pages}']
+        texts.append('\n'.join(lines))
+    page_starts, offset = [], 0
+    for page_text in texts:
+        page_starts.append(offset)
+        offset += len(page_text) + 2
+    return ''.join(page_text + '\n\n' for page_text in texts), page_starts, planted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--width', type=int, default=80)
+    parser.add_argument('--chunk-chars', type=int, default=6000)
+    args = parser.parse_args()
+
+    text, page_starts, planted = make_contract(args.pages, args.width, random.Random(3))
+    normalizer = TextNormalizer()
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        normalized = normalizer.normalize(text, page_starts)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    stats = normalized.stats
+    before = len(chunk_text(text, args.chunk_chars))
+    after = len(chunk_text(normalized.text, args.chunk_chars))
+    print(f"{args.pages} pages, normalized in {min(timings):.1f} ms "
+          f"({stats['boilerplate_lines']} boilerplate lines, {stats['hyphens_joined']} hyphenations joined)")
+    print(f"{'':<12}{'chars':>10}{'tokens':>9}{'chunks':>8}")
+    print(f"{'original':<12}{len(text):>10,}{len(text) // 4:>9,}{before:>8}")
+    print(f"{'normalized':<12}{len(normalized.text):>10,}{len(normalized.text) // 4:>9,}{after:>8}")
+    print(f"saved {stats['chars_saved']:,} chars ({stats['chars_saved'] / len(text):.0%}), "
+          f"~{stats['tokens_saved']:,} tokens per contract")
+
+    leftover = len(re.findall(r'Confidential|Page \d+ of', normalized.text))
+    mapped = 0
+    for page, clause in enumerate(planted, start=1):
+        position = normalized.text.find(clause)
+        original = normalized.original_offset(position) if position != -1 else -1
+        mapped += text.startswith(clause, original) and normalized.page_starts[page - 1] <= position
+    print(f"clauses kept and mapped back: {mapped}/{len(planted)}; boilerplate left: {leftover}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+import os
+from app import create_app, task_queue
+
+# Start with: celery -A celery_worker.celery worker
+# Requires TASK_QUEUE_BACKEND=celery so uploads are sent to the broker
+app = create_app(os.environ.get('FLASK_ENV', 'development'))
+celery = task_queue.celery
@@ -22,9 +22,58 @@ class Config:
     # Azure Services
     AZURE_COMPUTER_VISION_ENDPOINT = os.environ.get('AZURE_COMPUTER_VISION_ENDPOINT')
     AZURE_COMPUTER_VISION_KEY = os.environ.get('AZURE_COMPUTER_VISION_KEY')
+    OCR_MAX_CONCURRENCY = int(os.environ.get('OCR_MAX_CONCURRENCY', 4))  # Read API pages in flight per document
+    OCR_MIN_PAGE_CHARS = int(os.environ.get('OCR_MIN_PAGE_CHARS', 50))  # Pages with less embedded text are OCRed
+    OCR_RENDER_DPI = int(os.environ.get('OCR_RENDER_DPI', 300))
+    OCR_IMAGE_PREP = os.environ.get('OCR_IMAGE_PREP', 'True').lower() == 'true'  # Grayscale/bilevel pages at adaptive DPI
+    OCR_MIN_DPI = int(os.environ.get('OCR_MIN_DPI', 150))  # Lowest DPI adaptive downscaling may pick
+    OCR_MAX_IMAGE_MB = int(os.environ.get('OCR_MAX_IMAGE_MB', 4))  # Per-page payload limit (Read API free tier: 4 MB)
+    OCR_MAX_RENDER_MEMORY_MB = int(os.environ.get('OCR_MAX_RENDER_MEMORY_MB', 256))  # Rendered page images held at once
+    OCR_CACHE_ENABLED = os.environ.get('OCR_CACHE_ENABLED', 'True').lower() == 'true'
+    OCR_CACHE_PATH = os.environ.get('OCR_CACHE_PATH') or os.path.join(basedir, '..', 'ocr_cache.db')
+    OCR_CACHE_MAX_MB = int(os.environ.get('OCR_CACHE_MAX_MB', 256))
+    PDF_TEXT_WORKERS = int(os.environ.get('PDF_TEXT_WORKERS', os.cpu_count() or 1))  # Processes for large text-layer PDFs
+    PDF_PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 100))  # Smaller documents are read in one process
+    TEXT_EXTRACTION_BACKEND = os.environ.get('TEXT_EXTRACTION_BACKEND', 'pypdf2')  # pypdf2, pdfium or pdfminer
+    OCR_BACKEND = os.environ.get('OCR_BACKEND', 'azure_ocr')  # azure_ocr or tesseract
+    OCR_FALLBACK_BACKEND = os.environ.get('OCR_FALLBACK_BACKEND')  # Gets pages the OCR backend could not read
     AZURE_OPENAI_ENDPOINT = os.environ.get('AZURE_OPENAI_ENDPOINT')
     AZURE_OPENAI_KEY = os.environ.get('AZURE_OPENAI_KEY')
     AZURE_OPENAI_DEPLOYMENT_NAME = os.environ.get('AZURE_OPENAI_DEPLOYMENT_NAME', 'gpt-4')
+    AI_CHUNK_CHARS = int(os.environ.get('AI_CHUNK_CHARS', 6000))  # Contract text per clause detection request
+    AI_CHUNK_OVERLAP = int(os.environ.get('AI_CHUNK_OVERLAP', 300))
+    AI_MAX_CONCURRENCY = int(os.environ.get('AI_MAX_CONCURRENCY', 4))  # Chunk requests in flight per contract
+    AI_MAX_CLAUSES = int(os.environ.get('AI_MAX_CLAUSES', 30))  # Riskiest clauses kept per contract
+    AI_CLAUSE_RULES = os.environ.get('AI_CLAUSE_RULES', 'True').lower() == 'true'  # Classify literal references locally; only ambiguous spans go to the model
+    METADATA_LOCAL_EXTRACTION = os.environ.get('METADATA_LOCAL_EXTRACTION', 'True').lower() == 'true'  # Dates and value without a model call
+    METADATA_MIN_CONFIDENCE = float(os.environ.get('METADATA_MIN_CONFIDENCE', 0.75))  # Below this the model is asked too
+    METADATA_DATE_DAYFIRST = os.environ.get('METADATA_DATE_DAYFIRST', 'False').lower() == 'true'  # Read 03/04/2025 as 3 April
+    TEXT_NORMALIZATION = os.environ.get('TEXT_NORMALIZATION', 'True').lower() == 'true'  # Strip headers/footers, page numbers and whitespace before AI calls
+    TEXT_BOILERPLATE_MIN_RATIO = float(os.environ.get('TEXT_BOILERPLATE_MIN_RATIO', 0.5))  # Share of pages a header/footer line must repeat on
+    AI_REQUEST_TIMEOUT = float(os.environ.get('AI_REQUEST_TIMEOUT', 60))  # Seconds per OpenAI HTTP request
+    AI_STEP_TIMEOUT = float(os.environ.get('AI_STEP_TIMEOUT', 300))  # Seconds per concurrent analysis step
+    AI_POOL_MAX_CONNECTIONS = int(os.environ.get('AI_POOL_MAX_CONNECTIONS', 20))  # Per process, shared by all OpenAI clients
+    AI_POOL_MAX_KEEPALIVE = int(os.environ.get('AI_POOL_MAX_KEEPALIVE', 10))  # Idle connections kept open
+    AI_POOL_KEEPALIVE_SECONDS = float(os.environ.get('AI_POOL_KEEPALIVE_SECONDS', 60))
+    # Per process: set to the deployment quota divided by the number of worker processes
+    AI_RATE_LIMIT_RPM = int(os.environ.get('AI_RATE_LIMIT_RPM', 480))  # 0 disables the request bucket
+    AI_RATE_LIMIT_TPM = int(os.environ.get('AI_RATE_LIMIT_TPM', 80000))  # 0 disables the token bucket
+    AI_RATE_LIMIT_BURST_SECONDS = float(os.environ.get('AI_RATE_LIMIT_BURST_SECONDS', 10))
+    AI_RATE_LIMIT_INTERACTIVE_RESERVE = float(os.environ.get('AI_RATE_LIMIT_INTERACTIVE_RESERVE', 0.2))  # Share bulk analysis leaves for chat
+    AI_RATE_LIMIT_MAX_RETRIES = int(os.environ.get('AI_RATE_LIMIT_MAX_RETRIES', 5))  # On 429 and transient errors
+    AI_RATE_LIMIT_BACKOFF_BASE = float(os.environ.get('AI_RATE_LIMIT_BACKOFF_BASE', 1.0))
+    AI_RATE_LIMIT_BACKOFF_MAX = float(os.environ.get('AI_RATE_LIMIT_BACKOFF_MAX', 60))
+    AI_RATE_LIMIT_MAX_WAIT = float(os.environ.get('AI_RATE_LIMIT_MAX_WAIT', 300))  # Seconds a call may queue; 0 waits forever
+    QA_CHUNK_CHARS = int(os.environ.get('QA_CHUNK_CHARS', 1500))  # Chunk size of the per-contract retrieval index
+    QA_CHUNK_OVERLAP = int(os.environ.get('QA_CHUNK_OVERLAP', 150))
+    QA_TOP_K = int(os.environ.get('QA_TOP_K', 4))  # Chunks sent with each chat question
+    LLM_CACHE_BACKEND = os.environ.get('LLM_CACHE_BACKEND', 'memory')  # memory, sqlite, redis (REDIS_URL) or none
+    LLM_CACHE_TTL = int(os.environ.get('LLM_CACHE_TTL', 86400))
+    LLM_CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 1000))
+    LLM_CACHE_PATH = os.environ.get('LLM_CACHE_PATH') or os.path.join(basedir, '..', 'llm_cache.db')
+    SINGLE_FLIGHT_LOCK_TTL = float(os.environ.get('SINGLE_FLIGHT_LOCK_TTL', 120))  # Cross-process lock lifetime (redis)
+    SINGLE_FLIGHT_WAIT = float(os.environ.get('SINGLE_FLIGHT_WAIT', 120))  # Seconds to wait on another process before calling anyway
+    SINGLE_FLIGHT_POLL_INTERVAL = float(os.environ.get('SINGLE_FLIGHT_POLL_INTERVAL', 0.1))
     
     # Email
     MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
@@ -38,12 +87,25 @@ class Config:
     UPLOAD_FOLDER = os.path.join(basedir, '..', 'app', 'static', 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
     ALLOWED_EXTENSIONS = {'pdf'}
+    UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # Suggested chunk size for resumable uploads; must stay under MAX_CONTENT_LENGTH
+    CHUNKED_UPLOAD_MAX_SIZE = int(os.environ.get('CHUNKED_UPLOAD_MAX_SIZE', 2 * 1024 * 1024 * 1024))  # 2GB
+    CHUNKED_UPLOAD_EXPIRY_HOURS = 24  # Unfinished uploads are discarded after this long without a chunk
+    BULK_MAX_FILES = int(os.environ.get('BULK_MAX_FILES', 500))  # Contracts per bulk upload request
+    BULK_MAX_CONTENT_LENGTH = int(os.environ.get('BULK_MAX_CONTENT_LENGTH', 512 * 1024 * 1024))  # 512MB; replaces MAX_CONTENT_LENGTH for bulk requests
+    BULK_MAX_ENTRY_SIZE = int(os.environ.get('BULK_MAX_ENTRY_SIZE', 100 * 1024 * 1024))  # Uncompressed size of one ZIP entry
+    BULK_MAX_ARCHIVE_SIZE = int(os.environ.get('BULK_MAX_ARCHIVE_SIZE', 2 * 1024 * 1024 * 1024))  # Uncompressed size of a whole ZIP
+    BULK_MAX_COMPRESSION_RATIO = int(os.environ.get('BULK_MAX_COMPRESSION_RATIO', 100))  # PDFs barely compress; higher ratios suggest a zip bomb
     
     # Redis/Celery
     REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
     CELERY_BROKER_URL = REDIS_URL
     CELERY_RESULT_BACKEND = REDIS_URL
     
+    # Background contract ingestion
+    TASK_QUEUE_BACKEND = os.environ.get('TASK_QUEUE_BACKEND', 'thread')  # 'thread' or 'celery'
+    INGESTION_WORKERS = int(os.environ.get('INGESTION_WORKERS', 4))
+    INGESTION_JOB_TIMEOUT_MINUTES = int(os.environ.get('INGESTION_JOB_TIMEOUT_MINUTES', 120))  # Older queued/running jobs count as abandoned on retry
+    
     # Scheduler
     SCHEDULER_API_ENABLED = True
     SCHEDULER_TIMEZONE = 'UTC'